@@ -0,0 +1,305 @@
+"""Load benchmark of the integration against the mock sidecar.
+
+Drives ``ChatGPTPlusAgent.send_message`` and every registered service
+with concurrent requests against ``tests/mock_sidecar.py`` and reports
+p50/p95/p99 latency, throughput and errors for each. Home Assistant runs
+in-process with a small synthetic home, so context building is part of
+the measured path.
+
+Run from the repository root::
+
+    python -m benchmarks.agent_load --requests 200 --concurrency 8 --latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+import json
+import tempfile
+import time
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import (
+    area_registry,
+    device_registry,
+    entity_registry,
+    floor_registry,
+    label_registry,
+)
+
+from custom_components.chatgpt_plus_ha import (
+    SERVICE_BUILD_CONTEXT,
+    SERVICE_COMPOSE_NOTIFICATION,
+    SERVICE_GENERATE_AUTOMATION,
+    SERVICE_NEW_CONVERSATION,
+    SERVICE_SEND_MESSAGE,
+    _async_register_services,
+    _async_start_context_helpers,
+    _build_context_options,
+    _merge_options,
+    async_setup,
+)
+from custom_components.chatgpt_plus_ha.agent import ChatGPTPlusAgent
+from custom_components.chatgpt_plus_ha.const import CONF_SIDECAR_URL, DOMAIN
+from custom_components.chatgpt_plus_ha.pool import DATA_AGENT_POOL, AgentPool
+from tests.mock_sidecar import MockSidecar
+
+ENTRY_ID = "benchmark"
+AREAS = ("Kitchen", "Living Room", "Bedroom", "Office", "Garage")
+DOMAINS = ("light", "switch", "sensor", "binary_sensor", "climate")
+
+# Request factories: (hass, agent, index, caller) -> awaitable result dict
+Scenario = Callable[[HomeAssistant, ChatGPTPlusAgent, int, str], Awaitable[dict]]
+
+
+async def _async_setup_hass(config_dir: str, entities: int) -> HomeAssistant:
+    """Start a bare Home Assistant with registries and synthetic states."""
+    hass = HomeAssistant(config_dir)
+    for registry in (
+        floor_registry,
+        label_registry,
+        area_registry,
+        device_registry,
+        entity_registry,
+    ):
+        await registry.async_load(hass)
+    areas = area_registry.async_get(hass)
+    for name in AREAS:
+        areas.async_create(name)
+    entity_reg = entity_registry.async_get(hass)
+    for index in range(entities):
+        domain = DOMAINS[index % len(DOMAINS)]
+        area = AREAS[index % len(AREAS)]
+        entry = entity_reg.async_get_or_create(
+            domain, "benchmark", f"bench_{index}", suggested_object_id=f"bench_{index}"
+        )
+        entity_reg.async_update_entity(
+            entry.entity_id, area_id=area.lower().replace(" ", "_")
+        )
+        hass.states.async_set(
+            entry.entity_id,
+            "on" if index % 2 else "off",
+            {"friendly_name": f"{area} {domain} {index}"},
+        )
+    await async_setup(hass, {})
+    return hass
+
+
+def _async_add_agent(hass: HomeAssistant, sidecar_url: str) -> ChatGPTPlusAgent:
+    """Wire up one agent the way async_setup_entry does."""
+    entry = ConfigEntry(
+        data={CONF_SIDECAR_URL: sidecar_url},
+        discovery_keys=MappingProxyType({}),
+        domain=DOMAIN,
+        minor_version=1,
+        options={},
+        source="user",
+        subentries_data=(),
+        title="Benchmark",
+        unique_id=None,
+        version=1,
+    )
+    options = _merge_options(entry)
+    agent = ChatGPTPlusAgent(hass, sidecar_url)
+    agent.update_options(
+        _build_context_options(options, None, None, None, None, None, None, None, None)
+    )
+    hass.data[DOMAIN][ENTRY_ID] = {
+        "agent": agent,
+        "sidecar_url": sidecar_url,
+        "options": options,
+    }
+    pool = hass.data[DOMAIN].setdefault(DATA_AGENT_POOL, AgentPool())
+    pool.add(ENTRY_ID, agent)
+    _async_start_context_helpers(hass)
+    return agent
+
+
+async def _agent_send_message(hass, agent, index, caller):
+    return await agent.send_message(f"Agent request {index}", None, caller=caller)
+
+
+async def _service(hass, service, data, return_response=True):
+    response = await hass.services.async_call(
+        DOMAIN, service, data, blocking=True, return_response=return_response
+    )
+    return response if return_response else {"success": True}
+
+
+async def _send_message_service(hass, agent, index, caller):
+    # The service has no response; its result arrives as an event.
+    request_id = f"bench-{index}"
+    results = hass.data["benchmark_results"]
+    await _service(
+        hass,
+        SERVICE_SEND_MESSAGE,
+        {"message": f"Service request {index}", "request_id": request_id, "caller": caller},
+        return_response=False,
+    )
+    return {"success": results.pop(request_id, False)}
+
+
+async def _new_conversation_service(hass, agent, index, caller):
+    return await _service(
+        hass, SERVICE_NEW_CONVERSATION, {"caller": caller}, return_response=False
+    )
+
+
+async def _build_context_service(hass, agent, index, caller):
+    context = await _service(
+        hass, SERVICE_BUILD_CONTEXT, {"question": f"Is kitchen light {index} on?"}
+    )
+    return {"success": "error" not in context}
+
+
+async def _generate_automation_service(hass, agent, index, caller):
+    return await _service(
+        hass,
+        SERVICE_GENERATE_AUTOMATION,
+        {"description": f"Turn on light {index} on motion", "caller": caller},
+    )
+
+
+async def _compose_notification_service(hass, agent, index, caller):
+    return await _service(
+        hass,
+        SERVICE_COMPOSE_NOTIFICATION,
+        {"event_type": f"benchmark_event_{index}", "caller": caller},
+    )
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "agent.send_message": _agent_send_message,
+    SERVICE_SEND_MESSAGE: _send_message_service,
+    SERVICE_NEW_CONVERSATION: _new_conversation_service,
+    SERVICE_BUILD_CONTEXT: _build_context_service,
+    SERVICE_GENERATE_AUTOMATION: _generate_automation_service,
+    SERVICE_COMPOSE_NOTIFICATION: _compose_notification_service,
+}
+
+
+def _percentile(ordered: list[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+async def _async_run_scenario(
+    hass: HomeAssistant,
+    agent: ChatGPTPlusAgent,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+) -> dict[str, Any]:
+    """Send requests from concurrency workers and summarize the latencies."""
+    latencies: list[float] = []
+    errors: Counter[str] = Counter()
+    indexes = iter(range(requests))
+
+    async def worker(caller: str) -> None:
+        # One caller per worker keeps each under the per-caller queue limit.
+        for index in indexes:
+            started = time.perf_counter()
+            try:
+                result = await scenario(hass, agent, index, caller)
+            except Exception as err:  # noqa: BLE001
+                result = {"success": False, "error": type(err).__name__}
+            latencies.append(time.perf_counter() - started)
+            if not result.get("success"):
+                errors[str(result.get("error", "unknown"))] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(f"bench-{n}") for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        "requests": requests,
+        "errors": dict(errors),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 2),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run every selected scenario and return the results by name."""
+    sidecar = MockSidecar(
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        response_size=args.response_size,
+        page_pool_size=args.page_pool_size,
+        seed=args.seed,
+    )
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await _async_setup_hass(config_dir, args.entities)
+        await sidecar.start()
+        agent = _async_add_agent(hass, sidecar.url)
+        await _async_register_services(hass)
+
+        outcomes: dict[str, bool] = {}
+        hass.data["benchmark_results"] = outcomes
+
+        @callback
+        def _on_response(event: Event) -> None:
+            outcomes[event.data["request_id"]] = event.data["success"]
+
+        hass.bus.async_listen(f"{DOMAIN}_response", _on_response)
+        # Picks up the mock's page pool size as the agent's concurrency
+        await agent.get_status()
+        try:
+            for name in args.scenarios:
+                results[name] = await _async_run_scenario(
+                    hass, agent, SCENARIOS[name], args.requests, args.concurrency
+                )
+        finally:
+            await agent.async_close()
+            await sidecar.close()
+            await hass.async_stop(force=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="Per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--response-size", type=int, default=2000, help="Characters")
+    parser.add_argument("--page-pool-size", type=int, default=4)
+    parser.add_argument("--entities", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(
+        f"{'scenario':<22} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  errors"
+    )
+    for name, row in results.items():
+        errors = ", ".join(f"{error}={count}" for error, count in row["errors"].items())
+        print(
+            f"{name:<22} {row['throughput_rps']:>8} {row['p50_ms']:>9} "
+            f"{row['p95_ms']:>9} {row['p99_ms']:>9}  {errors or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
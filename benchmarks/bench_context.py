@@ -0,0 +1,156 @@
+"""pytest-benchmark suite for build_context on synthetic homes.
+
+Run from the repository root, saving the results for later comparison::
+
+    python -m pytest benchmarks/bench_context.py --benchmark-autosave
+    python -m pytest benchmarks/bench_context.py --benchmark-compare
+
+Each stage runs against homes of 100, 1k, 10k and 50k entities; select
+sizes with ``-k``, for example ``-k "not 50000"``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import itertools
+import json
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.chatgpt_plus_ha import context as ctx
+from custom_components.chatgpt_plus_ha.const import DEFAULT_MAX_CONTEXT_ENTITIES, DOMAIN
+from custom_components.chatgpt_plus_ha.filters import EntityFilter
+from custom_components.chatgpt_plus_ha.index import DATA_ENTITY_INDEX, EntityIndex, tokenize
+from custom_components.chatgpt_plus_ha.logbook_stream import read_logbook_entries
+from custom_components.chatgpt_plus_ha.redaction import RedactionEngine
+from custom_components.chatgpt_plus_ha.state_cache import serialize_state
+
+from synthetic_home import LogbookProcessor, generate_home
+
+SIZES = [100, 1_000, 10_000, 50_000]
+HISTORY_HOURS = 24
+
+QUESTIONS = (
+    "is the kitchen light on",
+    "what is the bedroom temperature",
+    "which locks are unlocked",
+    "turn down the living room speaker",
+    "is anyone in the garage",
+)
+
+
+@pytest.fixture(params=SIZES, ids=lambda size: f"{size}_entities")
+def home(request, monkeypatch, benchmark):
+    home = generate_home(request.param, history_hours=HISTORY_HOURS)
+    home.install(monkeypatch)
+    home.hass.data.clear()
+    benchmark.extra_info.update(
+        entities=len(home.states),
+        areas=len(home.areas),
+        devices=len(home.devices),
+        history_changes=home.history_changes,
+        history_rows=home.history_rows,
+    )
+    return home
+
+
+@pytest.fixture
+def run():
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+def _questions():
+    # A fresh number each round keeps the token-to-word lookup uncached.
+    for number, question in zip(itertools.count(), itertools.cycle(QUESTIONS)):
+        yield f"{question} {number}"
+
+
+def test_registry_walk(benchmark, home):
+    index = benchmark(lambda: EntityIndex(home.hass).async_build())
+    assert index is None
+
+
+def test_scoring(benchmark, home):
+    index = EntityIndex(home.hass)
+    index.async_build()
+    questions = _questions()
+    scores = benchmark(lambda: index.score(tokenize(next(questions))))
+    assert isinstance(scores, dict)
+
+
+def test_redaction(benchmark, home):
+    def redact_all():
+        engine = RedactionEngine(max_entries=len(home.states))
+        return [engine.redact_attributes(state) for state in home.states]
+
+    assert len(benchmark(redact_all)) == len(home.states)
+
+
+def test_serialization(benchmark, home):
+    engine = RedactionEngine(max_entries=len(home.states))
+
+    def serialize_all():
+        return json.dumps(
+            [serialize_state(state, True, engine) for state in home.states]
+        )
+
+    assert benchmark(serialize_all)
+
+
+def test_history(benchmark, home, run):
+    now = dt_util.utcnow()
+    start_time = now - timedelta(hours=HISTORY_HOURS)
+    selected = home.states[:DEFAULT_MAX_CONTEXT_ENTITIES]
+    entity_filter = EntityFilter.from_options({})
+
+    # Recent mode looks at every entity changed in the window.
+    changes = benchmark(
+        lambda: run(
+            ctx._async_history_stage(
+                home.hass, None, selected, True, start_time, now, entity_filter
+            )
+        )
+    )
+    assert changes
+
+
+def test_logbook(benchmark, home):
+    now = dt_util.utcnow()
+    start_time = now - timedelta(hours=HISTORY_HOURS)
+    entity_ids = list(home.logbook)[:DEFAULT_MAX_CONTEXT_ENTITIES]
+    entity_filter = EntityFilter.from_options({})
+
+    entries = benchmark(
+        lambda: read_logbook_entries(
+            home.hass,
+            LogbookProcessor(entity_ids),
+            start_time,
+            now,
+            entity_filter,
+            ctx.MAX_LOGBOOK_ENTRIES,
+        )
+    )
+    assert entries
+
+
+def test_build_context(benchmark, home, run):
+    # As in production, the index is kept up to date rather than rebuilt.
+    index = EntityIndex(home.hass)
+    index.async_build()
+    home.hass.data[DOMAIN] = {DATA_ENTITY_INDEX: index}
+    questions = _questions()
+    options = {
+        "include_history": True,
+        "include_logbook": True,
+        "include_attributes": True,
+        "history_hours": HISTORY_HOURS,
+    }
+
+    context = benchmark(lambda: run(ctx.build_context(home.hass, next(questions), options)))
+    assert context["summary"]
+    benchmark.extra_info["estimated_tokens"] = context["debug"]["estimated_tokens"]
@@ -0,0 +1,188 @@
+"""A local stand-in for the ChatGPT web app, for sidecar benchmarks.
+
+Serves a page with the selectors the sidecar drives, pre-filled with a
+conversation of any length (``/c/bench-<turns>``), and a
+``/backend-api/conversation`` endpoint that streams a reply in the
+delta-encoded event format.
+
+Run ``python benchmarks/mock_chatgpt.py --port 8765`` and start the
+sidecar with ``CHATGPT_URL=http://127.0.0.1:8765``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import html
+import json
+import re
+
+from aiohttp import web
+
+STREAM_PATH = "/backend-api/conversation"
+# Not matched by the sidecar's fetch hook, to measure the DOM fallback
+HIDDEN_STREAM_PATH = "/backend-api/mock/conversation-hidden"
+
+_CONVERSATION = re.compile(r"^bench-(\d+)$")
+
+PAGE = """<!doctype html>
+<html>
+<head><title>Mock ChatGPT</title></head>
+<body>
+<main id="thread">{turns}</main>
+<textarea id="prompt-textarea"></textarea>
+<button data-testid="send-button" id="send">Send</button>
+<button data-testid="profile-button">Profile</button>
+<script>
+const STREAM_PATH = {stream_path};
+let conversationId = {conversation_id};
+
+function addTurn(role, text) {{
+  const article = document.createElement('article');
+  article.dataset.testid = 'conversation-turn';
+  article.dataset.messageAuthorRole = role;
+  const markdown = document.createElement('div');
+  markdown.className = 'markdown';
+  markdown.textContent = text;
+  article.appendChild(markdown);
+  document.getElementById('thread').appendChild(article);
+  return markdown;
+}}
+
+async function send() {{
+  const input = document.getElementById('prompt-textarea');
+  const message = input.value;
+  if (!message) return;
+  input.value = '';
+  addTurn('user', message);
+  const stop = document.createElement('button');
+  stop.dataset.testid = 'stop-button';
+  document.body.appendChild(stop);
+  const output = addTurn('assistant', '');
+
+  const response = await fetch(STREAM_PATH, {{
+    method: 'POST',
+    headers: {{ 'Content-Type': 'application/json' }},
+    body: JSON.stringify({{ conversation_id: conversationId, message }}),
+  }});
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let text = '';
+  for (;;) {{
+    const {{ done, value }} = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, {{ stream: true }});
+    const lines = buffer.split('\\n');
+    buffer = lines.pop();
+    for (const line of lines) {{
+      if (!line.startsWith('data: ') || line === 'data: [DONE]') continue;
+      const data = JSON.parse(line.slice(6));
+      if (data.v && data.v.conversation_id) conversationId = data.v.conversation_id;
+      if (typeof data.v === 'string') {{
+        text += data.v;
+        output.textContent = text;
+      }}
+    }}
+  }}
+  stop.remove();
+  if (location.pathname === '/') history.replaceState(null, '', '/c/' + conversationId);
+}}
+
+document.getElementById('send').addEventListener('click', send);
+document.getElementById('prompt-textarea').addEventListener('keydown', (event) => {{
+  if (event.key === 'Enter' && !event.shiftKey) {{
+    event.preventDefault();
+    send();
+  }}
+}});
+</script>
+</body>
+</html>
+"""
+
+
+def create_app(
+    tokens: int = 40, token_interval: float = 0.02, hide_stream: bool = False
+) -> web.Application:
+    """Create the mock app; replies are ``tokens`` words ``token_interval`` apart."""
+    stream_path = HIDDEN_STREAM_PATH if hide_stream else STREAM_PATH
+
+    async def page(request: web.Request) -> web.Response:
+        conversation_id = request.match_info.get("conversation_id", "")
+        match = _CONVERSATION.match(conversation_id)
+        turns = int(match[1]) if match else 0
+        rendered = "".join(
+            '<article data-testid="conversation-turn" '
+            f'data-message-author-role="{"user" if index % 2 == 0 else "assistant"}">'
+            f'<div class="markdown">{html.escape(f"Turn {index}: " + "lorem ipsum " * 20)}</div>'
+            "</article>"
+            for index in range(turns)
+        )
+        body = PAGE.format(
+            turns=rendered,
+            stream_path=json.dumps(stream_path),
+            conversation_id=json.dumps(conversation_id or None),
+        )
+        return web.Response(text=body, content_type="text/html")
+
+    async def session(request: web.Request) -> web.Response:
+        return web.json_response({"user": {"id": "bench", "email": "bench@example.com"}})
+
+    async def conversation(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        conversation_id = body.get("conversation_id") or "bench-0"
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+
+        async def send(data: object) -> None:
+            await response.write(f"data: {json.dumps(data)}\n\n".encode())
+
+        await send(
+            {
+                "p": "",
+                "o": "add",
+                "v": {
+                    "message": {
+                        "author": {"role": "assistant"},
+                        "content": {"content_type": "text", "parts": [""]},
+                    },
+                    "conversation_id": conversation_id,
+                },
+            }
+        )
+        for index in range(tokens):
+            await asyncio.sleep(token_interval)
+            word = f"word{index} "
+            if index == 0:
+                await send({"p": "/message/content/parts/0", "o": "append", "v": word})
+            else:
+                await send({"v": word})
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/", page)
+    app.router.add_get("/c/{conversation_id}", page)
+    app.router.add_get("/api/auth/session", session)
+    app.router.add_post(stream_path, conversation)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--token-interval", type=float, default=0.02)
+    parser.add_argument("--hide-stream", action="store_true")
+    args = parser.parse_args()
+    web.run_app(
+        create_app(args.tokens, args.token_interval, args.hide_stream),
+        host="127.0.0.1",
+        port=args.port,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Response latency of the sidecar against the local mock ChatGPT page.
+
+Starts ``mock_chatgpt`` in-process and the sidecar (``node server.js``)
+pointed at it, then sends messages into conversations of increasing
+length through ``/api/chat/stream`` and reports time to first delta and
+to the complete answer. ``--hide-stream`` serves the reply on a path the
+sidecar's fetch hook does not watch, to measure the DOM polling fallback.
+
+Needs Node and the add-on's dependencies (``npm install`` and Playwright's
+Chromium) in the sidecar directory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+from pathlib import Path
+import statistics
+import tempfile
+import time
+
+import aiohttp
+from aiohttp import web
+
+from benchmarks.mock_chatgpt import create_app
+
+SIDECAR_DIR = Path(__file__).resolve().parent.parent / "chatgpt_plus_ha_addon" / "rootfs" / "app"
+
+
+async def _start_mock(port: int, args: argparse.Namespace) -> web.AppRunner:
+    runner = web.AppRunner(create_app(args.tokens, args.token_interval, args.hide_stream))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def _start_sidecar(
+    mock_port: int, port: int, session_dir: str, args: argparse.Namespace
+) -> asyncio.subprocess.Process:
+    env = {
+        **os.environ,
+        "CHATGPT_URL": f"http://127.0.0.1:{mock_port}",
+        "PORT": str(port),
+        "SESSION_DIR": session_dir,
+        "HEADLESS": "true",
+        "STREAM_START_TIMEOUT_MS": str(args.stream_start_timeout),
+    }
+    return await asyncio.create_subprocess_exec(
+        "node",
+        "server.js",
+        cwd=args.sidecar_dir,
+        env=env,
+        stdout=asyncio.subprocess.DEVNULL if not args.verbose else None,
+        stderr=asyncio.subprocess.DEVNULL if not args.verbose else None,
+    )
+
+
+async def _wait_ready(session: aiohttp.ClientSession, url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(f"{url}/api/status") as response:
+                if response.status == 200 and (await response.json()).get("isLoggedIn"):
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.5)
+    raise TimeoutError("Sidecar did not become ready")
+
+
+async def _timed_message(
+    session: aiohttp.ClientSession, url: str, conversation_id: str
+) -> tuple[float | None, float]:
+    """Return seconds to the first delta and to the done event."""
+    start = time.perf_counter()
+    first_delta = None
+    event = None
+    async with session.post(
+        f"{url}/api/chat/stream",
+        json={"message": "Benchmark message", "conversationId": conversation_id},
+    ) as response:
+        async for raw in response.content:
+            line = raw.decode().strip()
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                if event == "delta" and first_delta is None:
+                    first_delta = time.perf_counter() - start
+                elif event == "error":
+                    raise RuntimeError(line[5:].strip())
+                elif event == "done":
+                    break
+    return first_delta, time.perf_counter() - start
+
+
+def _summary(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "median": round(statistics.median(ordered), 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+    }
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    """Run the benchmark and return one result row per conversation length."""
+    mock = await _start_mock(args.mock_port, args)
+    url = f"http://127.0.0.1:{args.port}"
+    results = []
+    with tempfile.TemporaryDirectory() as session_dir:
+        sidecar = await _start_sidecar(args.mock_port, args.port, session_dir, args)
+        try:
+            async with aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=300)
+            ) as session:
+                await _wait_ready(session, url, args.startup_timeout)
+                for turns in args.turns:
+                    first, total = [], []
+                    for _ in range(args.repeat):
+                        first_delta, elapsed = await _timed_message(
+                            session, url, f"bench-{turns}"
+                        )
+                        if first_delta is not None:
+                            first.append(first_delta)
+                        total.append(elapsed)
+                    results.append(
+                        {
+                            "turns": turns,
+                            "first_delta": _summary(first) if first else None,
+                            "total": _summary(total),
+                        }
+                    )
+        finally:
+            sidecar.terminate()
+            await sidecar.wait()
+            await mock.cleanup()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, nargs="+", default=[0, 50, 200, 800])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--token-interval", type=float, default=0.02)
+    parser.add_argument("--hide-stream", action="store_true")
+    parser.add_argument("--stream-start-timeout", type=int, default=2000, help="ms")
+    parser.add_argument("--mock-port", type=int, default=8765)
+    parser.add_argument("--port", type=int, default=3765)
+    parser.add_argument("--startup-timeout", type=float, default=60)
+    parser.add_argument("--sidecar-dir", type=Path, default=SIDECAR_DIR)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Show sidecar output")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'turns':>6}  {'first delta (med/p95)':>22}  {'total (med/p95)':>18}")
+    for row in results:
+        first = row["first_delta"]
+        first_text = f"{first['median']:.3f}/{first['p95']:.3f}" if first else "-"
+        total = row["total"]
+        total_text = f"{total['median']:.3f}/{total['p95']:.3f}"
+        print(f"{row['turns']:>6}  {first_text:>22}  {total_text:>18}")
+
+
+if __name__ == "__main__":
+    main()
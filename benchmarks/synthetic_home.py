@@ -0,0 +1,492 @@
+"""Synthetic Home Assistant homes of any size for context benchmarks.
+
+``generate_home`` builds areas, devices and entities with attribute
+payloads shaped like real integrations', plus recorder and logbook
+histories over a time window. ``SyntheticHome.install`` points the
+registry, recorder and logbook lookups that ``build_context`` uses at the
+generated home, the same seams the unit tests patch.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import functools
+import random
+from typing import Any, Iterator
+
+from homeassistant.core import State
+from homeassistant.util import dt as dt_util
+
+from custom_components.chatgpt_plus_ha import context as ctx
+from custom_components.chatgpt_plus_ha import index as idx
+from custom_components.chatgpt_plus_ha import logbook_stream
+
+ROOMS = (
+    "Kitchen",
+    "Living Room",
+    "Bedroom",
+    "Bathroom",
+    "Office",
+    "Garage",
+    "Hallway",
+    "Basement",
+    "Dining Room",
+    "Laundry",
+    "Patio",
+    "Nursery",
+)
+
+# Domain, share of entities, device kind
+DOMAIN_MIX = (
+    ("sensor", 0.35, "Multisensor"),
+    ("binary_sensor", 0.15, "Motion Sensor"),
+    ("light", 0.15, "Smart Bulb"),
+    ("switch", 0.10, "Smart Plug"),
+    ("climate", 0.04, "Thermostat"),
+    ("cover", 0.05, "Blind Motor"),
+    ("lock", 0.03, "Smart Lock"),
+    ("media_player", 0.05, "Speaker"),
+    ("device_tracker", 0.05, "Phone"),
+    ("camera", 0.03, "Camera"),
+)
+
+# Domains whose attribute-only updates the recorder returns as significant
+SIGNIFICANT_DOMAINS = ("climate", "device_tracker", "humidifier", "water_heater")
+
+# Domains whose attributes keep updating between state changes
+ATTRIBUTE_UPDATE_DOMAINS = ("sensor", "climate")
+
+SENSOR_KINDS = (
+    ("temperature", "°C", lambda rng: f"{rng.uniform(16, 28):.1f}"),
+    ("humidity", "%", lambda rng: f"{rng.uniform(30, 70):.0f}"),
+    ("power", "W", lambda rng: f"{rng.uniform(0, 2500):.1f}"),
+    ("energy", "kWh", lambda rng: f"{rng.uniform(0, 9000):.2f}"),
+    ("illuminance", "lx", lambda rng: f"{rng.uniform(0, 1000):.0f}"),
+    ("battery", "%", lambda rng: str(rng.randint(5, 100))),
+)
+
+
+@dataclass(slots=True)
+class Area:
+    """Area registry entry."""
+
+    id: str
+    name: str
+
+
+@dataclass(slots=True)
+class Device:
+    """Device registry entry."""
+
+    id: str
+    name: str
+    area_id: str | None
+
+
+@dataclass(slots=True)
+class EntityEntry:
+    """Entity registry entry."""
+
+    entity_id: str
+    name: str | None
+    device_id: str | None
+    area_id: str | None
+    platform: str
+    disabled: bool = False
+
+
+class AreaRegistry:
+    """Area registry lookalike."""
+
+    def __init__(self, areas: list[Area]) -> None:
+        self.areas = areas
+
+    def async_list_areas(self) -> list[Area]:
+        return self.areas
+
+
+class DeviceRegistry:
+    """Device registry lookalike."""
+
+    def __init__(self, devices: dict[str, Device]) -> None:
+        self.devices = devices
+
+    def async_get(self, device_id: str) -> Device | None:
+        return self.devices.get(device_id)
+
+
+class EntityRegistry:
+    """Entity registry lookalike."""
+
+    def __init__(self, entities: dict[str, EntityEntry]) -> None:
+        self.entities = entities
+
+    def async_get(self, entity_id: str) -> EntityEntry | None:
+        return self.entities.get(entity_id)
+
+
+class States:
+    """State machine lookalike."""
+
+    def __init__(self, states: list[State]) -> None:
+        self._states = {state.entity_id: state for state in states}
+
+    def async_all(self) -> list[State]:
+        return list(self._states.values())
+
+    def get(self, entity_id: str) -> State | None:
+        return self._states.get(entity_id)
+
+
+class Config:
+    """Core config lookalike."""
+
+    def __init__(self) -> None:
+        self.components = {"recorder", "logbook"}
+
+
+class SyntheticHass:
+    """Just enough of HomeAssistant for build_context."""
+
+    def __init__(self, states: list[State]) -> None:
+        self.states = States(states)
+        self.config = Config()
+        self.data: dict[str, Any] = {}
+
+    async def async_add_executor_job(self, func, *args):
+        # Recorder jobs run inline so the benchmark times the work itself.
+        return func(*args)
+
+
+class LogbookProcessor:
+    """EventProcessor lookalike whose rows are already humanified."""
+
+    def __init__(self, entity_ids: list[str]) -> None:
+        self.entity_ids = entity_ids
+        self.event_types = ()
+
+    def humanify(self, rows: list[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        return iter(rows)
+
+
+@dataclass
+class SyntheticHome:
+    """A generated home and its histories."""
+
+    areas: list[Area]
+    devices: dict[str, Device]
+    entities: dict[str, EntityEntry]
+    states: list[State]
+    history: dict[str, list[State]]
+    logbook: dict[str, list[dict[str, Any]]]
+    now: datetime
+    hass: SyntheticHass = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.hass = SyntheticHass(self.states)
+
+    @property
+    def history_changes(self) -> int:
+        """Return the number of recorded state changes."""
+        return sum(
+            state.last_changed == state.last_updated
+            for rows in self.history.values()
+            for state in rows
+        )
+
+    @property
+    def history_rows(self) -> int:
+        """Return the number of recorded rows, attribute-only updates included."""
+        return sum(len(rows) for rows in self.history.values())
+
+    def install(self, monkeypatch) -> None:
+        """Serve registries, recorder history and logbook from this home."""
+        area_reg = AreaRegistry(self.areas)
+        device_reg = DeviceRegistry(self.devices)
+        entity_reg = EntityRegistry(self.entities)
+        monkeypatch.setattr(idx.area_registry, "async_get", lambda hass: area_reg)
+        monkeypatch.setattr(idx.device_registry, "async_get", lambda hass: device_reg)
+        monkeypatch.setattr(idx.entity_registry, "async_get", lambda hass: entity_reg)
+        monkeypatch.setattr(ctx, "get_instance", lambda hass: hass)
+        monkeypatch.setattr(
+            ctx.history, "get_significant_states", self._get_significant_states
+        )
+        monkeypatch.setattr(
+            ctx,
+            "async_create_event_processor",
+            lambda hass, entity_ids: LogbookProcessor(entity_ids),
+        )
+        monkeypatch.setattr(logbook_stream, "_iter_logbook_rows", self._iter_logbook_rows)
+
+    def _get_significant_states(
+        self,
+        hass,
+        start_time,
+        end_time=None,
+        entity_ids=None,
+        filters=None,
+        include_start_time_state=True,
+        significant_changes_only=True,
+        minimal_response=False,
+        no_attributes=False,
+        compressed_state_format=False,
+    ) -> dict[str, list[State]]:
+        states = {}
+        for entity_id in entity_ids or self.history:
+            rows = [
+                state
+                for state in self.history.get(entity_id, ())
+                if start_time <= state.last_updated <= (end_time or self.now)
+            ]
+            if significant_changes_only:
+                if entity_id.split(".", 1)[0] in SIGNIFICANT_DOMAINS:
+                    # last_changed is not read, so it reports last_updated
+                    rows = [
+                        State(
+                            entity_id,
+                            state.state,
+                            last_changed=state.last_updated,
+                            last_updated=state.last_updated,
+                        )
+                        for state in rows
+                    ]
+                else:
+                    rows = [
+                        state for state in rows if state.last_changed == state.last_updated
+                    ]
+            if rows:
+                states[entity_id] = rows
+        return states
+
+    def _iter_logbook_rows(
+        self, hass, event_processor, start_time, end_time
+    ) -> Iterator[list[dict[str, Any]]]:
+        rows = sorted(
+            (
+                entry
+                for entity_id in event_processor.entity_ids
+                for entry in self.logbook.get(entity_id, ())
+                if start_time <= entry["time"] <= end_time
+            ),
+            key=lambda entry: entry["time"],
+        )
+        for start in range(0, len(rows), logbook_stream.LOGBOOK_CHUNK_SIZE):
+            yield rows[start : start + logbook_stream.LOGBOOK_CHUNK_SIZE]
+
+
+def _slug(text: str) -> str:
+    return text.lower().replace(" ", "_")
+
+
+def _attributes(
+    domain: str, name: str, index: int, rng: random.Random
+) -> tuple[str, dict[str, Any]]:
+    """Return a state and attributes shaped like the domain's integrations'."""
+    attributes: dict[str, Any] = {"friendly_name": name}
+    if domain == "sensor":
+        device_class, unit, value = SENSOR_KINDS[index % len(SENSOR_KINDS)]
+        attributes.update(
+            device_class=device_class,
+            unit_of_measurement=unit,
+            state_class="measurement",
+        )
+        return value(rng), attributes
+    if domain == "binary_sensor":
+        attributes["device_class"] = rng.choice(("motion", "door", "window", "occupancy"))
+        return rng.choice(("on", "off")), attributes
+    if domain == "light":
+        on = rng.random() < 0.4
+        attributes.update(
+            supported_color_modes=["color_temp", "hs"],
+            color_mode="color_temp" if on else None,
+            brightness=rng.randint(1, 255) if on else None,
+            color_temp_kelvin=rng.randint(2200, 6500) if on else None,
+            min_color_temp_kelvin=2000,
+            max_color_temp_kelvin=6535,
+            supported_features=40,
+        )
+        return "on" if on else "off", attributes
+    if domain == "switch":
+        attributes["icon"] = "mdi:power-socket-eu"
+        return rng.choice(("on", "off")), attributes
+    if domain == "climate":
+        attributes.update(
+            hvac_modes=["off", "heat", "cool", "auto"],
+            min_temp=7,
+            max_temp=35,
+            current_temperature=round(rng.uniform(17, 24), 1),
+            temperature=round(rng.uniform(18, 22), 1),
+            preset_modes=["home", "away", "sleep", "eco"],
+            preset_mode="home",
+            supported_features=401,
+        )
+        return rng.choice(("heat", "off", "auto")), attributes
+    if domain == "cover":
+        attributes.update(current_position=rng.randint(0, 100), device_class="blind")
+        return rng.choice(("open", "closed")), attributes
+    if domain == "lock":
+        attributes["changed_by"] = rng.choice(("Keypad", "Alex", "Auto"))
+        return rng.choice(("locked", "unlocked")), attributes
+    if domain == "media_player":
+        attributes.update(
+            volume_level=round(rng.random(), 2),
+            is_volume_muted=False,
+            media_content_type="music",
+            media_title=f"Track {index}",
+            media_artist="Synthetic Artist",
+            source_list=["Radio", "Spotify", "TV", "Line In"],
+            entity_picture=f"/api/media_player_proxy/media_player.x?token={rng.getrandbits(128):032x}",
+        )
+        return rng.choice(("playing", "idle", "off")), attributes
+    if domain == "device_tracker":
+        attributes.update(
+            source_type="gps",
+            latitude=round(rng.uniform(-60, 60), 6),
+            longitude=round(rng.uniform(-180, 180), 6),
+            gps_accuracy=rng.randint(5, 50),
+            battery_level=rng.randint(5, 100),
+        )
+        return rng.choice(("home", "not_home")), attributes
+    if domain == "camera":
+        attributes.update(
+            access_token=f"{rng.getrandbits(256):064x}",
+            entity_picture=f"/api/camera_proxy/camera.x?token={rng.getrandbits(128):032x}",
+            brand="Synthetic",
+        )
+        return "idle", attributes
+    return "unknown", attributes
+
+
+@functools.lru_cache(maxsize=4)
+def generate_home(
+    entities: int,
+    areas: int | None = None,
+    devices: int | None = None,
+    history_hours: int = 24,
+    changes_per_entity: int = 6,
+    attribute_updates: int = 40,
+    history_share: float = 0.3,
+    seed: int = 0,
+) -> SyntheticHome:
+    """Generate a home with the given numbers of areas, devices and entities.
+
+    Areas default to about one per 40 entities and devices to one per three
+    entities. ``history_share`` of the entities get up to
+    ``changes_per_entity`` state changes spread over the last
+    ``history_hours``, each with a logbook entry. Sensors and climate
+    entities also record up to ``attribute_updates`` attribute-only
+    updates in between. Homes are cached, so treat them as read-only.
+    """
+    rng = random.Random(seed)
+    now = dt_util.utcnow()
+    area_count = areas or max(3, entities // 40)
+    device_count = devices or max(1, entities // 3)
+
+    area_list = []
+    for number in range(area_count):
+        room = ROOMS[number % len(ROOMS)]
+        name = room if number < len(ROOMS) else f"{room} {number // len(ROOMS) + 1}"
+        area_list.append(Area(_slug(name), name))
+
+    kinds = [
+        kind
+        for domain, share, kind in DOMAIN_MIX
+        for _ in range(max(1, round(share * 100)))
+    ]
+    device_map: dict[str, Device] = {}
+    for number in range(device_count):
+        area = area_list[number % area_count]
+        kind = rng.choice(kinds)
+        device_id = f"device{number:06d}"
+        device_map[device_id] = Device(device_id, f"{area.name} {kind} {number}", area.id)
+    device_ids = list(device_map)
+    area_names = {area.id: area.name for area in area_list}
+
+    domains = [
+        domain for domain, share, _kind in DOMAIN_MIX for _ in range(round(share * 100))
+    ]
+    entity_map: dict[str, EntityEntry] = {}
+    states: list[State] = []
+    history: dict[str, list[State]] = {}
+    logbook: dict[str, list[dict[str, Any]]] = {}
+    window = timedelta(hours=history_hours)
+    for number in range(entities):
+        domain = domains[number % len(domains)]
+        device = device_map[device_ids[number % device_count]]
+        # A few entities override their device's area or have no device.
+        area_id = rng.choice(area_list).id if rng.random() < 0.05 else None
+        device_id = None if rng.random() < 0.1 else device.id
+        area_name = area_names[area_id or device.area_id]
+        name = f"{area_name} {domain.replace('_', ' ').title()} {number}"
+        entity_id = f"{domain}.{_slug(name)}"
+        entity_map[entity_id] = EntityEntry(
+            entity_id,
+            name if rng.random() < 0.3 else None,
+            device_id,
+            area_id if device_id else (area_id or device.area_id),
+            domain,
+            disabled=rng.random() < 0.02,
+        )
+
+        state, attributes = _attributes(domain, name, number, rng)
+        last_changed = now - window * rng.random() * 3
+        if rng.random() < history_share:
+            offsets = sorted(
+                rng.random() for _ in range(rng.randint(1, changes_per_entity))
+            )
+            changes = []
+            for offset in offsets:
+                changed_at = now - window * (1 - offset)
+                changed_state, _ = _attributes(domain, name, number, rng)
+                changes.append(
+                    State(
+                        entity_id,
+                        changed_state,
+                        last_changed=changed_at,
+                        last_updated=changed_at,
+                    )
+                )
+            rows = list(changes)
+            if domain in ATTRIBUTE_UPDATE_DOMAINS:
+                for _ in range(rng.randint(0, attribute_updates)):
+                    updated_at = now - window * rng.random()
+                    previous = [
+                        change for change in changes if change.last_changed < updated_at
+                    ]
+                    if previous:
+                        rows.append(
+                            State(
+                                entity_id,
+                                previous[-1].state,
+                                last_changed=previous[-1].last_changed,
+                                last_updated=updated_at,
+                            )
+                        )
+                rows.sort(key=lambda row: row.last_updated)
+            history[entity_id] = rows
+            logbook[entity_id] = [
+                {
+                    "time": change.last_changed,
+                    "when": change.last_changed.isoformat(),
+                    "name": name,
+                    "entity_id": entity_id,
+                    "state": change.state,
+                }
+                for change in changes
+            ]
+            state = changes[-1].state
+            last_changed = changes[-1].last_changed
+        states.append(
+            State(
+                entity_id,
+                state,
+                {key: value for key, value in attributes.items() if value is not None},
+                last_changed=last_changed,
+                last_updated=last_changed,
+            )
+        )
+
+    return SyntheticHome(
+        area_list, device_map, entity_map, states, history, logbook, now
+    )
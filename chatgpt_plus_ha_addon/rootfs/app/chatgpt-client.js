@@ -7,11 +7,17 @@ import { chromium } from 'playwright';
 import fs from 'fs/promises';
 import path from 'path';
 import { v4 as uuidv4 } from 'uuid';
+import { PagePool } from './page-pool.js';
+import { ResponseStreamWatcher, installStreamHook } from './stream-parser.js';
 
-const CHATGPT_URL = 'https://chatgpt.com';
-const LOGIN_URL = 'https://chatgpt.com/auth/login';
-const SESSION_API_URL = 'https://chatgpt.com/api/auth/session';
+// Overridable so benchmarks can point the sidecar at a local mock page
+const CHATGPT_URL = process.env.CHATGPT_URL || 'https://chatgpt.com';
+const LOGIN_URL = `${CHATGPT_URL}/auth/login`;
+const SESSION_API_URL = `${CHATGPT_URL}/api/auth/session`;
 const RESPONSE_TIMEOUT_MS = Number(process.env.RESPONSE_TIMEOUT_MS) || 180000;
+// How long after sending to wait for the event stream before polling the DOM
+const STREAM_START_TIMEOUT_MS = Number(process.env.STREAM_START_TIMEOUT_MS) || 20000;
+const PAGE_POOL_SIZE = Number(process.env.PAGE_POOL_SIZE) || 1;
 
 // Selectors for ChatGPT interface (may need updates as UI changes)
 const SELECTORS = {
@@ -47,6 +53,8 @@ export class ChatGPTClient {
         this.browser = null;
         this.context = null;
         this.page = null;
+        this.pagePoolSize = options.pagePoolSize || PAGE_POOL_SIZE;
+        this.pagePool = null;
         this.isLoggedIn = false;
         this.currentConversationId = null;
     }
@@ -96,11 +104,27 @@ export class ChatGPTClient {
         }
 
         this.context = await this.browser.newContext(contextOptions);
+
+        // Tap the conversation event stream in every tab
+        await this.context.exposeBinding('__chatgptStream', (source, event) =>
+            this._onStreamEvent(source.page, event)
+        );
+        await this.context.addInitScript(installStreamHook);
+
         this.page = await this.context.newPage();
 
         // Navigate to ChatGPT
         await this.page.goto(CHATGPT_URL, { waitUntil: 'domcontentloaded' });
 
+        // Open the other chat tabs; the first tab doubles as the login page
+        this.pagePool = new PagePool(this.context, {
+            size: this.pagePoolSize,
+            url: CHATGPT_URL,
+            firstPage: this.page,
+        });
+        await this.pagePool.warm();
+        console.log(`Chat tabs ready: ${this.pagePool.size}`);
+
         // Check login status
         await this._checkLoginStatus();
 
@@ -181,6 +205,7 @@ export class ChatGPTClient {
             isLoggedIn: this.isLoggedIn,
             conversationId: this.currentConversationId,
             headless: this.headless,
+            pagePool: this.pagePool ? this.pagePool.stats() : null,
         };
     }
 
@@ -230,29 +255,53 @@ export class ChatGPTClient {
 
     /**
      * Send a message to ChatGPT and get the response
+     *
+     * Without a conversationId the message starts a new conversation.
+     * `onProgress(delta, { replace })` receives the text added to the answer
+     * as it is written, or all of it with `replace` set when it was rewritten.
      */
-    async sendMessage(message, conversationId = null) {
+    async sendMessage(message, conversationId = null, { onProgress = null } = {}) {
         await this._checkLoginStatus();
         if (!this.isLoggedIn) {
             throw new Error('Not logged in. Please authenticate first.');
         }
 
-        // If different conversation, navigate to it
-        if (conversationId && conversationId !== this.currentConversationId) {
-            await this.page.goto(`${CHATGPT_URL}/c/${conversationId}`, { waitUntil: 'domcontentloaded' });
-            this.currentConversationId = conversationId;
-            await this.page.waitForTimeout(1000);
+        const tab = await this.pagePool.acquire(conversationId);
+        try {
+            return await this._sendMessageOnTab(tab, message, conversationId, onProgress);
+        } finally {
+            tab.streamWatcher = null;
+            this.pagePool.release(tab);
+        }
+    }
+
+    async _sendMessageOnTab(tab, message, conversationId, onProgress) {
+        const { page } = tab;
+
+        if (conversationId) {
+            // If different conversation, navigate to it
+            if (conversationId !== tab.conversationId) {
+                await page.goto(`${CHATGPT_URL}/c/${conversationId}`, { waitUntil: 'domcontentloaded' });
+                tab.conversationId = conversationId;
+                await page.waitForTimeout(1000);
+            }
+        } else if (tab.conversationId || new URL(page.url()).pathname !== '/') {
+            await page.goto(CHATGPT_URL, { waitUntil: 'domcontentloaded' });
+            tab.conversationId = null;
+            await page.waitForTimeout(1000);
         }
 
-        const baseline = await this._snapshotAssistantMessages();
-        const userBaseline = await this._snapshotUserMessages();
-        const networkPromise = this._waitForNetworkResponse(RESPONSE_TIMEOUT_MS).catch((error) => {
+        const baseline = await this._snapshotAssistantMessages(page);
+        const userBaseline = await this._snapshotUserMessages(page);
+        const watcher = new ResponseStreamWatcher({ onProgress });
+        tab.streamWatcher = watcher;
+        const networkPromise = this._waitForNetworkResponse(tab, watcher, RESPONSE_TIMEOUT_MS).catch((error) => {
             console.warn('Network response capture failed:', error.message);
             return null;
         });
 
         // Find the message input
-        const input = await this._findMessageInput();
+        const input = await this._findMessageInput(page);
 
         if (!input) {
             throw new Error('Could not find message input field');
@@ -268,12 +317,12 @@ export class ChatGPTClient {
         }
 
         // Small delay before sending
-        await this.page.waitForTimeout(300);
+        await page.waitForTimeout(300);
 
         // Find and click send button
-        let sendButton = await this.page.$(SELECTORS.sendButton);
+        let sendButton = await page.$(SELECTORS.sendButton);
         if (!sendButton) {
-            sendButton = await this.page.$(SELECTORS.sendButtonFallback);
+            sendButton = await page.$(SELECTORS.sendButtonFallback);
         }
 
         if (sendButton) {
@@ -290,68 +339,89 @@ export class ChatGPTClient {
             await input.press('Enter');
         }
 
-        const posted = await this._waitForSendConfirmation(userBaseline, message);
+        const posted = await this._waitForSendConfirmation(page, userBaseline, message);
         if (!posted) {
             console.warn('Send did not register, retrying Enter key');
             await input.focus();
             await input.press('Enter');
-            const postedAfterRetry = await this._waitForSendConfirmation(userBaseline, message, 8000);
+            const postedAfterRetry = await this._waitForSendConfirmation(page, userBaseline, message, 8000);
             if (!postedAfterRetry) {
                 throw new Error('Failed to submit message to ChatGPT');
             }
         }
 
         // Wait for response
-        const response = await this._waitForAssistantResponse({
+        const response = await this._waitForAssistantResponse(page, {
             baseline,
             timeout: RESPONSE_TIMEOUT_MS,
             networkPromise,
+            onProgress,
         });
 
         // Extract conversation ID from URL if not set
-        if (!this.currentConversationId) {
-            const url = this.page.url();
+        if (!tab.conversationId) {
+            const url = page.url();
             const match = url.match(/\/c\/([a-f0-9-]+)/);
             if (match) {
-                this.currentConversationId = match[1];
+                tab.conversationId = match[1];
             } else {
-                this.currentConversationId = uuidv4();
+                tab.conversationId = uuidv4();
             }
         }
+        this.currentConversationId = tab.conversationId;
 
         return {
             success: true,
             message: response,
-            conversationId: this.currentConversationId,
+            conversationId: tab.conversationId,
         };
     }
 
     /**
-     * Wait for ChatGPT to finish responding
+     * Wait for ChatGPT to finish responding by polling the DOM
+     *
+     * Each poll is one round trip that reads only the message count and
+     * the last message, so its cost does not grow with the conversation.
      */
-    async _waitForResponse({ baseline, timeout = RESPONSE_TIMEOUT_MS } = {}) {
+    async _waitForResponse(page, { baseline, timeout = RESPONSE_TIMEOUT_MS, onProgress = null } = {}) {
         const startTime = Date.now();
         const stableCyclesRequired = 5;
         let stableCycles = 0;
         let noStreamCycles = 0;
         let hasResponseStarted = false;
 
-        const initialSnapshot = baseline || (await this._snapshotAssistantMessages());
+        const initialSnapshot = baseline || (await this._snapshotAssistantMessages(page));
         const baselineCount = initialSnapshot.count;
         const baselineText = initialSnapshot.text;
         let lastText = baselineText;
+        // The DOM is read whole on every poll; the first update replaces
+        // anything a failed network stream already reported.
+        let reported = null;
+        const progress = (text) => {
+            if (!onProgress || text === reported) {
+                return;
+            }
+            if (reported !== null && text.startsWith(reported)) {
+                onProgress(text.slice(reported.length), { replace: false });
+            } else {
+                onProgress(text, { replace: true });
+            }
+            reported = text;
+        };
 
         while (Date.now() - startTime < timeout) {
-            const messages = await this._getAssistantMessages();
-            const currentCount = messages.length;
-            const currentText = await this._getLastMessageText(messages);
-            const streamingIndicator = await this.page.$(SELECTORS.streamingIndicator);
-            const regenerateButton = await this.page.$(SELECTORS.regenerateButton);
+            const snapshot = await this._snapshotAssistantMessages(page);
+            const currentCount = snapshot.count;
+            const currentText = snapshot.text;
+            const { streaming, regenerate } = snapshot;
 
             if (!hasResponseStarted) {
                 if (currentCount > baselineCount || (currentText && currentText !== baselineText)) {
                     hasResponseStarted = true;
                     lastText = currentText || lastText;
+                    if (currentText) {
+                        progress(currentText);
+                    }
                 }
             } else if (currentText) {
                 if (currentText === lastText) {
@@ -359,9 +429,10 @@ export class ChatGPTClient {
                 } else {
                     stableCycles = 0;
                     lastText = currentText;
+                    progress(currentText);
                 }
 
-                if (!streamingIndicator || regenerateButton) {
+                if (!streaming || regenerate) {
                     noStreamCycles += 1;
                 } else {
                     noStreamCycles = 0;
@@ -372,13 +443,13 @@ export class ChatGPTClient {
                 }
 
                 if (stableCycles >= stableCyclesRequired) {
-                    if (!streamingIndicator || regenerateButton || stableCycles >= stableCyclesRequired + 2) {
+                    if (!streaming || regenerate || stableCycles >= stableCyclesRequired + 2) {
                         return currentText.trim();
                     }
                 }
             }
 
-            await this.page.waitForTimeout(500);
+            await page.waitForTimeout(500);
         }
 
         if (hasResponseStarted && lastText) {
@@ -389,100 +460,76 @@ export class ChatGPTClient {
         throw new Error('Timeout waiting for response');
     }
 
-    async _waitForAssistantResponse({ baseline, timeout, networkPromise } = {}) {
-        const domPromise = this._waitForResponse({ baseline, timeout }).catch((error) => {
+    /**
+     * Follow the backend's event stream, polling the DOM only if it fails
+     */
+    async _waitForAssistantResponse(page, { baseline, timeout, networkPromise, onProgress = null } = {}) {
+        const startTime = Date.now();
+        if (networkPromise) {
+            const networkResult = await networkPromise;
+            if (networkResult) {
+                return networkResult;
+            }
+            console.warn('Falling back to DOM polling for the response');
+        }
+
+        const remaining = Math.max(timeout - (Date.now() - startTime), 1000);
+        const domResult = await this._waitForResponse(page, { baseline, timeout: remaining, onProgress }).catch((error) => {
             console.warn('DOM response capture failed:', error.message);
             return null;
         });
-        const networkSafe = networkPromise || Promise.resolve(null);
-
-        const first = await Promise.race([domPromise, networkSafe]);
-        if (first) {
-            return first;
-        }
-
-        const [domResult, networkResult] = await Promise.all([domPromise, networkSafe]);
         if (domResult) {
             return domResult;
         }
-        if (networkResult) {
-            return networkResult;
-        }
 
         throw new Error('Failed to capture assistant response');
     }
 
-    async _snapshotAssistantMessages() {
-        const messages = await this._getAssistantMessages();
-        return {
-            count: messages.length,
-            text: await this._getLastMessageText(messages),
-        };
-    }
-
-    async _snapshotUserMessages() {
-        const messages = await this._getUserMessages();
-        return {
-            count: messages.length,
-            text: await this._getLastUserMessageText(messages),
-        };
-    }
-
-    async _getAssistantMessages() {
-        let messages = await this.page.$$(SELECTORS.assistantMessage);
-        if (!messages.length) {
-            messages = await this.page.$$(SELECTORS.assistantMessageFallback);
-        }
-        return messages;
-    }
-
-    async _getUserMessages() {
-        let messages = await this.page.$$(SELECTORS.userMessage);
-        if (!messages.length) {
-            messages = await this.page.$$(SELECTORS.userMessageFallback);
-        }
-        return messages;
+    async _snapshotAssistantMessages(page) {
+        return this._snapshotMessages(page, SELECTORS.assistantMessage, SELECTORS.assistantMessageFallback);
     }
 
-    async _getLastMessageText(messages) {
-        if (!messages.length) {
-            return '';
-        }
-        const lastMessage = messages[messages.length - 1];
-        try {
-            const markdown = await lastMessage.$('.markdown');
-            if (markdown) {
-                const text = await markdown.innerText();
-                return text ? text.trim() : '';
-            }
-        } catch {
-            // Fall back to generic text extraction.
-        }
-        const text = await lastMessage.innerText();
-        return text ? text.trim() : '';
+    async _snapshotUserMessages(page) {
+        return this._snapshotMessages(page, SELECTORS.userMessage, SELECTORS.userMessageFallback);
     }
 
-    async _waitForNetworkResponse(timeout) {
-        const response = await this.page.waitForResponse(
-            (resp) => {
-                const url = resp.url();
-                if (!url.includes('/backend-api/conversation')) {
-                    return false;
-                }
-                const request = resp.request();
-                if (request.method() !== 'POST') {
-                    return false;
+    /**
+     * Count the messages of one role and read the last one in a single round trip
+     */
+    async _snapshotMessages(page, selector, fallbackSelector) {
+        return page.evaluate(
+            ({ selector, fallbackSelector, streamingSelector, regenerateSelector }) => {
+                let messages = document.querySelectorAll(selector);
+                if (!messages.length) {
+                    messages = document.querySelectorAll(fallbackSelector);
                 }
-                return true;
+                const last = messages[messages.length - 1];
+                const container = last ? last.querySelector('.markdown') || last : null;
+                return {
+                    count: messages.length,
+                    text: container ? (container.innerText || '').trim() : '',
+                    streaming: Boolean(document.querySelector(streamingSelector)),
+                    regenerate: Boolean(document.querySelector(regenerateSelector)),
+                };
             },
-            { timeout }
+            {
+                selector,
+                fallbackSelector,
+                streamingSelector: SELECTORS.streamingIndicator,
+                regenerateSelector: SELECTORS.regenerateButton,
+            }
         );
+    }
 
-        const text = await response.text();
-        const payload = this._extractAssistantFromSse(text);
+    /**
+     * Wait for the reply on the conversation event stream tapped by the fetch hook
+     */
+    async _waitForNetworkResponse(tab, watcher, timeout) {
+        await this._withTimeout(watcher.started, STREAM_START_TIMEOUT_MS, 'Response stream did not start');
+        const payload = await this._withTimeout(watcher.finished, timeout, 'Timeout waiting for response stream');
         console.log('Captured assistant response from network stream');
         if (payload.conversationId) {
-            this.currentConversationId = payload.conversationId;
+            tab.conversationId = payload.conversationId;
         }
         if (!payload.text) {
             throw new Error('No assistant message in network response');
@@ -490,76 +537,54 @@ export class ChatGPTClient {
         return payload.text;
     }
 
-    _extractAssistantFromSse(raw) {
-        const lines = raw.split('\n');
-        let latestText = '';
-        let conversationId = null;
-
-        for (const line of lines) {
-            const trimmed = line.trim();
-            if (!trimmed.startsWith('data:')) {
-                continue;
-            }
-            const payload = trimmed.slice(5).trim();
-            if (!payload || payload === '[DONE]') {
-                continue;
-            }
-            try {
-                const data = JSON.parse(payload);
-                conversationId = data.conversation_id || data.conversationId || conversationId;
-                const message = data.message;
-                if (message && message.author && message.author.role === 'assistant') {
-                    const content = message.content || {};
-                    const parts = Array.isArray(content.parts) ? content.parts : [];
-                    const text = parts.filter((part) => typeof part === 'string').join('\n').trim();
-                    if (text) {
-                        latestText = text;
-                    }
-                }
-            } catch {
-                // Ignore malformed lines.
-            }
+    _onStreamEvent(page, event) {
+        const tab = this.pagePool ? this.pagePool.tabs.find((candidate) => candidate.page === page) : null;
+        if (tab && tab.streamWatcher) {
+            tab.streamWatcher.handle(event);
         }
-
-        return { text: latestText, conversationId };
     }
 
-    async _getLastUserMessageText(messages) {
-        return this._getLastMessageText(messages);
+    async _withTimeout(promise, timeout, message) {
+        let timer = null;
+        const expired = new Promise((_, reject) => {
+            timer = setTimeout(() => reject(new Error(message)), timeout);
+        });
+        try {
+            return await Promise.race([promise, expired]);
+        } finally {
+            clearTimeout(timer);
+        }
     }
 
-    async _waitForSendConfirmation(baseline, message, timeout = 10000) {
+    async _waitForSendConfirmation(page, baseline, message, timeout = 10000) {
         const startTime = Date.now();
         const prefix = message.trim().slice(0, 40);
         while (Date.now() - startTime < timeout) {
-            const userMessages = await this._getUserMessages();
-            const lastUserText = await this._getLastUserMessageText(userMessages);
-            const streamingIndicator = await this.page.$(SELECTORS.streamingIndicator);
-            const regenerateButton = await this.page.$(SELECTORS.regenerateButton);
+            const snapshot = await this._snapshotUserMessages(page);
 
-            if (userMessages.length > baseline.count) {
+            if (snapshot.count > baseline.count) {
                 return true;
             }
 
-            if (prefix && lastUserText && lastUserText.includes(prefix)) {
+            if (prefix && snapshot.text && snapshot.text.includes(prefix)) {
                 return true;
             }
 
-            if (streamingIndicator || regenerateButton) {
+            if (snapshot.streaming || snapshot.regenerate) {
                 return true;
             }
 
-            await this.page.waitForTimeout(300);
+            await page.waitForTimeout(300);
         }
 
         return false;
     }
 
-    async _findMessageInput(timeout = 15000) {
+    async _findMessageInput(page, timeout = 15000) {
         const selectors = [SELECTORS.messageInput, SELECTORS.textareaFallback];
         for (const selector of selectors) {
             try {
-                const handle = await this.page.waitForSelector(selector, {
+                const handle = await page.waitForSelector(selector, {
                     state: 'visible',
                     timeout,
                 });
@@ -582,10 +607,8 @@ export class ChatGPTClient {
             throw new Error('Not logged in. Please authenticate first.');
         }
 
-        // Navigate to home page for new conversation
-        await this.page.goto(CHATGPT_URL, { waitUntil: 'domcontentloaded' });
-        await this.page.waitForTimeout(1000);
-
+        // Messages without a conversation ID open a fresh chat on whichever
+        // tab serves them, so there is nothing to navigate here.
         this.currentConversationId = null;
 
         return {
@@ -623,6 +646,9 @@ export class ChatGPTClient {
     async clearSession() {
         this.isLoggedIn = false;
         this.currentConversationId = null;
+        if (this.pagePool) {
+            this.pagePool.resetConversations();
+        }
 
         if (this.context) {
             try {
@@ -0,0 +1,126 @@
+/**
+ * Pool of pre-warmed ChatGPT tabs sharing one browser context
+ */
+
+export class PagePool {
+    /**
+     * @param {import('playwright').BrowserContext} context
+     * @param {object} options
+     * @param {number} options.size - Number of tabs to keep open
+     * @param {string} options.url - Page every tab is warmed up on
+     * @param {import('playwright').Page} [options.firstPage] - Existing tab to reuse as tab 0
+     */
+    constructor(context, { size = 1, url, firstPage = null } = {}) {
+        this.context = context;
+        this.size = Math.max(1, size);
+        this.url = url;
+        this.firstPage = firstPage;
+        this.tabs = [];
+        this.waiters = [];
+        this.leases = 0;
+        this.waited = 0;
+    }
+
+    /**
+     * Open and load the tabs
+     */
+    async warm() {
+        const pages = this.firstPage ? [this.firstPage] : [];
+        while (pages.length < this.size) {
+            pages.push(await this.context.newPage());
+        }
+        // Tab 0 is loaded by the caller when it was passed in.
+        await Promise.all(
+            pages.slice(this.firstPage ? 1 : 0).map((page) =>
+                page.goto(this.url, { waitUntil: 'domcontentloaded' })
+            )
+        );
+        this.tabs = pages.map((page, id) => ({ id, page, conversationId: null, busy: false }));
+    }
+
+    /**
+     * Lease a tab, preferring the one that owns conversationId, then one
+     * without a conversation. Waits in arrival order when all tabs are busy.
+     */
+    async acquire(conversationId = null) {
+        this.leases += 1;
+        const owner = conversationId ? this.ownerOf(conversationId) : null;
+        if (owner && !owner.busy) {
+            return this._lease(owner);
+        }
+        // A busy owner is worth waiting for: moving the conversation to
+        // another tab means reloading it there.
+        if (!owner) {
+            const idle = this.tabs.filter((tab) => !tab.busy);
+            const tab = idle.find((candidate) => !candidate.conversationId) || idle[0];
+            if (tab) {
+                return this._lease(tab);
+            }
+        }
+
+        this.waited += 1;
+        return new Promise((resolve) => {
+            this.waiters.push({ conversationId, resolve });
+        });
+    }
+
+    /**
+     * Return a leased tab to the pool
+     */
+    release(tab) {
+        tab.busy = false;
+        if (!this.waiters.length) {
+            return;
+        }
+        // Hand the tab to the first waiter for its conversation, else the oldest
+        // waiter whose conversation is not held by another tab.
+        let index = this.waiters.findIndex(
+            (waiter) => waiter.conversationId && waiter.conversationId === tab.conversationId
+        );
+        if (index === -1) {
+            index = this.waiters.findIndex((waiter) => {
+                const owner = waiter.conversationId ? this.ownerOf(waiter.conversationId) : null;
+                return !owner || owner === tab;
+            });
+        }
+        if (index === -1) {
+            return;
+        }
+        const [waiter] = this.waiters.splice(index, 1);
+        waiter.resolve(this._lease(tab));
+    }
+
+    /**
+     * Find the tab holding a conversation
+     */
+    ownerOf(conversationId) {
+        return this.tabs.find((tab) => tab.conversationId === conversationId) || null;
+    }
+
+    /**
+     * Forget which conversation every tab holds
+     */
+    resetConversations() {
+        for (const tab of this.tabs) {
+            tab.conversationId = null;
+        }
+    }
+
+    stats() {
+        const busy = this.tabs.filter((tab) => tab.busy).length;
+        return {
+            size: this.tabs.length,
+            busy,
+            idle: this.tabs.length - busy,
+            waiting: this.waiters.length,
+            conversations: this.tabs.filter((tab) => tab.conversationId).length,
+            leases: this.leases,
+            waited: this.waited,
+        };
+    }
+
+    _lease(tab) {
+        tab.busy = true;
+        return tab;
+    }
+}
@@ -48,8 +48,13 @@ app.use((req, res, next) => {
 const PORT = process.env.PORT || 3000;
 const HEADLESS = process.env.HEADLESS !== 'false';
 const SESSION_DIR = process.env.SESSION_DIR || './session';
+const PAGE_POOL_SIZE = Math.min(Math.max(Number(process.env.PAGE_POOL_SIZE) || 1, 1), 4);
 const VNC_HOST = process.env.VNC_HOST || '127.0.0.1';
 const VNC_PORT = Number(process.env.VNC_PORT || 5900);
+// Comment lines sent on /api/chat/stream until the first delta, so clients
+// with a read timeout can tell a request waiting for a tab or for ChatGPT
+// to start answering from a dead connection
+const STREAM_KEEPALIVE_MS = 15000;
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
 const novncPath = path.resolve(__dirname, 'node_modules', '@novnc', 'novnc');
@@ -69,6 +74,7 @@ async function _logNoVncStatus() {
 const chatgptClient = new ChatGPTClient({
   headless: HEADLESS,
   sessionDir: SESSION_DIR,
+  pagePoolSize: PAGE_POOL_SIZE,
 });
 
 // Track initialization status
@@ -375,6 +381,70 @@ app.post('/api/chat', checkInitialized, async (req, res) => {
   }
 });
 
+/**
+ * Send a message to ChatGPT and stream the answer as it is written
+ * POST /api/chat/stream
+ * Body: { message: string, conversationId?: string }
+ * Server-sent events: `delta` with { delta } carrying the text added to
+ * the answer, or { delta, replace: true } carrying all of it when it was
+ * rewritten, then `done` with the /api/chat response body, or `error`.
+ * Until the first delta a `: keepalive` comment is sent every
+ * STREAM_KEEPALIVE_MS.
+ */
+app.post('/api/chat/stream', checkInitialized, async (req, res) => {
+  const { message, conversationId } = req.body;
+
+  if (!message || typeof message !== 'string') {
+    return res.status(400).json({
+      error: 'Invalid request',
+      message: 'Message is required and must be a string',
+    });
+  }
+
+  console.log(`Received streaming chat request: "${message.substring(0, 50)}..."`);
+
+  res.writeHead(200, {
+    'Content-Type': 'text/event-stream',
+    'Cache-Control': 'no-cache',
+    Connection: 'keep-alive',
+    'X-Accel-Buffering': 'no',
+  });
+  res.flushHeaders();
+
+  const sendEvent = (event, data) => {
+    if (!res.writableEnded) {
+      res.write(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`);
+    }
+  };
+
+  const keepalive = setInterval(() => {
+    if (!res.writableEnded) {
+      res.write(': keepalive\n\n');
+    }
+  }, STREAM_KEEPALIVE_MS);
+  const stopKeepalive = () => clearInterval(keepalive);
+  // The request's own close event fires once its body is read
+  res.on('close', stopKeepalive);
+
+  const onProgress = (delta, { replace = false } = {}) => {
+    stopKeepalive();
+    sendEvent('delta', replace ? { delta, replace: true } : { delta });
+  };
+
+  try {
+    const response = await chatgptClient.sendMessage(message, conversationId, { onProgress });
+    sendEvent('done', response);
+  } catch (error) {
+    console.error('Error streaming message:', error);
+    sendEvent('error', {
+      error: 'Failed to send message',
+      message: error.message,
+    });
+  }
+  stopKeepalive();
+  res.end();
+});
+
 /**
  * Start a new conversation
  */
@@ -396,6 +466,10 @@ app.post('/api/conversation/new', checkInitialized, async (req, res) => {
 // ============================================
 
 const server = http.createServer(app);
+// Outlive the integration's pooled keep-alive connections (60s) so they are
+// never closed by the server just as they are reused.
+server.keepAliveTimeout = 75000;
+server.headersTimeout = 76000;
 const wss = new WebSocketServer({ noServer: true });
 
 wss.on('connection', (ws) => {
@@ -0,0 +1,358 @@
+/**
+ * Incremental parsing of ChatGPT's conversation event stream
+ */
+
+const ASSISTANT_TEXT_PATH = /^\/message\/content\/parts\/(\d+)$/;
+
+/**
+ * Parses the backend's server-sent events chunk by chunk.
+ *
+ * Handles both the full-message format (every event carries the whole
+ * message so far) and the delta format (an initial message followed by
+ * JSON-patch-like `append` operations). Appends only grow a pending delta
+ * and the parts are joined when the text is read, so work per chunk
+ * depends only on the chunk. Rewrites of earlier text are the exception:
+ * they are reported with the whole text.
+ */
+export class ConversationStreamParser {
+    constructor() {
+        this.buffer = '';
+        this.parts = [];
+        this.conversationId = null;
+        this.done = false;
+        this._assistant = false;
+        this._lastPath = null;
+        this._text = '';
+        this._textStale = false;
+        // Raw text appended since the last delta was taken
+        this._pending = '';
+        this._replaced = false;
+        this._started = false;
+    }
+
+    get text() {
+        if (this._textStale) {
+            this._text = this.parts.join('\n').trim();
+            this._textStale = false;
+        }
+        return this._text;
+    }
+
+    /**
+     * Take the text added since the last call. When the text was rewritten
+     * rather than extended, returns all of it with `replace` set. The deltas
+     * add up to `text`: leading and trailing whitespace is held back.
+     */
+    takeDelta() {
+        let delta;
+        let replace = false;
+        if (this._replaced) {
+            const raw = this.parts.join('\n');
+            delta = this.text;
+            replace = true;
+            this._pending = delta ? raw.slice(raw.trimEnd().length) : '';
+            this._started = Boolean(delta);
+            this._replaced = false;
+        } else {
+            let pending = this._pending;
+            if (!this._started) {
+                pending = pending.trimStart();
+            }
+            delta = pending.trimEnd();
+            this._pending = pending.slice(delta.length);
+            this._started = this._started || Boolean(delta);
+        }
+        return { delta, replace };
+    }
+
+    /**
+     * Feed a decoded chunk; returns true when the assistant text changed
+     */
+    push(chunk) {
+        const buffer = this.buffer + chunk;
+        let changed = false;
+        let start = 0;
+        let newline = buffer.indexOf('\n', start);
+        while (newline !== -1) {
+            const line = buffer.slice(start, newline).trim();
+            if (line.startsWith('data:')) {
+                changed = this._handleData(line.slice(5).trim()) || changed;
+            }
+            start = newline + 1;
+            newline = buffer.indexOf('\n', start);
+        }
+        this.buffer = buffer.slice(start);
+        return changed;
+    }
+
+    /**
+     * Flush a final line that had no trailing newline
+     */
+    finish() {
+        const changed = this.buffer ? this.push('\n') : false;
+        this.done = true;
+        return changed;
+    }
+
+    _handleData(payload) {
+        if (!payload) {
+            return false;
+        }
+        if (payload === '[DONE]') {
+            this.done = true;
+            return false;
+        }
+        let data;
+        try {
+            data = JSON.parse(payload);
+        } catch {
+            return false;
+        }
+        if (!data || typeof data !== 'object') {
+            return false;
+        }
+
+        this.conversationId = data.conversation_id || data.conversationId || this.conversationId;
+
+        if (data.message) {
+            return this._handleMessage(data.message);
+        }
+        if (data.v !== undefined) {
+            return this._handleDelta(data);
+        }
+        return false;
+    }
+
+    _handleMessage(message) {
+        this._assistant = Boolean(message.author && message.author.role === 'assistant');
+        if (!this._assistant) {
+            return false;
+        }
+        const content = message.content || {};
+        const parts = Array.isArray(content.parts)
+            ? content.parts.filter((part) => typeof part === 'string')
+            : [];
+        if (!parts.some((part) => part.trim())) {
+            return false;
+        }
+        // The message arrived whole in this chunk, so comparing it is per-chunk work
+        const previous = this.parts;
+        const last = previous.length - 1;
+        const extended = parts.length >= previous.length
+            && previous.every((part, index) => (
+                index === last ? parts[index].startsWith(part) : parts[index] === part
+            ));
+        if (!extended) {
+            this._replace(parts);
+            return true;
+        }
+        let appended = last >= 0 ? parts[last].slice(previous[last].length) : '';
+        for (let index = last + 1; index < parts.length; index += 1) {
+            appended += (index > 0 ? '\n' : '') + parts[index];
+        }
+        this.parts = parts;
+        return this._append(appended);
+    }
+
+    _replace(parts) {
+        this.parts = parts;
+        this._textStale = true;
+        this._replaced = true;
+        this._pending = '';
+    }
+
+    _append(text) {
+        if (!text) {
+            return false;
+        }
+        this._textStale = true;
+        if (!this._replaced) {
+            this._pending += text;
+        }
+        return true;
+    }
+
+    _handleDelta(data) {
+        const { p: path, o: op, v: value } = data;
+
+        // A new message: { v: { message: {...} } }, optionally with o: "add"
+        if (value && typeof value === 'object' && !Array.isArray(value) && value.message) {
+            this.conversationId = value.conversation_id || this.conversationId;
+            this._lastPath = null;
+            return this._handleMessage(value.message);
+        }
+
+        if (op === 'patch' && Array.isArray(value)) {
+            let changed = false;
+            for (const operation of value) {
+                changed = this._applyOperation(operation.p, operation.o, operation.v) || changed;
+            }
+            return changed;
+        }
+
+        return this._applyOperation(path, op, value);
+    }
+
+    _applyOperation(path, op, value) {
+        // Operations without a path continue the previous one
+        const target = path || this._lastPath;
+        if (path) {
+            this._lastPath = path;
+        }
+        if (!this._assistant || typeof value !== 'string' || !target) {
+            return false;
+        }
+        const match = ASSISTANT_TEXT_PATH.exec(target);
+        if (!match) {
+            return false;
+        }
+        const index = Number(match[1]);
+        if (op === 'replace') {
+            while (this.parts.length <= index) {
+                this.parts.push('');
+            }
+            this.parts[index] = value;
+            this._replace(this.parts);
+            return true;
+        }
+        if ((op && op !== 'append') || !value) {
+            return false;
+        }
+        const last = this.parts.length - 1;
+        if (index < last) {
+            // Appending to an earlier part rewrites the middle of the text
+            this.parts[index] += value;
+            this._replace(this.parts);
+            return true;
+        }
+        // Parts added on the way are joined with newlines
+        const separators = '\n'.repeat(index - Math.max(last, 0));
+        while (this.parts.length <= index) {
+            this.parts.push('');
+        }
+        this.parts[index] += value;
+        return this._append(separators + value);
+    }
+}
+
+/**
+ * Follows one response stream reported by the page's fetch hook
+ */
+export class ResponseStreamWatcher {
+    constructor({ onProgress = null } = {}) {
+        this.onProgress = onProgress;
+        this.parser = null;
+        this.streamId = null;
+        this.started = new Promise((resolve) => {
+            this._resolveStarted = resolve;
+        });
+        this.finished = new Promise((resolve, reject) => {
+            this._resolveFinished = resolve;
+            this._rejectFinished = reject;
+        });
+        // Callers may stop listening after a fallback; never leave a rejection unhandled.
+        this.finished.catch(() => {});
+    }
+
+    handle(event) {
+        if (event.kind === 'start') {
+            if (this.streamId !== null) {
+                return;
+            }
+            this.streamId = event.id;
+            this.parser = new ConversationStreamParser();
+            this._resolveStarted();
+            return;
+        }
+        if (event.id !== this.streamId || !this.parser) {
+            return;
+        }
+        if (event.kind === 'chunk') {
+            if (this.parser.push(event.data || '')) {
+                this._progress();
+            }
+        } else if (event.kind === 'end') {
+            if (this.parser.finish()) {
+                this._progress();
+            }
+            this._resolveFinished({
+                text: this.parser.text,
+                conversationId: this.parser.conversationId,
+            });
+        } else if (event.kind === 'error') {
+            this._rejectFinished(new Error(`Response stream failed: ${event.data}`));
+        }
+    }
+
+    _progress() {
+        if (!this.onProgress) {
+            return;
+        }
+        const { delta, replace } = this.parser.takeDelta();
+        if (delta || replace) {
+            this.onProgress(delta, { replace });
+        }
+    }
+}
+
+/**
+ * Extract the assistant reply from a complete event stream body
+ */
+export function extractAssistantFromSse(raw) {
+    const parser = new ConversationStreamParser();
+    parser.push(raw);
+    parser.finish();
+    return { text: parser.text, conversationId: parser.conversationId };
+}
+
+/**
+ * Runs in the page: tees conversation responses to the Node side
+ * through the exposed `__chatgptStream` binding.
+ */
+export function installStreamHook() {
+    if (window.__chatgptStreamHooked) {
+        return;
+    }
+    window.__chatgptStreamHooked = true;
+    const originalFetch = window.fetch;
+    let nextId = 0;
+
+    window.fetch = async function hookedFetch(...args) {
+        const response = await originalFetch.apply(this, args);
+        try {
+            const [resource, init] = args;
+            const url = new URL(typeof resource === 'string' ? resource : resource.url, location.href);
+            const method = ((init && init.method) || (resource && resource.method) || 'GET').toUpperCase();
+            if (
+                method !== 'POST'
+                || !/\/backend-api\/(f\/)?conversation$/.test(url.pathname)
+                || typeof window.__chatgptStream !== 'function'
+                || !response.body
+            ) {
+                return response;
+            }
+
+            const id = ++nextId;
+            const reader = response.clone().body.getReader();
+            const decoder = new TextDecoder();
+            window.__chatgptStream({ id, kind: 'start' });
+            (async () => {
+                try {
+                    for (;;) {
+                        const { done, value } = await reader.read();
+                        if (done) {
+                            break;
+                        }
+                        window.__chatgptStream({ id, kind: 'chunk', data: decoder.decode(value, { stream: true }) });
+                    }
+                    window.__chatgptStream({ id, kind: 'end' });
+                } catch (error) {
+                    window.__chatgptStream({ id, kind: 'error', data: String(error) });
+                }
+            })();
+        } catch {
+            // Never break the page's own request.
+        }
+        return response;
+    };
+}
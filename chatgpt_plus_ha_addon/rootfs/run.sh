@@ -3,6 +3,8 @@
 # Set environment variables from Add-on config
 export HEADLESS
 HEADLESS="$(bashio::config 'headless')"
+export PAGE_POOL_SIZE
+PAGE_POOL_SIZE="$(bashio::config 'page_pool_size' 1)"
 export PORT=3000
 export SESSION_DIR="/config/chatgpt_sessions"
 
@@ -14,6 +16,7 @@ fi
 
 bashio::log.info "Starting ChatGPT Plus Sidecar..."
 bashio::log.info "Headless mode: $HEADLESS"
+bashio::log.info "Chat tabs: $PAGE_POOL_SIZE"
 
 # Start application
 cd /app
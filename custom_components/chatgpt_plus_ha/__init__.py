@@ -12,7 +12,14 @@ from homeassistant.components.frontend import (
 )
 from homeassistant.components.http import StaticPathConfig
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import (
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    SupportsResponse,
+    callback,
+)
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.util import dt as dt_util
@@ -31,6 +38,15 @@ from .const import (
     CONF_MAX_CONTEXT_ENTITIES,
     CONF_SUMMARY_CACHE_TTL,
     CONF_INCOGNITO_MODE,
+    CONF_RECENT_CHANGES_DEPTH,
+    CONF_RECENT_CHANGES_LIMIT,
+    CONF_CONTEXT_TOKEN_BUDGET,
+    CONF_PROMPT_FORMAT,
+    CONF_RESPONSE_CACHE_TTL,
+    CONF_CONNECT_TIMEOUT,
+    CONF_FIRST_BYTE_TIMEOUT,
+    CONF_TOTAL_TIMEOUT,
+    CONF_MAX_ATTEMPTS,
     DEFAULT_CONTEXT_ENABLED,
     DEFAULT_INCLUDE_HISTORY,
     DEFAULT_INCLUDE_LOGBOOK,
@@ -42,16 +58,39 @@ from .const import (
     DEFAULT_MAX_CONTEXT_ENTITIES,
     DEFAULT_SUMMARY_CACHE_TTL,
     DEFAULT_INCOGNITO_MODE,
+    DEFAULT_RECENT_CHANGES_DEPTH,
+    DEFAULT_RECENT_CHANGES_LIMIT,
+    DEFAULT_CONTEXT_TOKEN_BUDGET,
+    DEFAULT_PROMPT_FORMAT,
+    DEFAULT_RESPONSE_CACHE_TTL,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_FIRST_BYTE_TIMEOUT,
+    DEFAULT_TOTAL_TIMEOUT,
+    DEFAULT_MAX_ATTEMPTS,
     DOMAIN,
 )
 from .context import build_context
+from .health import SidecarHealthCoordinator
+from .index import DATA_ENTITY_INDEX, EntityIndex
+from .pool import DATA_AGENT_POOL, AgentPool
+from .profiling import RequestProfile, capture_cprofile
+from .recent_changes import DATA_RECENT_CHANGES, RecentChangesBuffer
+from .redaction import DATA_REDACTION, RedactionEngine
+from .scheduler import PRIORITIES, PRIORITY_BACKGROUND, PRIORITY_NORMAL
 from .service_helpers import (
+    DeltaThrottle,
     build_notification_template,
     extract_json_payload,
     validate_automation_yaml,
 )
+from .state_cache import DATA_STATE_CACHE, SerializedStateCache
+from .structured_cache import (
+    DATA_STRUCTURED_CACHE,
+    StructuredResponseCache,
+    structured_key,
+)
 
-PLATFORMS: list[str] = ["ai_task"]
+PLATFORMS: list[str] = ["ai_task", "binary_sensor", "sensor"]
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -65,6 +104,10 @@ SERVICE_BUILD_CONTEXT = "build_context"
 SERVICE_GENERATE_AUTOMATION = "generate_automation"
 SERVICE_COMPOSE_NOTIFICATION = "compose_notification"
 
+# Bump when a prompt template changes so cached responses are not reused
+AUTOMATION_PROMPT_VERSION = 1
+NOTIFICATION_PROMPT_VERSION = 1
+
 SEND_MESSAGE_SCHEMA = vol.Schema(
     {
         vol.Required("message"): cv.string,
@@ -77,6 +120,11 @@ SEND_MESSAGE_SCHEMA = vol.Schema(
         vol.Optional("focus_entities"): cv.ensure_list,
         vol.Optional("recent_mode"): cv.boolean,
         vol.Optional("incognito"): cv.boolean,
+        vol.Optional("priority", default=PRIORITY_NORMAL): vol.In(PRIORITIES),
+        vol.Optional("caller"): cv.string,
+        vol.Optional("conversation_id"): cv.string,
+        vol.Optional("stream", default=False): cv.boolean,
+        vol.Optional("profile", default=False): cv.boolean,
     }
 )
 
@@ -103,6 +151,8 @@ GENERATE_AUTOMATION_SCHEMA = vol.Schema(
         vol.Optional("include_history"): cv.boolean,
         vol.Optional("include_logbook"): cv.boolean,
         vol.Optional("history_hours"): vol.Coerce(int),
+        vol.Optional("priority", default=PRIORITY_NORMAL): vol.In(PRIORITIES),
+        vol.Optional("caller"): cv.string,
     }
 )
 
@@ -118,6 +168,8 @@ COMPOSE_NOTIFICATION_SCHEMA = vol.Schema(
         vol.Optional("include_history"): cv.boolean,
         vol.Optional("include_logbook"): cv.boolean,
         vol.Optional("history_hours"): vol.Coerce(int),
+        vol.Optional("priority", default=PRIORITY_BACKGROUND): vol.In(PRIORITIES),
+        vol.Optional("caller"): cv.string,
     }
 )
 
@@ -157,13 +209,44 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         )
     )
 
+    # Sidecar health, polled in the background for the agent and the sensor
+    health = SidecarHealthCoordinator(hass, entry, agent)
+    agent.health_monitor = health
+
+    # The agent owns its HTTP session; close it on unload and on shutdown
+    async def _async_close_agent(_event: Event | None = None) -> None:
+        await agent.async_close()
+
+    entry.async_on_unload(_async_close_agent)
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_agent)
+    )
+
+    # Keep polling even when the connectivity sensor is disabled
+    entry.async_on_unload(health.async_add_listener(lambda: None))
+    entry.async_create_background_task(
+        hass, health.async_refresh(), f"{DOMAIN} sidecar health"
+    )
+
     # Store agent
     hass.data[DOMAIN][entry.entry_id] = {
         "agent": agent,
+        "health": health,
         "sidecar_url": sidecar_url,
         "options": merged_options,
     }
 
+    # Requests are balanced across the agents of all entries
+    pool = hass.data[DOMAIN].setdefault(DATA_AGENT_POOL, AgentPool())
+    pool.add(entry.entry_id, agent)
+
+    # Shared indexes and caches used by context building
+    _async_start_context_helpers(hass)
+    if DATA_STRUCTURED_CACHE not in hass.data[DOMAIN]:
+        structured_cache = StructuredResponseCache(hass)
+        await structured_cache.async_load()
+        hass.data[DOMAIN][DATA_STRUCTURED_CACHE] = structured_cache
+
     # Register frontend panel
     if not hass.data[DOMAIN].get("_panel_registered"):
         await _async_register_panel(hass)
@@ -186,6 +269,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if entry.entry_id in hass.data[DOMAIN]:
         hass.data[DOMAIN].pop(entry.entry_id)
+    if (pool := hass.data[DOMAIN].get(DATA_AGENT_POOL)) is not None:
+        pool.remove(entry.entry_id)
 
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if not unload_ok:
@@ -203,6 +288,13 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if hass.data[DOMAIN].get("_services_registered"):
             _async_unregister_services(hass)
             hass.data[DOMAIN]["_services_registered"] = False
+        _async_stop_context_helpers(hass)
+        hass.data[DOMAIN].pop(DATA_AGENT_POOL, None)
+        structured_cache = hass.data[DOMAIN].pop(DATA_STRUCTURED_CACHE, None)
+        if structured_cache is not None:
+            await structured_cache.async_save()
+    else:
+        _async_configure_context_helpers(hass)
 
     return True
 
@@ -215,6 +307,7 @@ async def _async_update_listener(
         return
     merged_options = _merge_options(entry)
     data["options"] = merged_options
+    _async_configure_context_helpers(hass)
     agent = data.get("agent")
     if isinstance(agent, ChatGPTPlusAgent):
         agent.update_options(
@@ -232,6 +325,52 @@ async def _async_update_listener(
         )
 
 
+def _async_start_context_helpers(hass: HomeAssistant) -> None:
+    """Create the index and caches shared by every config entry."""
+    domain_data = hass.data[DOMAIN]
+    if DATA_ENTITY_INDEX not in domain_data:
+        entity_index = EntityIndex(hass)
+        entity_index.async_start()
+        domain_data[DATA_ENTITY_INDEX] = entity_index
+    if DATA_STATE_CACHE not in domain_data:
+        state_cache = SerializedStateCache(hass)
+        state_cache.async_start()
+        domain_data[DATA_STATE_CACHE] = state_cache
+    domain_data.setdefault(DATA_REDACTION, RedactionEngine())
+    if DATA_RECENT_CHANGES not in domain_data:
+        recent_changes = RecentChangesBuffer(hass)
+        recent_changes.async_start()
+        domain_data[DATA_RECENT_CHANGES] = recent_changes
+    _async_configure_context_helpers(hass)
+
+
+def _async_configure_context_helpers(hass: HomeAssistant) -> None:
+    """Apply the options of every loaded entry to the shared helpers."""
+    recent_changes = hass.data[DOMAIN].get(DATA_RECENT_CHANGES)
+    if recent_changes is None:
+        return
+    recent_changes.async_configure(
+        entry_data["options"]
+        for entry_data in hass.data[DOMAIN].values()
+        if isinstance(entry_data, dict) and "options" in entry_data
+    )
+
+
+def _async_stop_context_helpers(hass: HomeAssistant) -> None:
+    """Tear down the shared index and caches."""
+    domain_data = hass.data[DOMAIN]
+    entity_index = domain_data.pop(DATA_ENTITY_INDEX, None)
+    if entity_index is not None:
+        entity_index.async_stop()
+    state_cache = domain_data.pop(DATA_STATE_CACHE, None)
+    if state_cache is not None:
+        state_cache.async_stop()
+    domain_data.pop(DATA_REDACTION, None)
+    recent_changes = domain_data.pop(DATA_RECENT_CHANGES, None)
+    if recent_changes is not None:
+        recent_changes.async_stop()
+
+
 async def _async_register_panel(hass: HomeAssistant) -> None:
     """Register the frontend panel."""
     frontend_path = Path(__file__).parent / "frontend"
@@ -280,9 +419,14 @@ async def _async_register_services(hass: HomeAssistant) -> None:
         recent_mode = call.data.get("recent_mode")
         incognito = call.data.get("incognito")
 
-        # Get the first available agent
-        for _entry_id, entry_data in _iter_agents(hass):
+        conversation_id = call.data.get("conversation_id")
+        # Route to the least busy sidecar, or the one holding the conversation
+        for _entry_id, entry_data in _iter_routed_agents(
+            hass, _caller_id(call), conversation_id
+        ):
             agent: ChatGPTPlusAgent = entry_data["agent"]
+            if conversation_id:
+                agent.use_conversation(_caller_id(call), conversation_id)
             options = dict(entry_data.get("options") or {})
             context_options = _build_context_options(
                 options,
@@ -295,19 +439,45 @@ async def _async_register_services(hass: HomeAssistant) -> None:
                 recent_mode,
                 incognito,
             )
-            result = await agent.send_message(message, context_options)
+            throttle = None
+            if call.data.get("stream"):
+
+                @callback
+                def fire_delta(data: dict) -> None:
+                    hass.bus.async_fire(
+                        f"{DOMAIN}_response_delta", {"request_id": request_id, **data}
+                    )
+
+                throttle = DeltaThrottle(fire_delta)
+
+            profile = RequestProfile()
+            send = agent.send_message(
+                message,
+                context_options,
+                call.data.get("priority", PRIORITY_NORMAL),
+                _caller_id(call),
+                throttle.update if throttle is not None else None,
+                profile,
+            )
+            if call.data.get("profile"):
+                with capture_cprofile(profile):
+                    result = await send
+            else:
+                result = await send
+            if throttle is not None:
+                throttle.flush()
 
             # Fire an event with the response
-            hass.bus.async_fire(
-                f"{DOMAIN}_response",
-                {
-                    "message": message,
-                    "response": result.get("message", ""),
-                    "success": result.get("success", False),
-                    "conversation_id": result.get("conversationId"),
-                    "request_id": request_id,
-                },
-            )
+            event_data = {
+                "message": message,
+                "response": result.get("message", ""),
+                "success": result.get("success", False),
+                "conversation_id": result.get("conversationId"),
+                "request_id": request_id,
+            }
+            if call.data.get("profile"):
+                event_data["profile"] = profile.as_dict()
+            hass.bus.async_fire(f"{DOMAIN}_response", event_data)
             _store_response(hass, entry_data, message, result)
             return result
 
@@ -316,9 +486,10 @@ async def _async_register_services(hass: HomeAssistant) -> None:
 
     async def handle_new_conversation(call: ServiceCall) -> dict:
         """Handle the new_conversation service call."""
-        for _entry_id, entry_data in _iter_agents(hass):
+        caller = _caller_id(call)
+        for _entry_id, entry_data in _iter_routed_agents(hass, caller):
             agent: ChatGPTPlusAgent = entry_data["agent"]
-            return await agent.new_conversation()
+            return await agent.new_conversation(caller=caller)
 
         _LOGGER.error("No ChatGPT Plus HA agent available")
         return {"success": False, "error": "No agent available"}
@@ -388,13 +559,7 @@ async def _async_register_services(hass: HomeAssistant) -> None:
         context_payload = await build_context(
             hass,
             description,
-            {
-                "context_enabled": call.data.get("include_context", True),
-                "include_history": call.data.get("include_history"),
-                "include_logbook": call.data.get("include_logbook"),
-                "history_hours": call.data.get("history_hours"),
-                "summary_only": True,
-            },
+            _summary_context_options(call),
         )
 
         prompt = (
@@ -408,11 +573,29 @@ async def _async_register_services(hass: HomeAssistant) -> None:
             f"{description}"
         )
 
-        for _entry_id, entry_data in _iter_agents(hass):
+        cache_key = structured_key(
+            SERVICE_GENERATE_AUTOMATION,
+            description,
+            context_payload.get("summary", ""),
+            AUTOMATION_PROMPT_VERSION,
+        )
+
+        for _entry_id, entry_data in _iter_routed_agents(hass):
             agent: ChatGPTPlusAgent = entry_data["agent"]
+            structured_cache = _get_structured_cache(hass, entry_data)
+            if structured_cache is not None and (
+                payload := structured_cache.async_get(cache_key)
+            ):
+                response = _automation_response(payload)
+                response["cached"] = True
+                _store_response(hass, entry_data, description, response)
+                return response
+
             result = await agent.send_message(
                 prompt,
                 {"context_enabled": False},
+                call.data.get("priority", PRIORITY_NORMAL),
+                _caller_id(call),
             )
             if not result.get("success"):
                 return result
@@ -425,22 +608,9 @@ async def _async_register_services(hass: HomeAssistant) -> None:
                     "message": "Failed to parse JSON from response.",
                 }
 
-            yaml_text = payload.get("yaml", "")
-            validation = validate_automation_yaml(yaml_text) if yaml_text else {
-                "valid": False,
-                "errors": ["Missing YAML output."],
-                "warnings": [],
-                "config": None,
-            }
-
-            response = {
-                "success": True,
-                "yaml": yaml_text,
-                "explanation": payload.get("explanation", ""),
-                "assumptions": payload.get("assumptions", ""),
-                "questions_if_needed": payload.get("questions_if_needed", ""),
-                "validation": validation,
-            }
+            response = _automation_response(payload)
+            if structured_cache is not None and response["validation"]["valid"]:
+                structured_cache.async_set(cache_key, payload)
             _store_response(hass, entry_data, description, response)
             return response
 
@@ -475,13 +645,7 @@ async def _async_register_services(hass: HomeAssistant) -> None:
         context_payload = await build_context(
             hass,
             f"Compose a notification for {event_type}",
-            {
-                "context_enabled": call.data.get("include_context", True),
-                "include_history": call.data.get("include_history"),
-                "include_logbook": call.data.get("include_logbook"),
-                "history_hours": call.data.get("history_hours"),
-                "summary_only": True,
-            },
+            _summary_context_options(call),
         )
 
         prompt = (
@@ -493,9 +657,30 @@ async def _async_register_services(hass: HomeAssistant) -> None:
             f"Context summary: {context_payload.get('summary','')}\n"
         )
 
-        for _entry_id, entry_data in _iter_agents(hass):
+        cache_key = structured_key(
+            SERVICE_COMPOSE_NOTIFICATION,
+            [event_type, entities, urgency],
+            context_payload.get("summary", ""),
+            NOTIFICATION_PROMPT_VERSION,
+        )
+
+        for _entry_id, entry_data in _iter_routed_agents(hass):
             agent: ChatGPTPlusAgent = entry_data["agent"]
-            result = await agent.send_message(prompt, {"context_enabled": False})
+            structured_cache = _get_structured_cache(hass, entry_data)
+            if structured_cache is not None and (
+                payload := structured_cache.async_get(cache_key)
+            ):
+                response = _notification_response(payload, photo_url)
+                response["cached"] = True
+                _store_response(hass, entry_data, event_type, response)
+                return response
+
+            result = await agent.send_message(
+                prompt,
+                {"context_enabled": False},
+                call.data.get("priority", PRIORITY_BACKGROUND),
+                _caller_id(call),
+            )
             if not result.get("success"):
                 return result
             payload = extract_json_payload(result.get("message", ""))
@@ -505,15 +690,9 @@ async def _async_register_services(hass: HomeAssistant) -> None:
                     "error": "invalid_response",
                     "message": "Failed to parse JSON from response.",
                 }
-            response = {
-                "success": True,
-                "title": payload.get("title", "Notification"),
-                "message": payload.get("message", ""),
-                "actions": payload.get("actions", []),
-                "follow_up_questions": payload.get("follow_up_questions", []),
-                "used_template": False,
-                "photo_url": photo_url,
-            }
+            if structured_cache is not None:
+                structured_cache.async_set(cache_key, payload)
+            response = _notification_response(payload, photo_url)
             _store_response(hass, entry_data, event_type, response)
             return response
 
@@ -582,6 +761,54 @@ def _async_unregister_services(hass: HomeAssistant) -> None:
         hass.services.async_remove(DOMAIN, SERVICE_COMPOSE_NOTIFICATION)
 
 
+def _automation_response(payload: dict[str, Any]) -> dict[str, Any]:
+    """Build a generate_automation response, validating the YAML."""
+    yaml_text = payload.get("yaml", "")
+    validation = validate_automation_yaml(yaml_text) if yaml_text else {
+        "valid": False,
+        "errors": ["Missing YAML output."],
+        "warnings": [],
+        "config": None,
+    }
+    return {
+        "success": True,
+        "yaml": yaml_text,
+        "explanation": payload.get("explanation", ""),
+        "assumptions": payload.get("assumptions", ""),
+        "questions_if_needed": payload.get("questions_if_needed", ""),
+        "validation": validation,
+    }
+
+
+def _notification_response(
+    payload: dict[str, Any], photo_url: str | None
+) -> dict[str, Any]:
+    """Build a compose_notification response from the model's JSON."""
+    return {
+        "success": True,
+        "title": payload.get("title", "Notification"),
+        "message": payload.get("message", ""),
+        "actions": payload.get("actions", []),
+        "follow_up_questions": payload.get("follow_up_questions", []),
+        "used_template": False,
+        "photo_url": photo_url,
+    }
+
+
+def _get_structured_cache(
+    hass: HomeAssistant, entry_data: dict[str, Any]
+) -> StructuredResponseCache | None:
+    """Return the structured response cache unless the entry is incognito."""
+    if entry_data.get("options", {}).get(CONF_INCOGNITO_MODE):
+        return None
+    return hass.data[DOMAIN].get(DATA_STRUCTURED_CACHE)
+
+
+def _caller_id(call: ServiceCall) -> str:
+    """Identify who queued a request, for per-caller queue limits."""
+    return call.data.get("caller") or call.context.user_id or "system"
+
+
 def _merge_options(entry: ConfigEntry) -> dict[str, Any]:
     options = {
         CONF_CONTEXT_ENABLED: DEFAULT_CONTEXT_ENABLED,
@@ -595,6 +822,15 @@ def _merge_options(entry: ConfigEntry) -> dict[str, Any]:
         CONF_MAX_CONTEXT_ENTITIES: DEFAULT_MAX_CONTEXT_ENTITIES,
         CONF_SUMMARY_CACHE_TTL: DEFAULT_SUMMARY_CACHE_TTL,
         CONF_INCOGNITO_MODE: DEFAULT_INCOGNITO_MODE,
+        CONF_RECENT_CHANGES_DEPTH: DEFAULT_RECENT_CHANGES_DEPTH,
+        CONF_RECENT_CHANGES_LIMIT: DEFAULT_RECENT_CHANGES_LIMIT,
+        CONF_CONTEXT_TOKEN_BUDGET: DEFAULT_CONTEXT_TOKEN_BUDGET,
+        CONF_PROMPT_FORMAT: DEFAULT_PROMPT_FORMAT,
+        CONF_RESPONSE_CACHE_TTL: DEFAULT_RESPONSE_CACHE_TTL,
+        CONF_CONNECT_TIMEOUT: DEFAULT_CONNECT_TIMEOUT,
+        CONF_FIRST_BYTE_TIMEOUT: DEFAULT_FIRST_BYTE_TIMEOUT,
+        CONF_TOTAL_TIMEOUT: DEFAULT_TOTAL_TIMEOUT,
+        CONF_MAX_ATTEMPTS: DEFAULT_MAX_ATTEMPTS,
     }
     options.update(entry.options)
     return options
@@ -633,6 +869,18 @@ def _build_context_options(
     return options
 
 
+def _summary_context_options(call: ServiceCall) -> dict[str, Any]:
+    """Context options for a summary-only prompt, leaving unset fields to defaults."""
+    options = {
+        "context_enabled": call.data.get("include_context", True),
+        "summary_only": True,
+    }
+    for key in ("include_history", "include_logbook", "history_hours"):
+        if (value := call.data.get(key)) is not None:
+            options[key] = value
+    return options
+
+
 def _store_response(
     hass: HomeAssistant,
     entry_data: dict[str, Any] | None,
@@ -664,3 +912,16 @@ def _iter_agents(hass: HomeAssistant):
     for entry_id, entry_data in hass.data[DOMAIN].items():
         if isinstance(entry_data, dict) and "agent" in entry_data:
             yield entry_id, entry_data
+
+
+def _iter_routed_agents(
+    hass: HomeAssistant, caller: str | None = None, conversation_id: str | None = None
+):
+    """Yield the entry whose agent the pool routes this request to."""
+    pool: AgentPool | None = hass.data[DOMAIN].get(DATA_AGENT_POOL)
+    entry_id = pool.select(caller, conversation_id) if pool is not None else None
+    entry_data = hass.data[DOMAIN].get(entry_id) if entry_id else None
+    if isinstance(entry_data, dict) and "agent" in entry_data:
+        yield entry_id, entry_data
+        return
+    yield from _iter_agents(hass)
@@ -2,29 +2,78 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections import OrderedDict, deque
 import json
 import logging
 import os
 from datetime import datetime, timedelta
-from typing import Any
+from typing import TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, Callable
 from urllib.parse import urlparse
 
 import aiohttp
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.util import dt as dt_util
 
 from .const import (
     API_CHAT,
+    API_CHAT_STREAM,
+    API_HEALTH,
     API_NEW_CONVERSATION,
     API_STATUS,
+    CONF_PROMPT_FORMAT,
+    CONF_RESPONSE_CACHE_TTL,
     CONVERSATION_IDLE_MINUTES,
+    DEFAULT_PROMPT_FORMAT,
+    DEFAULT_RESPONSE_CACHE_TTL,
+    PROMPT_FORMAT_COMPACT,
     SUPERVISOR_URL,
 )
 from .context import build_context
+from .metrics import RequestMetrics
+from .profiling import RequestProfile
+from .prompt_format import context_label, format_context
+from .response_cache import RequestCoalescer, ResponseCache, request_key
+from .retry import (
+    BREAKER_CLOSED,
+    BREAKER_HALF_OPEN,
+    RETRYABLE_ERRORS,
+    TRANSPORT_ERRORS,
+    CircuitBreaker,
+    RetryPolicy,
+    sidecar_unusable_reason,
+)
+from .scheduler import (
+    PRIORITY_INTERACTIVE,
+    PRIORITY_NORMAL,
+    QueueFullError,
+    RequestScheduler,
+)
+from .sidecar_session import ConnectionStats, create_sidecar_session
+
+if TYPE_CHECKING:
+    from .health import SidecarHealthCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
+# Called with the answer so far and the text added since the last call
+DeltaCallback = Callable[[str, str], None]
+
+# Seconds past the total timeout before a replaced session is closed
+SESSION_RETIRE_GRACE = 30
+
+# Profiles of the latest requests kept for diagnostics
+RECENT_PROFILES = 20
+
+# Raised by aiohttp 3.10+ when connecting times out; older releases raise a
+# plain ServerTimeoutError that only says so in its message
+_CONNECT_TIMEOUT_ERROR = getattr(aiohttp, "ConnectionTimeoutError", None)
+
+# Callers whose conversations are remembered; the least recent is forgotten
+MAX_CONVERSATIONS = 64
+# Conversation key of requests that do not name a caller, as in the scheduler
+ANONYMOUS_CALLER = "anonymous"
+
 
 class ChatGPTPlusAgent:
     """Agent for communicating with ChatGPT via sidecar."""
@@ -34,17 +83,79 @@ class ChatGPTPlusAgent:
         self.hass = hass
         self.sidecar_url = sidecar_url.rstrip("/")
         self._session: aiohttp.ClientSession | None = None
-        self._conversation_id: str | None = None
-        self._last_interaction: datetime | None = None
+        # Caller -> (conversation ID, last interaction)
+        self._conversations: OrderedDict[str, tuple[str, datetime]] = OrderedDict()
         self._default_context_options: dict[str, Any] = {}
+        self.scheduler = RequestScheduler()
+        self.coalescer = RequestCoalescer()
+        self.response_cache = ResponseCache()
+        self.retry_policy = RetryPolicy()
+        self.breaker = CircuitBreaker()
+        self._streaming_supported = True
+        self.health_monitor: SidecarHealthCoordinator | None = None
+        self.connection_stats = ConnectionStats()
+        self._retired_sessions: list[aiohttp.ClientSession] = []
+        self.recent_profiles: deque[dict[str, Any]] = deque(maxlen=RECENT_PROFILES)
+        self.metrics = RequestMetrics()
 
     @property
     def session(self) -> aiohttp.ClientSession:
-        """Get the aiohttp session."""
-        if self._session is None:
-            self._session = async_get_clientsession(self.hass)
+        """Get the agent's own aiohttp session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = create_sidecar_session(
+                self.scheduler.concurrency, self.connection_stats
+            )
         return self._session
 
+    async def async_close(self) -> None:
+        """Close the agent's sessions and their pooled connections."""
+        sessions = [*self._retired_sessions, self._session]
+        self._retired_sessions.clear()
+        self._session = None
+        for session in sessions:
+            if session is not None and not session.closed:
+                await session.close()
+
+    def set_concurrency(self, concurrency: int) -> None:
+        """Match the request concurrency to the sidecar's chat tabs."""
+        concurrency = max(1, concurrency)
+        if concurrency == self.scheduler.concurrency:
+            return
+        _LOGGER.info(
+            "Sidecar serves %d chats at once (was %d)",
+            concurrency,
+            self.scheduler.concurrency,
+        )
+        self.scheduler.set_concurrency(concurrency)
+        if self._session is not None:
+            # Size a new connection pool; requests in flight finish on the old one.
+            retired, self._session = self._session, None
+            self._retired_sessions.append(retired)
+            self.hass.async_create_background_task(
+                self._async_close_retired(retired), "chatgpt_plus_ha retire session"
+            )
+
+    async def _async_close_retired(self, session: aiohttp.ClientSession) -> None:
+        await asyncio.sleep(self.retry_policy.total_timeout + SESSION_RETIRE_GRACE)
+        if session in self._retired_sessions:
+            self._retired_sessions.remove(session)
+            await session.close()
+
+    async def get_health(self) -> dict[str, Any]:
+        """Get the sidecar's own health report."""
+        try:
+            async with self.session.get(
+                f"{self.sidecar_url}{API_HEALTH}",
+                headers=self._build_headers(),
+                timeout=aiohttp.ClientTimeout(total=10),
+            ) as response:
+                if response.status == 200:
+                    return await response.json()
+                return {"error": f"Status {response.status}"}
+        except Exception as e:
+            _LOGGER.debug("Error getting health: %s", e)
+            return {"error": str(e) or type(e).__name__}
+
     async def get_status(self) -> dict[str, Any]:
         """Get the current status from the sidecar."""
         try:
@@ -55,55 +166,277 @@ class ChatGPTPlusAgent:
                 timeout=aiohttp.ClientTimeout(total=10),
             ) as response:
                 if response.status == 200:
-                    return await response.json()
+                    status = await response.json()
+                    pool_size = (status.get("pagePool") or {}).get("size")
+                    if isinstance(pool_size, int):
+                        self.set_concurrency(pool_size)
+                    return status
                 return {"error": f"Status {response.status}"}
         except Exception as e:
             _LOGGER.error("Error getting status: %s", e)
             return {"error": str(e)}
 
     async def send_message(
-        self, message: str, context_options: dict[str, Any] | None = None
+        self,
+        message: str,
+        context_options: dict[str, Any] | None = None,
+        priority: str = PRIORITY_NORMAL,
+        caller: str | None = None,
+        on_delta: DeltaCallback | None = None,
+        profile: RequestProfile | None = None,
     ) -> dict[str, Any]:
-        """Send a message to ChatGPT and get the response."""
+        """Send a message to ChatGPT and get the response.
+
+        With on_delta the answer is streamed from the sidecar and on_delta is
+        called as it grows. Streamed requests are not coalesced, since the
+        partial answers go to this caller only.
+
+        Stage timings and counters go to profile when given; every request's
+        profile is also kept in recent_profiles.
+        """
+        if profile is None:
+            profile = RequestProfile()
         context_options = {**self._default_context_options, **(context_options or {})}
         include_context = context_options.get("context_enabled", True)
         incognito = bool(context_options.get("incognito", False))
 
-        if incognito:
-            await self.new_conversation()
-
-        await self._maybe_rollover_conversation()
-
+        prompt_format = context_options.get(CONF_PROMPT_FORMAT, DEFAULT_PROMPT_FORMAT)
+        context_payload = None
         formatted_message = message
         if include_context:
-            context_payload = await build_context(
-                self.hass,
-                message,
-                context_options,
+            with profile.stage("context"):
+                context_payload = await build_context(
+                    self.hass,
+                    message,
+                    context_options,
+                )
+            profile.absorb("context", context_payload.get("debug", {}))
+            with profile.stage("format"):
+                formatted_message = self._format_prompt(
+                    message, context_payload, prompt_format
+                )
+        profile.count("prompt_bytes", len(formatted_message.encode()))
+
+        key = request_key(message, context_payload, prompt_format, incognito)
+        cache_ttl = 0 if incognito else int(
+            context_options.get(CONF_RESPONSE_CACHE_TTL, DEFAULT_RESPONSE_CACHE_TTL)
+        )
+        if cache_ttl > 0 and (cached := self.response_cache.get(key)) is not None:
+            profile.count("cache_hits")
+            self._record_profile(profile, cached)
+            return cached
+
+        if on_delta is not None:
+            result = await self._schedule_exchange(
+                formatted_message, incognito, priority, caller, on_delta, profile
             )
-            formatted_message = self._format_prompt(message, context_payload)
+        else:
+            result = await self.coalescer.run(
+                key,
+                lambda: self._schedule_exchange(
+                    formatted_message, incognito, priority, caller, profile=profile
+                ),
+            )
+            if "sidecar" not in profile.stages and result.get("error") != "queue_full":
+                # Answered by another caller's identical request
+                profile.count("coalesced")
+        if cache_ttl > 0 and result.get("success"):
+            self.response_cache.set(key, result, cache_ttl)
+        self._record_profile(profile, result)
+        return result
 
-        result = await self._send_message_raw(formatted_message)
+    def _record_profile(self, profile: RequestProfile, result: dict[str, Any]) -> None:
+        profile.count("response_bytes", len(str(result.get("message") or "").encode()))
+        record = {
+            "finished_at": dt_util.utcnow().isoformat(),
+            "success": bool(result.get("success")),
+            "error": result.get("error"),
+            **profile.as_dict(),
+        }
+        self.recent_profiles.append(record)
+        self.metrics.record(record)
+
+    async def _schedule_exchange(
+        self,
+        formatted_message: str,
+        incognito: bool,
+        priority: str,
+        caller: str | None,
+        on_delta: DeltaCallback | None = None,
+        profile: RequestProfile | None = None,
+    ) -> dict[str, Any]:
+        if profile is None:
+            profile = RequestProfile()
+        queued_at = profile.elapsed_ms()
 
-        if not result.get("success") and self._is_retryable_timeout(result):
-            _LOGGER.warning("Retrying ChatGPT request after timeout")
-            await self.new_conversation()
-            result = await self._send_message_raw(formatted_message)
+        async def exchange() -> dict[str, Any]:
+            profile.add_time("queue", profile.elapsed_ms() - queued_at)
+            with profile.stage("sidecar"):
+                return await self._exchange(
+                    formatted_message, incognito, on_delta, caller=caller
+                )
 
-        if result.get("success"):
-            self._last_interaction = dt_util.utcnow()
+        try:
+            return await self.scheduler.run(exchange, priority, caller)
+        except QueueFullError as err:
+            _LOGGER.warning("ChatGPT request refused: %s", err)
+            return {
+                "success": False,
+                "error": "queue_full",
+                "message": str(err),
+            }
 
-        if incognito:
-            self._conversation_id = None
+    async def _exchange(
+        self,
+        formatted_message: str,
+        incognito: bool,
+        on_delta: DeltaCallback | None = None,
+        caller: str | None = None,
+    ) -> dict[str, Any]:
+        """Run one request against the sidecar; holds a scheduler slot.
+
+        The request continues the caller's conversation, so requests of
+        different callers can be served by different sidecar tabs at once.
+        Incognito requests start a conversation that is not remembered.
+
+        Only failures where the prompt never reached the browser are
+        retried, with jittered exponential backoff, and all attempts share
+        the total timeout. Any failure checks /api/status, so a logged out
+        or initializing sidecar opens the breaker instead of being retried.
+        """
+        if self.health_monitor is not None and (
+            reason := self.health_monitor.unhealthy_reason
+        ):
+            return {"success": False, "error": "sidecar_unavailable", "message": reason}
+        if not self.breaker.allow():
+            return self._circuit_open_result()
+
+        policy = self.retry_policy
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy.total_timeout
+        conversation_id = None if incognito else self.conversation_for(caller)
+        try:
+            attempt = 0
+            while True:
+                result = await self._send_message_stream_raw(
+                    formatted_message,
+                    on_delta,
+                    deadline - loop.time(),
+                    conversation_id=conversation_id,
+                )
+                if result.get("success"):
+                    self.breaker.record_success()
+                    if not incognito and result.get("conversationId"):
+                        self.use_conversation(caller, result["conversationId"])
+                    break
+
+                reason = await self._async_probe_sidecar()
+                if reason:
+                    self.breaker.trip(reason)
+                    _LOGGER.warning("Not retrying ChatGPT request: %s", reason)
+                    result = {
+                        "success": False,
+                        "error": "sidecar_unavailable",
+                        "message": reason,
+                    }
+                    break
+
+                error = result.get("error")
+                if error not in TRANSPORT_ERRORS:
+                    # The sidecar answered; the request itself failed.
+                    self.breaker.record_success()
+                    break
+                self.breaker.record_failure(str(result.get("message") or error))
+
+                attempt += 1
+                delay = policy.backoff(attempt)
+                if (
+                    error not in RETRYABLE_ERRORS
+                    or attempt >= policy.max_attempts
+                    or self.breaker.state != BREAKER_CLOSED
+                    or loop.time() + delay + policy.connect_timeout >= deadline
+                ):
+                    break
+                _LOGGER.warning(
+                    "Retrying ChatGPT request in %.1fs after %s (attempt %d of %d)",
+                    delay,
+                    error,
+                    attempt + 1,
+                    policy.max_attempts,
+                )
+                await asyncio.sleep(delay)
+        finally:
+            if self.breaker.state == BREAKER_HALF_OPEN:
+                # The trial request was cancelled before it could decide.
+                self.breaker.trip(self.breaker.reason or "Trial request cancelled")
 
         return result
 
+    async def _async_probe_sidecar(self) -> str | None:
+        """Check the sidecar after a failure; return why it is unusable."""
+        if self.health_monitor is not None:
+            await self.health_monitor.async_refresh()
+            return self.health_monitor.unhealthy_reason
+        return sidecar_unusable_reason(await self.get_status())
+
+    def _circuit_open_result(self) -> dict[str, Any]:
+        return {
+            "success": False,
+            "error": "circuit_open",
+            "message": (
+                f"{self.breaker.reason or 'Sidecar unavailable'}; retrying in "
+                f"{self.breaker.retry_after():.0f}s"
+            ),
+        }
+
+    async def stream_message(
+        self,
+        message: str,
+        context_options: dict[str, Any] | None = None,
+        priority: str = PRIORITY_NORMAL,
+        caller: str | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Send a message and yield the answer as it is written.
+
+        Yields ``{"type": "delta", "text": ..., "delta": ...}`` items while
+        ChatGPT writes, then ``{"type": "done", "result": ...}`` with the
+        same result send_message returns.
+        """
+        queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue()
+
+        def _on_delta(text: str, delta: str) -> None:
+            queue.put_nowait({"type": "delta", "text": text, "delta": delta})
+
+        task = asyncio.ensure_future(
+            self.send_message(message, context_options, priority, caller, _on_delta)
+        )
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (item := await queue.get()) is not None:
+                yield item
+            yield {"type": "done", "result": task.result()}
+        finally:
+            task.cancel()
+
     def update_options(self, options: dict[str, Any]) -> None:
         """Update default context options for this agent."""
         self._default_context_options = dict(options or {})
+        self.retry_policy = RetryPolicy.from_options(self._default_context_options)
+        if self._default_context_options.get("incognito"):
+            self.response_cache.clear()
+
+    async def new_conversation(
+        self, priority: str = PRIORITY_INTERACTIVE, caller: str | None = None
+    ) -> dict[str, Any]:
+        """Start a new conversation for the caller."""
+        try:
+            return await self.scheduler.run(
+                lambda: self._new_conversation_raw(caller), priority, caller
+            )
+        except QueueFullError as err:
+            return {"success": False, "error": "queue_full", "message": str(err)}
 
-    async def new_conversation(self) -> dict[str, Any]:
-        """Start a new conversation."""
+    async def _new_conversation_raw(self, caller: str | None = None) -> dict[str, Any]:
         try:
             headers = self._build_headers()
             async with self.session.post(
@@ -113,8 +446,7 @@ class ChatGPTPlusAgent:
             ) as response:
                 if response.status == 200:
                     data = await response.json()
-                    self._conversation_id = None
-                    self._last_interaction = dt_util.utcnow()
+                    self._conversations.pop(caller or ANONYMOUS_CALLER, None)
                     return data
                 else:
                     error_data = await response.json()
@@ -129,76 +461,176 @@ class ChatGPTPlusAgent:
                 "error": str(e),
             }
 
-    @property
-    def conversation_id(self) -> str | None:
-        """Get the current conversation ID."""
-        return self._conversation_id
-
-    async def _maybe_rollover_conversation(self) -> None:
-        if not self._last_interaction:
-            return
-        if dt_util.utcnow() - self._last_interaction > timedelta(
+    def conversation_for(self, caller: str | None = None) -> str | None:
+        """Return the conversation the caller's next request continues.
+
+        A conversation idle for longer than CONVERSATION_IDLE_MINUTES is
+        forgotten, so the next request starts a new chat.
+        """
+        key = caller or ANONYMOUS_CALLER
+        if (entry := self._conversations.get(key)) is None:
+            return None
+        conversation_id, last_interaction = entry
+        if dt_util.utcnow() - last_interaction > timedelta(
             minutes=CONVERSATION_IDLE_MINUTES
         ):
-            _LOGGER.info("Conversation idle, starting a new chat")
-            await self.new_conversation()
+            _LOGGER.info("Conversation of %s idle, starting a new chat", key)
+            del self._conversations[key]
+            return None
+        return conversation_id
+
+    def use_conversation(self, caller: str | None, conversation_id: str) -> None:
+        """Continue conversation_id in the caller's next request."""
+        key = caller or ANONYMOUS_CALLER
+        self._conversations[key] = (conversation_id, dt_util.utcnow())
+        self._conversations.move_to_end(key)
+        while len(self._conversations) > MAX_CONVERSATIONS:
+            self._conversations.popitem(last=False)
+
+    def has_conversation(self, conversation_id: str) -> bool:
+        """Return whether any caller is continuing conversation_id."""
+        return any(
+            entry[0] == conversation_id for entry in self._conversations.values()
+        )
 
-    async def _send_message_raw(self, message: str) -> dict[str, Any]:
+    async def _send_message_raw(
+        self, message: str, remaining: float, conversation_id: str | None = None
+    ) -> dict[str, Any]:
         try:
             payload = {"message": message}
-            if self._conversation_id:
-                payload["conversationId"] = self._conversation_id
+            if conversation_id:
+                payload["conversationId"] = conversation_id
 
             headers = self._build_headers()
             async with self.session.post(
                 f"{self.sidecar_url}{API_CHAT}",
                 json=payload,
                 headers=headers,
-                timeout=aiohttp.ClientTimeout(total=180),  # 3 minute timeout for long responses
+                timeout=self.retry_policy.client_timeout(remaining, streaming=False),
             ) as response:
                 if response.status == 200:
-                    data = await response.json()
-                    if data.get("conversationId"):
-                        self._conversation_id = data["conversationId"]
-                    return data
+                    return await response.json()
+
+                return await self._error_result(response)
+        except Exception as e:
+            return self._exception_result(e)
+
+    async def _send_message_stream_raw(
+        self,
+        message: str,
+        on_delta: DeltaCallback | None,
+        remaining: float,
+        conversation_id: str | None = None,
+    ) -> dict[str, Any]:
+        """Send a message over the sidecar's server-sent events endpoint."""
+        if not self._streaming_supported:
+            return await self._send_message_raw(message, remaining, conversation_id)
+        try:
+            payload = {"message": message}
+            if conversation_id:
+                payload["conversationId"] = conversation_id
 
-                error_data = await response.json()
+            headers = self._build_headers()
+            async with self.session.post(
+                f"{self.sidecar_url}{API_CHAT_STREAM}",
+                json=payload,
+                headers=headers,
+                timeout=self.retry_policy.client_timeout(remaining),
+            ) as response:
+                if response.status == 404:
+                    _LOGGER.info("Sidecar does not stream responses, using %s", API_CHAT)
+                    self._streaming_supported = False
+                    return await self._send_message_raw(
+                        message, remaining, conversation_id
+                    )
+                if response.status != 200:
+                    return await self._error_result(response)
+
+                # Deltas carry only the added text, or all of it with replace set
+                text = ""
+                async for event, data in _iter_sse_events(response.content):
+                    if event == "delta":
+                        delta = data.get("delta", "")
+                        text = delta if data.get("replace") else text + delta
+                        if on_delta is not None:
+                            on_delta(text, delta)
+                    elif event == "done":
+                        return data
+                    elif event == "error":
+                        return {
+                            "success": False,
+                            "error": data.get("error", "stream_error"),
+                            "message": data.get("message", "Unknown error"),
+                        }
                 return {
                     "success": False,
-                    "error": error_data.get("error", f"Status {response.status}"),
-                    "message": error_data.get("message", "Unknown error"),
+                    "error": "stream_error",
+                    "message": "Stream ended without a response",
                 }
-        except aiohttp.ClientTimeout:
-            _LOGGER.error("Timeout waiting for ChatGPT response")
+        except Exception as e:
+            return self._exception_result(e)
+
+    async def _error_result(self, response: aiohttp.ClientResponse) -> dict[str, Any]:
+        if response.status in (502, 503, 504):
+            # Proxy errors and the sidecar's "still initializing" reply
+            error = "unavailable"
+            try:
+                message = (await response.json()).get("message", f"Status {response.status}")
+            except (aiohttp.ContentTypeError, ValueError):
+                message = f"Status {response.status}"
+            return {"success": False, "error": error, "message": message}
+
+        error_data = await response.json()
+        return {
+            "success": False,
+            "error": error_data.get("error", f"Status {response.status}"),
+            "message": error_data.get("message", "Unknown error"),
+        }
+
+    def _exception_result(self, err: Exception) -> dict[str, Any]:
+        if isinstance(err, aiohttp.ClientConnectorError) or _is_connect_timeout(err):
+            # The prompt never reached the sidecar
+            _LOGGER.error("Cannot connect to the sidecar: %s", err)
             return {
                 "success": False,
-                "error": "timeout",
-                "message": "ChatGPT took too long to respond",
+                "error": "connect",
+                "message": str(err) or "Connection timeout",
             }
-        except Exception as e:
-            _LOGGER.error("Error sending message: %s", e)
+        if isinstance(err, aiohttp.ServerTimeoutError):
+            _LOGGER.error("Sidecar stopped responding: %s", err)
             return {
                 "success": False,
-                "error": "exception",
-                "message": str(e),
+                "error": "stalled",
+                "message": "ChatGPT stopped responding",
             }
-
-    def _format_prompt(self, message: str, context_payload: dict[str, Any]) -> str:
-        context_json = json.dumps(context_payload, ensure_ascii=True)
+        if isinstance(err, asyncio.TimeoutError):
+            _LOGGER.error("Timeout waiting for ChatGPT response")
+            return {
+                "success": False,
+                "error": "timeout",
+                "message": "ChatGPT took too long to respond",
+            }
+        _LOGGER.error("Error sending message: %s", err)
+        return {"success": False, "error": "exception", "message": str(err)}
+
+    def _format_prompt(
+        self,
+        message: str,
+        context_payload: dict[str, Any],
+        prompt_format: str = DEFAULT_PROMPT_FORMAT,
+    ) -> str:
+        context_text = format_context(context_payload, prompt_format)
+        context_kind = "context" if prompt_format == PROMPT_FORMAT_COMPACT else "context JSON"
         return (
             "You are assisting a Home Assistant user.\n"
-            "Use the Home Assistant context JSON below to answer.\n"
+            f"Use the Home Assistant {context_kind} below to answer.\n"
             "Do not reveal secrets or credentials. Ask clarifying questions when needed.\n\n"
-            "HOME_ASSISTANT_CONTEXT_JSON:\n"
-            f"{context_json}\n\n"
+            f"{context_label(prompt_format)}\n"
+            f"{context_text}\n\n"
             "USER_REQUEST:\n"
             f"{message}"
         )
 
-    def _is_retryable_timeout(self, result: dict[str, Any]) -> bool:
-        message = str(result.get("message", "")).lower()
-        return "timeout" in message
-
     def _build_headers(self) -> dict[str, str]:
         token = os.environ.get("SUPERVISOR_TOKEN")
         if not token:
@@ -214,3 +646,35 @@ class ChatGPTPlusAgent:
             return {"Authorization": f"Bearer {token}"}
 
         return {}
+
+
+def _is_connect_timeout(err: Exception) -> bool:
+    """Return whether err is a timeout while connecting to the sidecar."""
+    if _CONNECT_TIMEOUT_ERROR is not None and isinstance(err, _CONNECT_TIMEOUT_ERROR):
+        return True
+    return isinstance(err, aiohttp.ServerTimeoutError) and str(err).startswith(
+        "Connection timeout"
+    )
+
+
+async def _iter_sse_events(
+    lines: AsyncIterable[bytes],
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """Parse a server-sent events stream into (event, JSON data) pairs."""
+    event = "message"
+    data: list[str] = []
+    async for raw in lines:
+        line = raw.decode("utf-8").rstrip("\r\n")
+        if not line:
+            if data:
+                try:
+                    yield event, json.loads("\n".join(data))
+                except ValueError:
+                    _LOGGER.debug("Skipping malformed %s event", event)
+            event, data = "message", []
+        elif line.startswith(":"):
+            continue
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip())
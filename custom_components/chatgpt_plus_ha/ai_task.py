@@ -61,7 +61,7 @@ class ChatGPTPlusAITaskEntity(AITaskEntity):
     ) -> GenDataTaskResult:
         """Generate data for the task using ChatGPT."""
         prompt = self._build_prompt(task)
-        result = await self._agent.send_message(prompt)
+        result = await self._agent.send_message(prompt, caller="ai_task")
 
         if not result.get("success"):
             raise RuntimeError(result.get("message", "ChatGPT request failed"))
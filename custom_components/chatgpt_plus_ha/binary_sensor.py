@@ -0,0 +1,61 @@
+"""Binary sensor entities for ChatGPT Plus HA."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .health import SidecarHealthCoordinator
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities
+) -> None:
+    """Set up binary sensor entities from a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        [SidecarHealthBinarySensor(entry_data["health"], entry.entry_id)]
+    )
+
+
+class SidecarHealthBinarySensor(
+    CoordinatorEntity[SidecarHealthCoordinator], BinarySensorEntity
+):
+    """On while the sidecar is reachable, ready and logged in."""
+
+    _attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator: SidecarHealthCoordinator, entry_id: str) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{entry_id}_sidecar_health"
+        self._attr_name = "ChatGPT Plus Sidecar"
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return whether the sidecar can serve requests."""
+        if self.coordinator.data is None:
+            return None
+        return self.coordinator.data["healthy"]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the details of the last health check."""
+        data = self.coordinator.data or {}
+        return {
+            "sidecar_url": self.coordinator.agent.sidecar_url,
+            "logged_in": data.get("logged_in"),
+            "reason": data.get("reason"),
+            "latency_ms": data.get("latency_ms"),
+            "checked_at": data.get("checked_at"),
+        }
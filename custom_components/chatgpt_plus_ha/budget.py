@@ -0,0 +1,62 @@
+"""Token budgeting for ChatGPT Plus HA context."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Iterable, NamedTuple
+
+# Rough average for English text and JSON under common GPT tokenizers
+CHARS_PER_TOKEN = 4
+
+
+class BudgetItem(NamedTuple):
+    """A candidate piece of context and what it is worth."""
+
+    section: str
+    index: int
+    value: float
+    cost: int
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens text takes up in a prompt."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_json_tokens(value: Any) -> int:
+    """Estimate the tokens of value once serialized into the prompt JSON."""
+    return estimate_tokens(json.dumps(value, ensure_ascii=True))
+
+
+def rank_value(weight: float, rank: int) -> float:
+    """Value of the rank-th item of a section, decaying with its position."""
+    return weight / (1 + 0.1 * rank)
+
+
+def pack_items(
+    items: Iterable[BudgetItem],
+    budget: int,
+    section_costs: dict[str, int] | None = None,
+) -> dict[str, list[int]]:
+    """Greedily keep the most valuable items that fit in the budget.
+
+    A section's own cost (its heading) is charged with its first item. Items
+    that do not fit are skipped so smaller ones further down can still fill
+    the remaining budget. Returns the kept indices of each section in order.
+    """
+    section_costs = section_costs or {}
+    remaining = budget
+    kept: dict[str, list[int]] = {}
+    for item in sorted(items, key=lambda item: (-item.value, item.section, item.index)):
+        cost = item.cost
+        if item.section not in kept:
+            cost += section_costs.get(item.section, 0)
+        if cost > remaining:
+            continue
+        remaining -= cost
+        kept.setdefault(item.section, []).append(item.index)
+    for indices in kept.values():
+        indices.sort()
+    return kept
@@ -26,8 +26,18 @@ from .const import (
     CONF_MAX_CONTEXT_ENTITIES,
     CONF_SUMMARY_CACHE_TTL,
     CONF_INCOGNITO_MODE,
+    CONF_RECENT_CHANGES_DEPTH,
+    CONF_RECENT_CHANGES_LIMIT,
+    CONF_CONTEXT_TOKEN_BUDGET,
+    CONF_PROMPT_FORMAT,
+    CONF_RESPONSE_CACHE_TTL,
+    CONF_CONNECT_TIMEOUT,
+    CONF_FIRST_BYTE_TIMEOUT,
+    CONF_TOTAL_TIMEOUT,
+    CONF_MAX_ATTEMPTS,
     DEFAULT_SIDECAR_URL,
     DOMAIN,
+    PROMPT_FORMATS,
     API_HEALTH,
     API_STATUS,
     ADDON_SLUG_BASE,
@@ -44,6 +54,15 @@ from .const import (
     DEFAULT_MAX_CONTEXT_ENTITIES,
     DEFAULT_SUMMARY_CACHE_TTL,
     DEFAULT_INCOGNITO_MODE,
+    DEFAULT_RECENT_CHANGES_DEPTH,
+    DEFAULT_RECENT_CHANGES_LIMIT,
+    DEFAULT_CONTEXT_TOKEN_BUDGET,
+    DEFAULT_PROMPT_FORMAT,
+    DEFAULT_RESPONSE_CACHE_TTL,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_FIRST_BYTE_TIMEOUT,
+    DEFAULT_TOTAL_TIMEOUT,
+    DEFAULT_MAX_ATTEMPTS,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -334,6 +353,48 @@ class ChatGPTPlusHAOptionsFlowHandler(config_entries.OptionsFlow):
                             CONF_MAX_CONTEXT_ENTITIES, DEFAULT_MAX_CONTEXT_ENTITIES
                         ),
                     ): int,
+                    vol.Optional(
+                        CONF_CONTEXT_TOKEN_BUDGET,
+                        default=self.config_entry.options.get(
+                            CONF_CONTEXT_TOKEN_BUDGET, DEFAULT_CONTEXT_TOKEN_BUDGET
+                        ),
+                    ): int,
+                    vol.Optional(
+                        CONF_PROMPT_FORMAT,
+                        default=self.config_entry.options.get(
+                            CONF_PROMPT_FORMAT, DEFAULT_PROMPT_FORMAT
+                        ),
+                    ): vol.In(PROMPT_FORMATS),
+                    vol.Optional(
+                        CONF_RESPONSE_CACHE_TTL,
+                        default=self.config_entry.options.get(
+                            CONF_RESPONSE_CACHE_TTL, DEFAULT_RESPONSE_CACHE_TTL
+                        ),
+                    ): int,
+                    vol.Optional(
+                        CONF_CONNECT_TIMEOUT,
+                        default=self.config_entry.options.get(
+                            CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT
+                        ),
+                    ): int,
+                    vol.Optional(
+                        CONF_FIRST_BYTE_TIMEOUT,
+                        default=self.config_entry.options.get(
+                            CONF_FIRST_BYTE_TIMEOUT, DEFAULT_FIRST_BYTE_TIMEOUT
+                        ),
+                    ): int,
+                    vol.Optional(
+                        CONF_TOTAL_TIMEOUT,
+                        default=self.config_entry.options.get(
+                            CONF_TOTAL_TIMEOUT, DEFAULT_TOTAL_TIMEOUT
+                        ),
+                    ): int,
+                    vol.Optional(
+                        CONF_MAX_ATTEMPTS,
+                        default=self.config_entry.options.get(
+                            CONF_MAX_ATTEMPTS, DEFAULT_MAX_ATTEMPTS
+                        ),
+                    ): int,
                     vol.Optional(
                         CONF_SUMMARY_CACHE_TTL,
                         default=self.config_entry.options.get(
@@ -346,6 +407,18 @@ class ChatGPTPlusHAOptionsFlowHandler(config_entries.OptionsFlow):
                             CONF_INCOGNITO_MODE, DEFAULT_INCOGNITO_MODE
                         ),
                     ): bool,
+                    vol.Optional(
+                        CONF_RECENT_CHANGES_DEPTH,
+                        default=self.config_entry.options.get(
+                            CONF_RECENT_CHANGES_DEPTH, DEFAULT_RECENT_CHANGES_DEPTH
+                        ),
+                    ): int,
+                    vol.Optional(
+                        CONF_RECENT_CHANGES_LIMIT,
+                        default=self.config_entry.options.get(
+                            CONF_RECENT_CHANGES_LIMIT, DEFAULT_RECENT_CHANGES_LIMIT
+                        ),
+                    ): int,
                     vol.Optional(
                         CONF_ALLOWLIST_DOMAINS,
                         default=",".join(
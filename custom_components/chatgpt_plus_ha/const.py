@@ -15,6 +15,15 @@ CONF_DENYLIST_ENTITIES = "denylist_entities"
 CONF_MAX_CONTEXT_ENTITIES = "max_context_entities"
 CONF_SUMMARY_CACHE_TTL = "summary_cache_ttl"
 CONF_INCOGNITO_MODE = "incognito_mode"
+CONF_RECENT_CHANGES_DEPTH = "recent_changes_depth"
+CONF_RECENT_CHANGES_LIMIT = "recent_changes_limit"
+CONF_CONTEXT_TOKEN_BUDGET = "context_token_budget"
+CONF_PROMPT_FORMAT = "prompt_format"
+CONF_RESPONSE_CACHE_TTL = "response_cache_ttl"
+CONF_CONNECT_TIMEOUT = "connect_timeout"
+CONF_FIRST_BYTE_TIMEOUT = "first_byte_timeout"
+CONF_TOTAL_TIMEOUT = "total_timeout"
+CONF_MAX_ATTEMPTS = "max_attempts"
 
 # Default values
 DEFAULT_SIDECAR_PORT = 3000
@@ -32,6 +41,20 @@ DEFAULT_DENYLIST_ENTITIES: list[str] = []
 DEFAULT_MAX_CONTEXT_ENTITIES = 30
 DEFAULT_SUMMARY_CACHE_TTL = 300
 DEFAULT_INCOGNITO_MODE = False
+DEFAULT_RECENT_CHANGES_DEPTH = 3
+DEFAULT_RECENT_CHANGES_LIMIT = 2000
+DEFAULT_CONTEXT_TOKEN_BUDGET = 2000
+DEFAULT_PROMPT_FORMAT = "json"
+DEFAULT_RESPONSE_CACHE_TTL = 0
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_FIRST_BYTE_TIMEOUT = 90
+DEFAULT_TOTAL_TIMEOUT = 180
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Prompt formats for the context payload
+PROMPT_FORMAT_JSON = "json"
+PROMPT_FORMAT_COMPACT = "compact"
+PROMPT_FORMATS = [PROMPT_FORMAT_JSON, PROMPT_FORMAT_COMPACT]
 
 # Conversation policy
 CONVERSATION_IDLE_MINUTES = 30
@@ -40,4 +63,5 @@ CONVERSATION_IDLE_MINUTES = 30
 API_HEALTH = "/health"
 API_STATUS = "/api/status"
 API_CHAT = "/api/chat"
+API_CHAT_STREAM = "/api/chat/stream"
 API_NEW_CONVERSATION = "/api/conversation/new"
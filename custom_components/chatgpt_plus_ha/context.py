@@ -2,150 +2,314 @@
 
 from __future__ import annotations
 
-import re
-from datetime import timedelta
-from typing import Any, Iterable
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Iterator
 
-from homeassistant.components import history, logbook
+from homeassistant.components.recorder import get_instance, history
 from homeassistant.core import HomeAssistant, State
-from homeassistant.helpers import area_registry, device_registry, entity_registry
 from homeassistant.util import dt as dt_util
 
+from .budget import (
+    BudgetItem,
+    estimate_json_tokens,
+    estimate_tokens,
+    pack_items,
+    rank_value,
+)
 from .const import (
-    CONF_ALLOWLIST_DOMAINS,
-    CONF_ALLOWLIST_ENTITIES,
-    CONF_DENYLIST_DOMAINS,
-    CONF_DENYLIST_ENTITIES,
+    CONF_CONTEXT_TOKEN_BUDGET,
     CONF_HISTORY_HOURS,
     CONF_INCLUDE_HISTORY,
     CONF_INCLUDE_LOGBOOK,
     CONF_MAX_CONTEXT_ENTITIES,
-    DEFAULT_ALLOWLIST_DOMAINS,
-    DEFAULT_ALLOWLIST_ENTITIES,
-    DEFAULT_DENYLIST_DOMAINS,
-    DEFAULT_DENYLIST_ENTITIES,
+    CONF_RECENT_CHANGES_DEPTH,
+    DEFAULT_CONTEXT_TOKEN_BUDGET,
     DEFAULT_HISTORY_HOURS,
     DEFAULT_INCLUDE_HISTORY,
     DEFAULT_INCLUDE_LOGBOOK,
     DEFAULT_MAX_CONTEXT_ENTITIES,
+    DEFAULT_RECENT_CHANGES_DEPTH,
+    DOMAIN,
 )
+from .filters import EntityFilter, normalize_list
+from .index import async_get_entity_index, tokenize
+from .logbook_stream import async_create_event_processor, read_logbook_entries
+from .profiling import RequestProfile
+from .recent_changes import DATA_RECENT_CHANGES, RecentChangesBuffer
+from .redaction import DATA_REDACTION, RedactionEngine, redact_value
+from .state_cache import DATA_STATE_CACHE, serialize_state
 
 MAX_LOGBOOK_ENTRIES = 80
 MAX_HISTORY_ENTRIES = 150
-MAX_LIST_ITEMS = 50
-MAX_CONTEXT_CHARS = 6000
-
-SENSITIVE_KEYS = (
-    "token",
-    "access_token",
-    "refresh_token",
-    "password",
-    "passwd",
-    "secret",
-    "api_key",
-    "apikey",
-    "credential",
-    "cookie",
-    "jwt",
-    "bearer",
-    "client_secret",
-)
 
-SENSITIVE_VALUE_PATTERNS = (
-    re.compile(r"^sk-[A-Za-z0-9]{20,}$"),
-    re.compile(r"^eyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+$"),
-    re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$"),
-)
+# Relative worth of the first item of each section when packing the budget
+ENTITY_VALUE = 1.0
+HISTORY_VALUE = 0.8
+LOGBOOK_VALUE = 0.5
 
+# Seconds each I/O stage may take before its section is dropped
+HISTORY_STAGE_TIMEOUT = 10.0
+LOGBOOK_STAGE_TIMEOUT = 10.0
 
-def _normalize(text: str) -> str:
-    return re.sub(r"[^a-z0-9\s_-]", " ", text.lower())
+_LOGGER = logging.getLogger(__name__)
 
 
-def _tokenize(text: str) -> list[str]:
-    normalized = _normalize(text)
-    return [token for token in normalized.split() if token]
+def _get_states(hass: HomeAssistant, entity_ids: list[str]) -> list[State]:
+    states = (hass.states.get(entity_id) for entity_id in entity_ids)
+    return [state for state in states if state is not None]
 
 
-def _normalize_list(value: Any) -> list[str]:
-    if value is None:
+def _history_candidates(
+    hass: HomeAssistant,
+    selected_states: list[State],
+    recent_mode: bool,
+    start_time: datetime,
+    entity_filter: EntityFilter,
+) -> list[str]:
+    """Return the entities whose recorder history is worth querying.
+
+    An entity whose current state changed before the window has no state
+    change inside it, so only entities changed since start_time are kept.
+    Recent mode widens the set from the selected entities to every allowed
+    entity, most recently changed first.
+    """
+    candidates = [
+        state for state in selected_states if state.last_changed >= start_time
+    ]
+    if recent_mode:
+        changed = sorted(
+            (
+                state
+                for state in hass.states.async_all()
+                if state.last_changed >= start_time and entity_filter(state.entity_id)
+            ),
+            key=lambda state: state.last_changed,
+            reverse=True,
+        )
+        candidates.extend(changed)
+    entity_ids = list(dict.fromkeys(state.entity_id for state in candidates))
+    return entity_ids[:MAX_HISTORY_ENTRIES]
+
+
+def _state_changes(
+    hass: HomeAssistant,
+    entity_ids: list[str],
+    start_time: datetime,
+    end_time: datetime,
+    depth: int,
+) -> list[State]:
+    """Return the last depth state changes of each entity, newest first.
+
+    One query covers every entity, and the recorder leaves out rows that
+    only updated attributes, except in the few domains (climate and the
+    like) whose attributes it treats as significant. Those rows repeat the
+    previous state and are skipped here.
+    """
+    if not entity_ids or depth < 1:
         return []
-    if isinstance(value, str):
-        return [item.strip() for item in value.split(",") if item.strip()]
-    if isinstance(value, (list, tuple, set)):
-        return [str(item).strip() for item in value if str(item).strip()]
-    return [str(value).strip()]
-
-
-def _is_sensitive_key(key: str) -> bool:
-    lowered = key.lower()
-    return any(marker in lowered for marker in SENSITIVE_KEYS)
-
-
-def _should_redact_name(key: str, value: Any) -> bool:
-    if not isinstance(value, str):
-        return False
-    lowered = key.lower()
-    if "name" in lowered or "user" in lowered or "owner" in lowered:
-        return True
-    return False
-
-
-def _redact_value(value: Any, key: str | None = None) -> Any:
-    if value is None:
-        return None
-    if isinstance(value, (bool, int, float)):
-        return value
-    if isinstance(value, str):
-        lowered = value.lower()
-        if any(marker in lowered for marker in ("bearer ", "token", "password", "secret", "apikey", "api_key")):
-            return "[redacted]"
-        for pattern in SENSITIVE_VALUE_PATTERNS:
-            if pattern.match(value):
-                return "[redacted]"
-        if len(value) > 40 and re.fullmatch(r"[A-Za-z0-9._=-]+", value):
-            return "[redacted]"
-        if key and _should_redact_name(key, value):
-            return "[redacted]"
-        return value
-    if isinstance(value, list):
-        trimmed = value[:MAX_LIST_ITEMS]
-        return [_redact_value(item) for item in trimmed]
-    if isinstance(value, tuple):
-        trimmed = list(value)[:MAX_LIST_ITEMS]
-        return [_redact_value(item) for item in trimmed]
-    if isinstance(value, dict):
-        return {
-            key: _redact_value(val, key=str(key))
-            for key, val in value.items()
-            if not _is_sensitive_key(str(key))
-        }
-    return str(value)
+    states = history.get_significant_states(
+        hass,
+        start_time,
+        end_time,
+        entity_ids=entity_ids,
+        include_start_time_state=False,
+        significant_changes_only=True,
+        no_attributes=True,
+    )
+    changes: list[State] = []
+    for entity_id in entity_ids:
+        rows = states.get(entity_id, [])
+        changed = [
+            state
+            for previous, state in zip([None, *rows], rows)
+            if previous is None or state.state != previous.state
+        ]
+        changes.extend(changed[-depth:])
+    changes.sort(key=lambda state: state.last_changed, reverse=True)
+    return changes
+
+
+def _recent_changes(
+    hass: HomeAssistant,
+    entity_ids: list[str],
+    start_time: datetime,
+    end_time: datetime,
+    depth: int = DEFAULT_RECENT_CHANGES_DEPTH,
+) -> list[str]:
+    """Describe recent changes; runs in the recorder executor."""
+    return [
+        f"{state.entity_id} changed to {redact_value(state.state)} at "
+        f"{state.last_changed.isoformat() if state.last_changed else 'unknown'}"
+        for state in _state_changes(hass, entity_ids, start_time, end_time, depth)
+    ][:MAX_HISTORY_ENTRIES]
+
+
+def _buffered_changes(
+    buffer: RecentChangesBuffer,
+    selected_states: list[State],
+    recent_mode: bool,
+    start_time: datetime,
+    entity_filter: EntityFilter,
+    depth: int = DEFAULT_RECENT_CHANGES_DEPTH,
+) -> list[str]:
+    """Describe recent changes from the in-memory buffer, newest first."""
+    entity_ids = None if recent_mode else {state.entity_id for state in selected_states}
+    return [
+        f"{change.entity_id} changed to {change.state} at {change.last_changed.isoformat()}"
+        for change in buffer.changes_since(
+            start_time, entity_filter, entity_ids, limit=MAX_HISTORY_ENTRIES, depth=depth
+        )
+    ]
+
+
+async def _async_history_stage(
+    hass: HomeAssistant,
+    recent_buffer: RecentChangesBuffer | None,
+    selected_states: list[State],
+    recent_mode: bool,
+    start_time: datetime,
+    end_time: datetime,
+    entity_filter: EntityFilter,
+    depth: int = DEFAULT_RECENT_CHANGES_DEPTH,
+) -> list[str]:
+    """Describe recent changes from the buffer, or the recorder as a fallback.
+
+    Either way the last depth changes of each entity are listed, newest first.
+    """
+    if recent_buffer is not None and recent_buffer.covers(start_time):
+        return _buffered_changes(
+            recent_buffer, selected_states, recent_mode, start_time, entity_filter, depth
+        )
+    if "recorder" not in hass.config.components:
+        return []
+    history_entity_ids = _history_candidates(
+        hass, selected_states, recent_mode, start_time, entity_filter
+    )
+    return await get_instance(hass).async_add_executor_job(
+        _recent_changes, hass, history_entity_ids, start_time, end_time, depth
+    )
+
+
+async def _async_logbook_stage(
+    hass: HomeAssistant,
+    selected_states: list[State],
+    start_time: datetime,
+    end_time: datetime,
+    entity_filter: EntityFilter,
+) -> list[str]:
+    """Describe the logbook entries of the selected entities."""
+    event_processor = async_create_event_processor(
+        hass, [state.entity_id for state in selected_states]
+    )
+    return await get_instance(hass).async_add_executor_job(
+        read_logbook_entries,
+        hass,
+        event_processor,
+        start_time,
+        end_time,
+        entity_filter,
+        MAX_LOGBOOK_ENTRIES,
+    )
+
+
+async def _async_run_stage(
+    name: str,
+    stage: Awaitable[list[str]] | None,
+    timeout: float,
+    profile: RequestProfile,
+    degraded: list[str],
+) -> list[str]:
+    """Await a context stage, dropping its section if it fails or is too slow.
 
+    A timed out executor job keeps running in its thread; only the wait for
+    it is abandoned.
+    """
+    if stage is None:
+        return []
+    with profile.stage(name):
+        try:
+            return await asyncio.wait_for(stage, timeout)
+        except asyncio.TimeoutError:
+            _LOGGER.debug("Context %s stage timed out after %ss", name, timeout)
+            degraded.append(name)
+            return []
+        except Exception:
+            _LOGGER.debug("Context %s stage failed", name, exc_info=True)
+            degraded.append(name)
+            return []
+
+
+def _apply_budget(
+    summary_lines: list[str],
+    entity_summaries: list[dict[str, Any]],
+    recent_changes: list[str],
+    logbook_entries: list[str],
+    summary_only: bool,
+    history_hours: int,
+    token_budget: int,
+) -> tuple[list[str], list[dict[str, Any]], list[str], list[str], int]:
+    """Keep the most relevant context items that fit in the token budget.
+
+    Entities are charged for their summary line and, unless summary_only,
+    their serialized state; recent changes for the summary line and their
+    copy in the payload list.
+    """
+    entity_heading = _entity_heading(len(summary_lines))
+    history_heading = _history_heading(history_hours)
+    items: list[BudgetItem] = []
+    for rank, line in enumerate(summary_lines):
+        cost = estimate_tokens(line)
+        if not summary_only:
+            cost += estimate_json_tokens(entity_summaries[rank])
+        items.append(BudgetItem("entities", rank, rank_value(ENTITY_VALUE, rank), cost))
+    for rank, line in enumerate(recent_changes):
+        items.append(
+            BudgetItem(
+                "history",
+                rank,
+                rank_value(HISTORY_VALUE, rank),
+                estimate_tokens(line) + estimate_json_tokens(line),
+            )
+        )
+    if not summary_only:
+        for rank, line in enumerate(logbook_entries):
+            items.append(
+                BudgetItem(
+                    "logbook",
+                    rank,
+                    rank_value(LOGBOOK_VALUE, rank),
+                    estimate_json_tokens(line),
+                )
+            )
 
-def _serialize_state(state: State, include_attributes: bool) -> dict[str, Any]:
-    data = {
-        "entity_id": state.entity_id,
-        "state": _redact_value(state.state),
-        "last_changed": state.last_changed.isoformat() if state.last_changed else None,
-        "last_updated": state.last_updated.isoformat() if state.last_updated else None,
+    section_costs = {
+        "entities": estimate_tokens(entity_heading),
+        "history": estimate_tokens(history_heading),
     }
-    if include_attributes:
-        data["attributes"] = _redact_value(state.attributes)
-    return data
+    kept = pack_items(items, token_budget, section_costs)
+    kept_items = {(section, rank) for section, ranks in kept.items() for rank in ranks}
+    used = sum(section_costs.get(section, 0) for section in kept) + sum(
+        item.cost for item in items if (item.section, item.index) in kept_items
+    )
+    entity_ranks = kept.get("entities", [])
+    return (
+        [summary_lines[rank] for rank in entity_ranks],
+        [entity_summaries[rank] for rank in entity_ranks],
+        [recent_changes[rank] for rank in kept.get("history", [])],
+        [logbook_entries[rank] for rank in kept.get("logbook", [])],
+        used,
+    )
 
 
-def _match_score(text: str, tokens: Iterable[str]) -> int:
-    if not text:
-        return 0
-    normalized = _normalize(text)
-    return sum(1 for token in tokens if token and token in normalized)
+def _entity_heading(count: int) -> str:
+    return f"Relevant entities ({count}):\n"
 
 
-def _trim_summary(summary: str) -> str:
-    if len(summary) <= MAX_CONTEXT_CHARS:
-        return summary
-    return summary[: MAX_CONTEXT_CHARS - 3] + "..."
+def _history_heading(history_hours: int) -> str:
+    return f"Recent changes (last {history_hours}h):\n"
 
 
 async def build_context(
@@ -164,206 +328,180 @@ async def build_context(
     history_hours = int(
         options.get(CONF_HISTORY_HOURS, options.get("history_hours", DEFAULT_HISTORY_HOURS))
     )
-    allowlist_domains = set(
-        _normalize_list(
-            options.get(
-                CONF_ALLOWLIST_DOMAINS,
-                options.get("allowlist_domains", DEFAULT_ALLOWLIST_DOMAINS),
-            )
-        )
-    )
-    denylist_domains = set(
-        _normalize_list(
-            options.get(
-                CONF_DENYLIST_DOMAINS,
-                options.get("denylist_domains", DEFAULT_DENYLIST_DOMAINS),
-            )
-        )
-    )
-    allowlist_entities = set(
-        _normalize_list(
-            options.get(
-                CONF_ALLOWLIST_ENTITIES,
-                options.get("allowlist_entities", DEFAULT_ALLOWLIST_ENTITIES),
-            )
-        )
-    )
-    denylist_entities = set(
-        _normalize_list(
-            options.get(
-                CONF_DENYLIST_ENTITIES,
-                options.get("denylist_entities", DEFAULT_DENYLIST_ENTITIES),
-            )
-        )
-    )
+    entity_filter = EntityFilter.from_options(options)
     max_entities = int(
         options.get(
             CONF_MAX_CONTEXT_ENTITIES,
             options.get("max_entities", DEFAULT_MAX_CONTEXT_ENTITIES),
         )
     )
+    token_budget = int(
+        options.get(
+            CONF_CONTEXT_TOKEN_BUDGET,
+            options.get("token_budget", DEFAULT_CONTEXT_TOKEN_BUDGET),
+        )
+    )
     include_attributes = bool(options.get("include_attributes", False))
-    focus_areas = _normalize_list(options.get("focus_areas", []))
-    focus_entities = set(_normalize_list(options.get("focus_entities", [])))
+    focus_areas = normalize_list(options.get("focus_areas", []))
+    focus_entities = set(normalize_list(options.get("focus_entities", [])))
     summary_only = bool(options.get("summary_only", False))
     recent_mode = bool(options.get("recent_mode", False))
+    history_depth = int(
+        options.get(CONF_RECENT_CHANGES_DEPTH, DEFAULT_RECENT_CHANGES_DEPTH)
+    )
 
-    question_tokens = set(_tokenize(question))
-    focus_area_tokens = set(_tokenize(" ".join(focus_areas)))
+    question_tokens = set(tokenize(question))
+    focus_area_tokens = set(tokenize(" ".join(focus_areas)))
 
     now = dt_util.utcnow()
     start_time = now - timedelta(hours=history_hours)
 
-    area_reg = area_registry.async_get(hass)
-    device_reg = device_registry.async_get(hass)
-    entity_reg = entity_registry.async_get(hass)
-
-    area_names = {area.id: area.name for area in area_reg.async_list_areas()}
-    device_area = {device.id: device.area_id for device in device_reg.devices.values()}
-    device_names = {device.id: device.name for device in device_reg.devices.values()}
-
-    entity_meta: dict[str, dict[str, Any]] = {}
-    for entry in entity_reg.entities.values():
-        area_id = entry.area_id or device_area.get(entry.device_id)
-        entity_meta[entry.entity_id] = {
-            "name": entry.name,
-            "device_id": entry.device_id,
-            "area_id": area_id,
-            "area_name": area_names.get(area_id),
-            "device_name": device_names.get(entry.device_id),
-            "platform": entry.platform,
-            "disabled": bool(entry.disabled),
-        }
-
-    scored: list[tuple[int, State]] = []
-    for state in hass.states.async_all():
-        entity_id = state.entity_id
-        domain = entity_id.split(".", 1)[0]
-
-        if denylist_domains and domain in denylist_domains:
-            continue
-        if denylist_entities and entity_id in denylist_entities:
-            continue
-        if allowlist_domains and domain not in allowlist_domains:
-            continue
-        if allowlist_entities and entity_id not in allowlist_entities:
-            continue
-
-        meta = entity_meta.get(entity_id, {})
-        score = 0
-        score += 5 if entity_id in focus_entities else 0
-        score += _match_score(entity_id, question_tokens) * 2
-        score += _match_score(meta.get("name") or "", question_tokens) * 3
-        score += _match_score(meta.get("area_name") or "", question_tokens) * 3
-        score += _match_score(meta.get("device_name") or "", question_tokens) * 2
-        score += _match_score(meta.get("area_name") or "", focus_area_tokens) * 4
-        score += _match_score(domain, question_tokens)
-
-        if score > 0:
-            scored.append((score, state))
-
-    scored.sort(key=lambda item: item[0], reverse=True)
-    selected_states = [state for _, state in scored[:max_entities]]
-
-    if len(selected_states) < max_entities:
-        related_states: list[State] = []
-        related_area_ids = {
-            entity_meta.get(state.entity_id, {}).get("area_id")
-            for state in selected_states
-        }
-        related_area_ids.discard(None)
-        if related_area_ids:
-            for state in hass.states.async_all():
-                if state in selected_states:
-                    continue
-                meta = entity_meta.get(state.entity_id, {})
-                if meta.get("area_id") in related_area_ids:
-                    related_states.append(state)
-                if len(selected_states) + len(related_states) >= max_entities:
-                    break
-        selected_states.extend(
-            related_states[: max_entities - len(selected_states)]
+    profile = RequestProfile()
+    with profile.stage("index"):
+        # Walks the registries only when no shared index is running
+        entity_index = async_get_entity_index(hass)
+        entity_meta = entity_index.entity_meta
+    with profile.stage("scoring"):
+        scores = entity_index.score(question_tokens, focus_area_tokens, focus_entities)
+
+        ranked = heapq.nsmallest(
+            max_entities,
+            (entity_id for entity_id in scores if entity_filter(entity_id)),
+            key=lambda entity_id: (-scores[entity_id], entity_index.state_order(entity_id)),
         )
+        selected_states = _get_states(hass, ranked)
+    profile.count("entities_indexed", len(entity_index))
+    profile.count("entities_matched", len(scores))
+
+    with profile.stage("related"):
+        if len(selected_states) < max_entities:
+            selected_ids = {state.entity_id for state in selected_states}
+            related_ids: set[str] = set()
+            for entity_id in selected_ids:
+                area_id = entity_meta.get(entity_id, {}).get("area_id")
+                if area_id:
+                    related_ids.update(entity_index.area_entities(area_id))
+            related = heapq.nsmallest(
+                max_entities - len(selected_states),
+                (
+                    entity_id
+                    for entity_id in related_ids - selected_ids
+                    if entity_index.has_state(entity_id) and entity_filter(entity_id)
+                ),
+                key=entity_index.state_order,
+            )
+            selected_states.extend(_get_states(hass, related))
+    profile.count("entities_selected", len(selected_states))
+
+    domain_data = hass.data.get(DOMAIN, {})
+    redactor = domain_data.get(DATA_REDACTION) or RedactionEngine()
+    state_cache = domain_data.get(DATA_STATE_CACHE)
+    with profile.stage("serialization"):
+        summary_lines: list[str] = []
+        entity_summaries: list[dict[str, Any]] = []
+        for state in selected_states:
+            meta = entity_meta.get(state.entity_id, {})
+            display_name = meta.get("name") or state.attributes.get("friendly_name") or state.entity_id
+            display_name = redact_value(display_name, key="name")
+            summary_lines.append(
+                f"- {state.entity_id}: {state.state} ({display_name})"
+            )
+            if state_cache is not None:
+                entity_summaries.append(
+                    state_cache.get(state, include_attributes, redactor)
+                )
+            else:
+                entity_summaries.append(
+                    serialize_state(state, include_attributes, redactor)
+                )
 
-    summary_lines: list[str] = []
-    entity_summaries: list[dict[str, Any]] = []
-    for state in selected_states:
-        meta = entity_meta.get(state.entity_id, {})
-        display_name = meta.get("name") or state.attributes.get("friendly_name") or state.entity_id
-        display_name = _redact_value(display_name, key="name")
-        summary_lines.append(
-            f"- {state.entity_id}: {state.state} ({display_name})"
+    history_stage = None
+    if include_history or recent_mode:
+        history_stage = _async_history_stage(
+            hass,
+            domain_data.get(DATA_RECENT_CHANGES),
+            selected_states,
+            recent_mode,
+            start_time,
+            now,
+            entity_filter,
+            history_depth,
+        )
+    logbook_stage = None
+    if (
+        include_logbook
+        and not summary_only
+        and selected_states
+        and "logbook" in hass.config.components
+    ):
+        logbook_stage = _async_logbook_stage(
+            hass, selected_states, start_time, now, entity_filter
         )
-        entity_summaries.append(_serialize_state(state, include_attributes))
 
-    recent_changes: list[str] = []
-    if include_history or recent_mode:
-        if "recorder" in hass.config.components:
-            try:
-                states_by_entity = await hass.async_add_executor_job(
-                    history.get_significant_states,
-                    hass,
-                    start_time,
-                    now,
-                )
-                for entity_id, state_list in states_by_entity.items():
-                    if allowlist_entities and entity_id not in allowlist_entities:
-                        continue
-                    if denylist_entities and entity_id in denylist_entities:
-                        continue
-                    if allowlist_domains and entity_id.split(".", 1)[0] not in allowlist_domains:
-                        continue
-                    if denylist_domains and entity_id.split(".", 1)[0] in denylist_domains:
-                        continue
-                    if not state_list:
-                        continue
-                    last_state = state_list[-1]
-                    recent_changes.append(
-                        f"{entity_id} changed to {_redact_value(last_state.state)} at "
-                        f"{last_state.last_changed.isoformat() if last_state.last_changed else 'unknown'}"
-                    )
-                    if len(recent_changes) >= MAX_HISTORY_ENTRIES:
-                        break
-            except Exception:
-                recent_changes = []
-
-    logbook_entries: list[str] = []
-    if include_logbook and "logbook" in hass.config.components:
-        try:
-            events = await logbook.async_get_events(hass, start_time, now)
-            for event in events[:MAX_LOGBOOK_ENTRIES]:
-                message = _redact_value(event.get("message"), key="message")
-                name = _redact_value(event.get("name"), key="name")
-                logbook_entries.append(
-                    f"{event.get('when') or event.get('time')}: {name} {message}"
-                )
-        except Exception:
-            logbook_entries = []
+    degraded: list[str] = []
+    recent_changes, logbook_entries = await asyncio.gather(
+        _async_run_stage(
+            "history", history_stage, HISTORY_STAGE_TIMEOUT, profile, degraded
+        ),
+        _async_run_stage(
+            "logbook", logbook_stage, LOGBOOK_STAGE_TIMEOUT, profile, degraded
+        ),
+    )
+
+    with profile.stage("budget"):
+        (
+            summary_lines,
+            entity_summaries,
+            recent_changes,
+            logbook_entries,
+            used_tokens,
+        ) = _apply_budget(
+            summary_lines,
+            entity_summaries,
+            recent_changes[:MAX_HISTORY_ENTRIES],
+            logbook_entries[:MAX_LOGBOOK_ENTRIES],
+            summary_only,
+            history_hours,
+            token_budget,
+        )
+    profile.count("entities_included", len(summary_lines))
+    profile.count("history_entries", len(recent_changes))
+    profile.count("logbook_entries", len(logbook_entries))
 
     summary_parts = []
     if summary_lines:
         summary_parts.append(
-            f"Relevant entities ({len(summary_lines)}):\n" + "\n".join(summary_lines)
+            _entity_heading(len(summary_lines)) + "\n".join(summary_lines)
         )
     if recent_changes:
         summary_parts.append(
-            f"Recent changes (last {history_hours}h):\n"
-            + "\n".join(recent_changes[:MAX_HISTORY_ENTRIES])
+            _history_heading(history_hours) + "\n".join(recent_changes)
         )
 
-    summary = _trim_summary("\n\n".join(summary_parts))
+    summary = "\n\n".join(summary_parts)
+
+    debug = {
+        "total_ms": profile.elapsed_ms(),
+        "timings_ms": profile.stages,
+        "counters": profile.counters,
+        "degraded": degraded,
+        "token_budget": token_budget,
+        "estimated_tokens": used_tokens,
+    }
 
     if summary_only:
         return {
             "generated_at": now.isoformat(),
             "summary": summary,
-            "recent_changes": recent_changes[:MAX_HISTORY_ENTRIES],
+            "recent_changes": recent_changes,
+            "debug": debug,
         }
 
     return {
         "generated_at": now.isoformat(),
         "summary": summary,
         "entities": entity_summaries,
-        "recent_changes": recent_changes[:MAX_HISTORY_ENTRIES],
-        "logbook": logbook_entries[:MAX_LOGBOOK_ENTRIES],
+        "recent_changes": recent_changes,
+        "logbook": logbook_entries,
+        "debug": debug,
     }
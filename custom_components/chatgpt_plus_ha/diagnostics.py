@@ -0,0 +1,40 @@
+"""Diagnostics support for ChatGPT Plus HA."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .agent import ChatGPTPlusAgent
+from .const import DOMAIN
+from .pool import DATA_AGENT_POOL
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id) or {}
+    diagnostics: dict[str, Any] = {"options": dict(entry_data.get("options") or {})}
+    agent = entry_data.get("agent")
+    if isinstance(agent, ChatGPTPlusAgent):
+        diagnostics["scheduler"] = agent.scheduler.metrics()
+        diagnostics["connections"] = agent.connection_stats.as_dict()
+        diagnostics["retry_policy"] = agent.retry_policy._asdict()
+        diagnostics["circuit_breaker"] = agent.breaker.metrics()
+        if agent.health_monitor is not None:
+            diagnostics["sidecar_health"] = agent.health_monitor.data
+        diagnostics["responses"] = {
+            "coalesced": agent.coalescer.coalesced,
+            "in_flight": len(agent.coalescer),
+            "cached": len(agent.response_cache),
+            "cache_hits": agent.response_cache.hits,
+            "cache_misses": agent.response_cache.misses,
+        }
+        diagnostics["performance"] = agent.metrics.as_dict()
+        diagnostics["recent_requests"] = list(agent.recent_profiles)
+    if (pool := hass.data.get(DOMAIN, {}).get(DATA_AGENT_POOL)) is not None:
+        diagnostics["pool"] = pool.metrics()
+    return diagnostics
@@ -0,0 +1,95 @@
+"""Entity allow/deny filtering for ChatGPT Plus HA."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from .const import (
+    CONF_ALLOWLIST_DOMAINS,
+    CONF_ALLOWLIST_ENTITIES,
+    CONF_DENYLIST_DOMAINS,
+    CONF_DENYLIST_ENTITIES,
+    DEFAULT_ALLOWLIST_DOMAINS,
+    DEFAULT_ALLOWLIST_ENTITIES,
+    DEFAULT_DENYLIST_DOMAINS,
+    DEFAULT_DENYLIST_ENTITIES,
+)
+
+
+def normalize_list(value: Any) -> list[str]:
+    """Turn a comma separated string or sequence into a list of strings."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+    if isinstance(value, (list, tuple, set)):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [str(value).strip()]
+
+
+class EntityFilter:
+    """The allow/deny lists that decide which entities may be shared."""
+
+    def __init__(
+        self,
+        allowlist_domains: set[str],
+        denylist_domains: set[str],
+        allowlist_entities: set[str],
+        denylist_entities: set[str],
+    ) -> None:
+        """Initialize the filter."""
+        self.allowlist_domains = allowlist_domains
+        self.denylist_domains = denylist_domains
+        self.allowlist_entities = allowlist_entities
+        self.denylist_entities = denylist_entities
+
+    @classmethod
+    def from_options(cls, options: dict[str, Any]) -> EntityFilter:
+        """Create a filter from integration or context options."""
+        return cls(
+            set(
+                normalize_list(
+                    options.get(
+                        CONF_ALLOWLIST_DOMAINS,
+                        options.get("allowlist_domains", DEFAULT_ALLOWLIST_DOMAINS),
+                    )
+                )
+            ),
+            set(
+                normalize_list(
+                    options.get(
+                        CONF_DENYLIST_DOMAINS,
+                        options.get("denylist_domains", DEFAULT_DENYLIST_DOMAINS),
+                    )
+                )
+            ),
+            set(
+                normalize_list(
+                    options.get(
+                        CONF_ALLOWLIST_ENTITIES,
+                        options.get("allowlist_entities", DEFAULT_ALLOWLIST_ENTITIES),
+                    )
+                )
+            ),
+            set(
+                normalize_list(
+                    options.get(
+                        CONF_DENYLIST_ENTITIES,
+                        options.get("denylist_entities", DEFAULT_DENYLIST_ENTITIES),
+                    )
+                )
+            ),
+        )
+
+    def __call__(self, entity_id: str) -> bool:
+        """Return whether the entity may be shared."""
+        domain = entity_id.split(".", 1)[0]
+        if self.denylist_domains and domain in self.denylist_domains:
+            return False
+        if self.denylist_entities and entity_id in self.denylist_entities:
+            return False
+        if self.allowlist_domains and domain not in self.allowlist_domains:
+            return False
+        if self.allowlist_entities and entity_id not in self.allowlist_entities:
+            return False
+        return True
@@ -572,19 +572,28 @@ class ChatGPTPlusPanel extends HTMLElement {
         this._isLoading = true;
         this._showLoading();
 
+        let subscription = null;
         try {
+            // Subscribe first: the service call only returns once the answer is complete
+            subscription = await this._subscribeResponse(requestId, (text) => this._showPartialResponse(text));
+
             // Call Home Assistant service
             await this._hass.callService('chatgpt_plus_ha', 'send_message', {
                 message: message,
                 request_id: requestId,
+                priority: 'interactive',
+                stream: true,
                 ...contextOverrides,
             });
 
-            const response = await this._waitForResponse(requestId);
+            const response = await subscription.response;
 
             this._hideLoading();
             this._addMessage('assistant', response);
         } catch (error) {
+            if (subscription) {
+                subscription.cancel();
+            }
             this._hideLoading();
             this._addMessage('assistant', `Error: ${error.message || 'Failed to get response'}`);
         } finally {
@@ -592,41 +601,84 @@ class ChatGPTPlusPanel extends HTMLElement {
         }
     }
 
-    async _waitForResponse(requestId) {
-        return new Promise((resolve, reject) => {
-            let unsubscribe = null;
-            const timeout = setTimeout(() => {
-                if (unsubscribe) {
-                    unsubscribe();
-                }
-                reject(new Error('Timeout waiting for response'));
+    async _subscribeResponse(requestId, onDelta) {
+        let resolveResponse;
+        let rejectResponse;
+        const response = new Promise((resolve, reject) => {
+            resolveResponse = resolve;
+            rejectResponse = reject;
+        });
+        const unsubscribers = [];
+        let timeout = null;
+
+        const cancel = () => {
+            clearTimeout(timeout);
+            unsubscribers.splice(0).forEach((unsub) => unsub());
+        };
+        // The timeout restarts with every partial answer, so long answers can finish
+        const armTimeout = () => {
+            clearTimeout(timeout);
+            timeout = setTimeout(() => {
+                cancel();
+                rejectResponse(new Error('Timeout waiting for response'));
             }, 120000);
+        };
 
-            const handleEvent = (event) => {
-                const data = event?.data || {};
-                if (data.request_id && data.request_id !== requestId) {
-                    return;
-                }
-                if (data.response === undefined) {
-                    return;
-                }
-                clearTimeout(timeout);
-                if (unsubscribe) {
-                    unsubscribe();
-                }
-                resolve(data.response);
-            };
+        const isOurs = (data) => !data.request_id || data.request_id === requestId;
 
-            this._hass.connection
-                .subscribeEvents(handleEvent, 'chatgpt_plus_ha_response')
-                .then((unsub) => {
-                    unsubscribe = unsub;
-                })
-                .catch((error) => {
-                    clearTimeout(timeout);
-                    reject(error);
-                });
-        });
+        const handleResponse = (event) => {
+            const data = event?.data || {};
+            if (!isOurs(data) || data.response === undefined) {
+                return;
+            }
+            cancel();
+            resolveResponse(data.response);
+        };
+
+        // Events carry the text added since the last one, or the whole
+        // text when ChatGPT rewrote it.
+        let partial = '';
+        const handleDelta = (event) => {
+            const data = event?.data || {};
+            if (!isOurs(data) || typeof data.delta !== 'string') {
+                return;
+            }
+            partial = data.replace ? data.delta : partial + data.delta;
+            armTimeout();
+            onDelta(partial);
+        };
+
+        try {
+            unsubscribers.push(
+                await this._hass.connection.subscribeEvents(handleResponse, 'chatgpt_plus_ha_response'),
+                await this._hass.connection.subscribeEvents(handleDelta, 'chatgpt_plus_ha_response_delta'),
+            );
+        } catch (error) {
+            cancel();
+            throw error;
+        }
+        armTimeout();
+        return { response, cancel };
+    }
+
+    _showPartialResponse(text) {
+        const loadingEl = this.shadowRoot.getElementById('loadingMessage');
+        if (!loadingEl) {
+            return;
+        }
+
+        let contentEl = loadingEl.querySelector('.content');
+        if (!contentEl) {
+            loadingEl.innerHTML = `
+      <div class="avatar">AI</div>
+      <div class="content"></div>
+    `;
+            contentEl = loadingEl.querySelector('.content');
+        }
+        contentEl.textContent = text;
+
+        const messagesContainer = this.shadowRoot.getElementById('messages');
+        messagesContainer.scrollTop = messagesContainer.scrollHeight;
     }
 
     _addMessage(role, content) {
@@ -768,6 +820,7 @@ class ChatGPTPlusPanel extends HTMLElement {
         try {
             const result = await this._callServiceWithResponse('chatgpt_plus_ha', 'generate_automation', {
                 description,
+                priority: 'interactive',
                 include_context: contextOverrides.include_context,
                 include_history: contextOverrides.include_history,
                 include_logbook: contextOverrides.include_logbook,
@@ -892,6 +945,7 @@ class ChatGPTPlusPanel extends HTMLElement {
                 entities,
                 urgency,
                 photo_url: photoUrl || undefined,
+                priority: 'interactive',
                 include_context: contextOverrides.include_context,
                 include_history: contextOverrides.include_history,
                 include_logbook: contextOverrides.include_logbook,
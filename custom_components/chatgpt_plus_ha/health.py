@@ -0,0 +1,90 @@
+"""Background health monitoring of the ChatGPT sidecar."""
+
+from __future__ import annotations
+
+import logging
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .retry import BREAKER_CLOSED, sidecar_unusable_reason
+
+if TYPE_CHECKING:
+    from .agent import ChatGPTPlusAgent
+
+_LOGGER = logging.getLogger(__name__)
+
+HEALTHY_INTERVAL = timedelta(seconds=120)
+UNHEALTHY_INTERVAL = timedelta(seconds=15)
+
+
+def evaluate_health(health: dict[str, Any], status: dict[str, Any] | None) -> dict[str, Any]:
+    """Combine /health and /api/status replies into one health record."""
+    if health.get("error"):
+        reason: str | None = f"Sidecar unreachable: {health['error']}"
+    elif health.get("status") != "healthy":
+        reason = f"Sidecar not ready: {health.get('status', 'unknown')}"
+    else:
+        reason = sidecar_unusable_reason(status or {})
+    return {
+        "healthy": reason is None,
+        "reason": reason,
+        "logged_in": (status or {}).get("isLoggedIn"),
+    }
+
+
+class SidecarHealthCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Cached sidecar health, refreshed in the background.
+
+    Polls slowly while the sidecar is healthy and quickly while it is not,
+    so recovery is noticed soon. An unhealthy sidecar is data, not an
+    update failure, so the connectivity sensor turns off rather than
+    becoming unavailable.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, agent: ChatGPTPlusAgent
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=entry,
+            name=f"{DOMAIN} sidecar health",
+            update_interval=HEALTHY_INTERVAL,
+        )
+        self.agent = agent
+
+    @property
+    def unhealthy_reason(self) -> str | None:
+        """Return why the sidecar was last seen unhealthy, if it was."""
+        if self.data is None or self.data["healthy"]:
+            return None
+        return self.data["reason"]
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        started = time.monotonic()
+        health = await self.agent.get_health()
+        status = None
+        if not health.get("error") and health.get("status") == "healthy":
+            status = await self.agent.get_status()
+        data = evaluate_health(health, status)
+        data["latency_ms"] = round((time.monotonic() - started) * 1000, 1)
+        data["checked_at"] = dt_util.utcnow().isoformat()
+
+        was_healthy = self.data is None or self.data["healthy"]
+        if data["healthy"] and not was_healthy:
+            _LOGGER.info("ChatGPT sidecar is healthy again")
+            if self.agent.breaker.state != BREAKER_CLOSED:
+                self.agent.breaker.record_success()
+        elif not data["healthy"] and was_healthy:
+            _LOGGER.warning("ChatGPT sidecar is unhealthy: %s", data["reason"])
+
+        self.update_interval = HEALTHY_INTERVAL if data["healthy"] else UNHEALTHY_INTERVAL
+        return data
@@ -0,0 +1,340 @@
+"""Entity metadata index for ChatGPT Plus HA."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import re
+from typing import Any, Iterable
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import area_registry, device_registry, entity_registry
+
+from .const import DOMAIN
+
+DATA_ENTITY_INDEX = "entity_index"
+
+FIELD_ENTITY_ID = "entity_id"
+FIELD_NAME = "name"
+FIELD_AREA = "area"
+FIELD_DEVICE = "device"
+FIELD_DOMAIN = "domain"
+
+# Points a question token earns for each field it appears in
+QUESTION_FIELD_WEIGHTS = (
+    (FIELD_ENTITY_ID, 2),
+    (FIELD_NAME, 3),
+    (FIELD_AREA, 3),
+    (FIELD_DEVICE, 2),
+    (FIELD_DOMAIN, 1),
+)
+FOCUS_AREA_WEIGHT = 4
+FOCUS_ENTITY_WEIGHT = 5
+
+# Question tokens whose matching index words are remembered
+SUBSTRING_CACHE_SIZE = 1024
+
+_NORMALIZE_PATTERN = re.compile(r"[^a-z0-9\s_-]")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase text and blank out anything but words, dashes and underscores."""
+    return _NORMALIZE_PATTERN.sub(" ", text.lower())
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into normalized tokens."""
+    return [token for token in normalize_text(text).split() if token]
+
+
+class EntityIndex:
+    """Registry metadata and search tokens for every entity.
+
+    Metadata follows the registry-updated events; the token index follows
+    those plus state_changed so entities appear and disappear with their
+    state. Tokens are the whitespace-separated words of each normalized
+    field, so a question token that is a substring of a field is always a
+    substring of one of its words.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize an empty index."""
+        self.hass = hass
+        self.area_names: dict[str, str] = {}
+        self.device_area: dict[str, str | None] = {}
+        self.device_names: dict[str, str | None] = {}
+        self.entity_meta: dict[str, dict[str, Any]] = {}
+        self._device_entities: dict[str, set[str]] = {}
+        self._area_entities: dict[str, set[str]] = {}
+        self._state_order: dict[str, int] = {}
+        self._next_order = 0
+        self._entity_words: dict[str, dict[str, frozenset[str]]] = {}
+        self._postings: dict[str, dict[str, set[str]]] = {}
+        self._substring_cache: OrderedDict[str, list[str]] = OrderedDict()
+        self._unsubs: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_build(self) -> None:
+        """Walk the area, device and entity registries once."""
+        area_reg = area_registry.async_get(self.hass)
+        device_reg = device_registry.async_get(self.hass)
+        entity_reg = entity_registry.async_get(self.hass)
+
+        self.area_names = {area.id: area.name for area in area_reg.async_list_areas()}
+        self.device_area = {
+            device.id: device.area_id for device in device_reg.devices.values()
+        }
+        self.device_names = {
+            device.id: device.name for device in device_reg.devices.values()
+        }
+        self.entity_meta = {}
+        self._device_entities = {}
+        self._area_entities = {}
+        for entry in entity_reg.entities.values():
+            self._index_entry(entry)
+
+        self._state_order = {}
+        self._next_order = 0
+        self._entity_words = {}
+        self._postings = {}
+        self._substring_cache.clear()
+        for state in self.hass.states.async_all():
+            self._add_state(state.entity_id)
+
+    @callback
+    def async_start(self) -> None:
+        """Build the index and follow registry and state updates."""
+        self.async_build()
+        bus = self.hass.bus
+        self._unsubs = [
+            bus.async_listen(
+                entity_registry.EVENT_ENTITY_REGISTRY_UPDATED,
+                self._async_entity_registry_updated,
+            ),
+            bus.async_listen(
+                device_registry.EVENT_DEVICE_REGISTRY_UPDATED,
+                self._async_device_registry_updated,
+            ),
+            bus.async_listen(
+                area_registry.EVENT_AREA_REGISTRY_UPDATED,
+                self._async_area_registry_updated,
+            ),
+            bus.async_listen(EVENT_STATE_CHANGED, self._async_state_changed),
+        ]
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following registry and state updates."""
+        while self._unsubs:
+            self._unsubs.pop()()
+
+    def get_meta(self, entity_id: str) -> dict[str, Any]:
+        """Return the metadata for an entity, or an empty dict."""
+        return self.entity_meta.get(entity_id, {})
+
+    def area_entities(self, area_id: str) -> set[str]:
+        """Return the registry entities assigned to an area."""
+        return self._area_entities.get(area_id, set())
+
+    def __len__(self) -> int:
+        """Return the number of entities with a state."""
+        return len(self._state_order)
+
+    def has_state(self, entity_id: str) -> bool:
+        """Return whether the entity currently has a state."""
+        return entity_id in self._state_order
+
+    def state_order(self, entity_id: str) -> int:
+        """Return the position of an entity in the state machine."""
+        return self._state_order.get(entity_id, self._next_order)
+
+    def score(
+        self,
+        question_tokens: Iterable[str],
+        focus_area_tokens: Iterable[str] = (),
+        focus_entities: Iterable[str] = (),
+    ) -> dict[str, int]:
+        """Score every entity with state that a token hits.
+
+        Each token counts once per field it is a substring of, weighted by
+        the field. Entities no token hits are left out.
+        """
+        scores: dict[str, int] = {}
+        for token in question_tokens:
+            for field, weight in QUESTION_FIELD_WEIGHTS:
+                for entity_id in self._match(token, field):
+                    scores[entity_id] = scores.get(entity_id, 0) + weight
+        for token in focus_area_tokens:
+            for entity_id in self._match(token, FIELD_AREA):
+                scores[entity_id] = scores.get(entity_id, 0) + FOCUS_AREA_WEIGHT
+        for entity_id in focus_entities:
+            if entity_id in self._state_order:
+                scores[entity_id] = scores.get(entity_id, 0) + FOCUS_ENTITY_WEIGHT
+        return scores
+
+    def _match(self, token: str, field: str) -> set[str]:
+        words = self._substring_cache.get(token)
+        if words is None:
+            words = [word for word in self._postings if token in word]
+            self._substring_cache[token] = words
+            if len(self._substring_cache) > SUBSTRING_CACHE_SIZE:
+                self._substring_cache.popitem(last=False)
+        else:
+            self._substring_cache.move_to_end(token)
+        matched: set[str] = set()
+        for word in words:
+            matched.update(self._postings[word].get(field, ()))
+        return matched
+
+    def _field_words(self, entity_id: str) -> dict[str, frozenset[str]]:
+        meta = self.entity_meta.get(entity_id, {})
+        fields = {
+            FIELD_ENTITY_ID: entity_id,
+            FIELD_NAME: meta.get("name") or "",
+            FIELD_AREA: meta.get("area_name") or "",
+            FIELD_DEVICE: meta.get("device_name") or "",
+            FIELD_DOMAIN: entity_id.split(".", 1)[0],
+        }
+        return {
+            field: frozenset(normalize_text(text).split())
+            for field, text in fields.items()
+            if text
+        }
+
+    def _add_state(self, entity_id: str) -> None:
+        if entity_id not in self._state_order:
+            self._state_order[entity_id] = self._next_order
+            self._next_order += 1
+        self._retokenize(entity_id)
+
+    def _remove_state(self, entity_id: str) -> None:
+        self._state_order.pop(entity_id, None)
+        self._retokenize(entity_id)
+
+    def _retokenize(self, entity_id: str) -> None:
+        old_words = self._entity_words.pop(entity_id, {})
+        new_words = (
+            self._field_words(entity_id) if entity_id in self._state_order else {}
+        )
+        for field, words in old_words.items():
+            for word in words - new_words.get(field, frozenset()):
+                by_field = self._postings[word]
+                by_field[field].discard(entity_id)
+                if not by_field[field]:
+                    del by_field[field]
+                if not by_field:
+                    del self._postings[word]
+                    self._substring_cache.clear()
+        for field, words in new_words.items():
+            for word in words - old_words.get(field, frozenset()):
+                by_field = self._postings.get(word)
+                if by_field is None:
+                    by_field = self._postings[word] = {}
+                    self._substring_cache.clear()
+                by_field.setdefault(field, set()).add(entity_id)
+        if new_words:
+            self._entity_words[entity_id] = new_words
+
+    def _index_entry(self, entry: Any) -> None:
+        self._drop_entity(entry.entity_id)
+        area_id = entry.area_id or self.device_area.get(entry.device_id)
+        self.entity_meta[entry.entity_id] = {
+            "name": entry.name,
+            "device_id": entry.device_id,
+            "area_id": area_id,
+            "area_name": self.area_names.get(area_id),
+            "device_name": self.device_names.get(entry.device_id),
+            "platform": entry.platform,
+            "disabled": bool(entry.disabled),
+        }
+        if entry.device_id:
+            self._device_entities.setdefault(entry.device_id, set()).add(
+                entry.entity_id
+            )
+        if area_id:
+            self._area_entities.setdefault(area_id, set()).add(entry.entity_id)
+
+    def _drop_entity(self, entity_id: str) -> None:
+        meta = self.entity_meta.pop(entity_id, None)
+        if not meta:
+            return
+        device_id = meta.get("device_id")
+        if device_id and device_id in self._device_entities:
+            self._device_entities[device_id].discard(entity_id)
+            if not self._device_entities[device_id]:
+                del self._device_entities[device_id]
+        area_id = meta.get("area_id")
+        if area_id and area_id in self._area_entities:
+            self._area_entities[area_id].discard(entity_id)
+            if not self._area_entities[area_id]:
+                del self._area_entities[area_id]
+
+    def _reindex_entity(self, entity_id: str) -> None:
+        entry = entity_registry.async_get(self.hass).async_get(entity_id)
+        if entry is None:
+            self._drop_entity(entity_id)
+        else:
+            self._index_entry(entry)
+        self._retokenize(entity_id)
+
+    @callback
+    def _async_entity_registry_updated(self, event: Event) -> None:
+        data = event.data
+        old_entity_id = data.get("old_entity_id")
+        if old_entity_id:
+            self._drop_entity(old_entity_id)
+            self._retokenize(old_entity_id)
+        if data.get("action") == "remove":
+            self._drop_entity(data["entity_id"])
+            self._retokenize(data["entity_id"])
+            return
+        self._reindex_entity(data["entity_id"])
+
+    @callback
+    def _async_device_registry_updated(self, event: Event) -> None:
+        data = event.data
+        device_id = data["device_id"]
+        device = None
+        if data.get("action") != "remove":
+            device = device_registry.async_get(self.hass).async_get(device_id)
+        if device is None:
+            self.device_area.pop(device_id, None)
+            self.device_names.pop(device_id, None)
+        else:
+            self.device_area[device_id] = device.area_id
+            self.device_names[device_id] = device.name
+        for entity_id in list(self._device_entities.get(device_id, ())):
+            self._reindex_entity(entity_id)
+
+    @callback
+    def _async_area_registry_updated(self, event: Event) -> None:
+        data = event.data
+        area_id = data["area_id"]
+        area = None
+        if data.get("action") != "remove":
+            area = area_registry.async_get(self.hass).async_get_area(area_id)
+        if area is None:
+            self.area_names.pop(area_id, None)
+        else:
+            self.area_names[area_id] = area.name
+        for entity_id in self._area_entities.get(area_id, ()):
+            self.entity_meta[entity_id]["area_name"] = self.area_names.get(area_id)
+            self._retokenize(entity_id)
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        data = event.data
+        if data.get("new_state") is None:
+            self._remove_state(data["entity_id"])
+        elif data.get("old_state") is None:
+            self._add_state(data["entity_id"])
+
+
+@callback
+def async_get_entity_index(hass: HomeAssistant) -> EntityIndex:
+    """Return the shared index, or a one-off snapshot when none is running."""
+    index = hass.data.get(DOMAIN, {}).get(DATA_ENTITY_INDEX)
+    if index is None:
+        index = EntityIndex(hass)
+        index.async_build()
+    return index
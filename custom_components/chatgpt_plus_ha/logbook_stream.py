@@ -0,0 +1,145 @@
+"""Bounded logbook reads for ChatGPT Plus HA context."""
+
+from __future__ import annotations
+
+from contextlib import closing
+from datetime import datetime
+import logging
+from typing import Any, Iterator, Sequence
+
+from homeassistant.components.logbook.helpers import async_determine_event_types
+from homeassistant.components.logbook.processor import EventProcessor
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.core import HomeAssistant, callback
+
+from .filters import EntityFilter
+from .redaction import redact_value
+
+# The rows are streamed with the recorder internals behind
+# EventProcessor.get_events. Releases that move them fall back to
+# get_events, which reads the whole window at once.
+try:
+    from homeassistant.components.logbook.queries import statement_for_request
+    from homeassistant.components.recorder.models import (
+        extract_event_type_ids,
+        extract_metadata_ids,
+    )
+except ImportError:
+    STREAM_ROWS = False
+else:
+    STREAM_ROWS = True
+
+_LOGGER = logging.getLogger(__name__)
+
+# Rows fetched and humanified per round trip
+LOGBOOK_CHUNK_SIZE = 200
+
+
+@callback
+def async_create_event_processor(
+    hass: HomeAssistant, entity_ids: list[str]
+) -> EventProcessor:
+    """Create a logbook processor limited to the given entities."""
+    event_types = async_determine_event_types(hass, entity_ids, None)
+    return EventProcessor(hass, event_types, entity_ids, include_entity_name=True)
+
+
+def _iter_logbook_rows(
+    hass: HomeAssistant,
+    event_processor: EventProcessor,
+    start_time: datetime,
+    end_time: datetime,
+) -> Iterator[Sequence[Any]]:
+    """Yield the processor's logbook rows in chunks, oldest first."""
+    instance = get_instance(hass)
+    with session_scope(hass=hass, read_only=True) as session:
+        metadata_ids = extract_metadata_ids(
+            instance.states_meta_manager.get_many(
+                event_processor.entity_ids, session, False
+            )
+        )
+        event_type_ids = tuple(
+            extract_event_type_ids(
+                instance.event_type_manager.get_many(
+                    event_processor.event_types, session
+                )
+            )
+        )
+        stmt = statement_for_request(
+            start_time,
+            end_time,
+            event_type_ids,
+            event_processor.entity_ids,
+            metadata_ids,
+            None,
+            event_processor.filters,
+            None,
+        )
+        result = session.connection().execute(stmt)
+        try:
+            yield from result.yield_per(LOGBOOK_CHUNK_SIZE).partitions()
+        finally:
+            result.close()
+
+
+def _iter_logbook_entries(
+    hass: HomeAssistant,
+    event_processor: EventProcessor,
+    start_time: datetime,
+    end_time: datetime,
+) -> Iterator[list[dict[str, Any]]]:
+    """Yield the processor's humanified logbook entries in chunks, oldest first."""
+    if STREAM_ROWS:
+        chunks = _iter_logbook_rows(hass, event_processor, start_time, end_time)
+        with closing(chunks):
+            try:
+                first = next(chunks, None)
+            except (AttributeError, TypeError) as err:
+                # The recorder internals changed shape; nothing was read yet.
+                _LOGGER.debug("Cannot stream logbook rows, reading them at once: %s", err)
+            else:
+                if first is not None:
+                    yield event_processor.humanify(first)
+                    for rows in chunks:
+                        yield event_processor.humanify(rows)
+                return
+    entries = event_processor.get_events(start_time, end_time)
+    for start in range(0, len(entries), LOGBOOK_CHUNK_SIZE):
+        yield entries[start : start + LOGBOOK_CHUNK_SIZE]
+
+
+def read_logbook_entries(
+    hass: HomeAssistant,
+    event_processor: EventProcessor,
+    start_time: datetime,
+    end_time: datetime,
+    entity_filter: EntityFilter,
+    limit: int,
+) -> list[str]:
+    """Describe up to limit logbook entries; runs in the recorder executor.
+
+    Rows are humanified a chunk at a time and the query is abandoned as
+    soon as enough entries have been collected.
+    """
+    lines: list[str] = []
+    if limit <= 0:
+        return lines
+    with closing(
+        _iter_logbook_entries(hass, event_processor, start_time, end_time)
+    ) as chunks:
+        for entries in chunks:
+            for entry in entries:
+                entity_id = entry.get("entity_id")
+                if entity_id and not entity_filter(str(entity_id)):
+                    continue
+                # Entity ids are shared as-is elsewhere; display names are not.
+                name = entity_id or redact_value(entry.get("name"), key="name")
+                message = entry.get("message")
+                if message is None and "state" in entry:
+                    message = f"changed to {entry['state']}"
+                message = redact_value(message, key="message")
+                lines.append(f"{entry.get('when')}: {name} {message}")
+                if len(lines) >= limit:
+                    return lines
+    return lines
@@ -0,0 +1,181 @@
+"""Rolling performance statistics of ChatGPT Plus HA requests."""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Any
+
+# Seconds covered by the rolling statistics, split into slots that expire whole
+WINDOW_SECONDS = 300
+WINDOW_SLOTS = 5
+
+# Histogram buckets grow geometrically, keeping percentiles within 2% of
+# the recorded values from HISTOGRAM_MIN up to HISTOGRAM_MAX
+HISTOGRAM_MIN = 0.01
+HISTOGRAM_MAX = 1e8
+HISTOGRAM_GROWTH = 1.02
+
+# Request errors that mean the sidecar or ChatGPT took too long
+TIMEOUT_ERRORS = frozenset({"timeout", "stalled"})
+
+_LOG_GROWTH = math.log(HISTOGRAM_GROWTH)
+_MAX_BUCKET = int(math.log(HISTOGRAM_MAX / HISTOGRAM_MIN) / _LOG_GROWTH)
+
+
+class StreamingHistogram:
+    """Log-bucketed histogram in the manner of an HDR histogram.
+
+    Memory is bounded by the number of buckets however many values are
+    recorded; values outside the range land in the first or last bucket.
+    """
+
+    __slots__ = ("buckets", "count")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+
+    def record(self, value: float) -> None:
+        """Add a value."""
+        if value <= HISTOGRAM_MIN:
+            bucket = 0
+        else:
+            bucket = min(int(math.log(value / HISTOGRAM_MIN) / _LOG_GROWTH), _MAX_BUCKET)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+
+    def merge(self, other: StreamingHistogram) -> None:
+        """Add the values of another histogram."""
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+
+    def clear(self) -> None:
+        """Drop all values."""
+        self.buckets.clear()
+        self.count = 0
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the value below which percent of the values fall."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                # The geometric middle of the bucket
+                return HISTOGRAM_MIN * HISTOGRAM_GROWTH ** (bucket + 0.5)
+        return None
+
+
+class RollingHistogram:
+    """Histogram of the values recorded in the last window seconds."""
+
+    def __init__(
+        self, window: float = WINDOW_SECONDS, slots: int = WINDOW_SLOTS
+    ) -> None:
+        """Initialize the slots."""
+        self._slot_seconds = window / slots
+        self._slots = [StreamingHistogram() for _ in range(slots)]
+        self._slot_ids = [-1] * slots
+
+    def record(self, value: float, now: float | None = None) -> None:
+        """Add a value, expiring the slot it reuses."""
+        slot_id = self._slot_id(now)
+        index = slot_id % len(self._slots)
+        if self._slot_ids[index] != slot_id:
+            self._slots[index].clear()
+            self._slot_ids[index] = slot_id
+        self._slots[index].record(value)
+
+    def snapshot(self, now: float | None = None) -> StreamingHistogram:
+        """Return the values of the current window as one histogram."""
+        oldest = self._slot_id(now) - len(self._slots) + 1
+        merged = StreamingHistogram()
+        for slot_id, histogram in zip(self._slot_ids, self._slots):
+            if slot_id >= oldest:
+                merged.merge(histogram)
+        return merged
+
+    def _slot_id(self, now: float | None) -> int:
+        return int((time.monotonic() if now is None else now) // self._slot_seconds)
+
+
+class RequestMetrics:
+    """Rolling latency, size and outcome statistics of an agent's requests.
+
+    Fed with the request records the agent keeps for diagnostics. Latencies
+    are in milliseconds and prompt sizes in bytes; errors and timeouts count
+    up from when the agent was created.
+    """
+
+    def __init__(self, window: float = WINDOW_SECONDS) -> None:
+        """Initialize the statistics."""
+        self.window = window
+        self.latency = RollingHistogram(window)
+        self.sidecar_latency = RollingHistogram(window)
+        self.context_latency = RollingHistogram(window)
+        self.prompt_bytes = RollingHistogram(window)
+        # Only the count of this one is used
+        self.cache_hits = RollingHistogram(window)
+        self.errors = 0
+        self.timeouts = 0
+
+    def record(self, request: dict[str, Any], now: float | None = None) -> None:
+        """Add a finished request."""
+        stages = request.get("stages_ms", {})
+        counters = request.get("counters", {})
+        self.latency.record(request["total_ms"], now)
+        if "sidecar" in stages:
+            self.sidecar_latency.record(stages["sidecar"], now)
+        if "context" in stages:
+            self.context_latency.record(stages["context"], now)
+        if "prompt_bytes" in counters:
+            self.prompt_bytes.record(counters["prompt_bytes"], now)
+        if counters.get("cache_hits"):
+            self.cache_hits.record(1, now)
+        if not request.get("success"):
+            self.errors += 1
+            if request.get("error") in TIMEOUT_ERRORS:
+                self.timeouts += 1
+
+    def request_rate(self, now: float | None = None) -> float:
+        """Return the requests per minute over the window.
+
+        Like a load average, the rate ramps up over the first window.
+        """
+        return round(self.latency.snapshot(now).count * 60 / self.window, 2)
+
+    def cache_hit_ratio(self, now: float | None = None) -> float | None:
+        """Return the percentage of requests in the window answered from cache."""
+        requests = self.latency.snapshot(now).count
+        if not requests:
+            return None
+        return round(self.cache_hits.snapshot(now).count * 100 / requests, 1)
+
+    def as_dict(self, now: float | None = None) -> dict[str, Any]:
+        """Return the statistics of the current window."""
+        data: dict[str, Any] = {
+            "window_seconds": self.window,
+            "request_rate_per_min": self.request_rate(now),
+            "cache_hit_ratio": self.cache_hit_ratio(now),
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+        }
+        for name in ("latency", "sidecar_latency", "context_latency", "prompt_bytes"):
+            histogram: RollingHistogram = getattr(self, name)
+            snapshot = histogram.snapshot(now)
+            data[name] = {
+                "count": snapshot.count,
+                "p50": _rounded(snapshot.percentile(50)),
+                "p95": _rounded(snapshot.percentile(95)),
+                "p99": _rounded(snapshot.percentile(99)),
+            }
+        return data
+
+
+def _rounded(value: float | None) -> float | None:
+    return None if value is None else round(value, 1)
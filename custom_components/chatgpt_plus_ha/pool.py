@@ -0,0 +1,122 @@
+"""Load balancing of requests across ChatGPT sidecars."""
+
+from __future__ import annotations
+
+from collections import Counter, OrderedDict
+from typing import Any
+
+from .agent import ChatGPTPlusAgent
+from .retry import BREAKER_CLOSED, BREAKER_OPEN
+
+DATA_AGENT_POOL = "agent_pool"
+
+MAX_AFFINITIES = 256
+
+
+def agent_available(agent: ChatGPTPlusAgent) -> bool:
+    """Return whether an agent's sidecar should receive new requests."""
+    if agent.health_monitor is not None and agent.health_monitor.unhealthy_reason:
+        return False
+    breaker = agent.breaker
+    if breaker.state == BREAKER_CLOSED:
+        return True
+    # An open breaker past its reset timeout may take a trial request.
+    return breaker.state == BREAKER_OPEN and breaker.retry_after() == 0
+
+
+def agent_load(agent: ChatGPTPlusAgent) -> float:
+    """Return the requests running or queued per slot of an agent."""
+    scheduler = agent.scheduler
+    return (scheduler.running + scheduler.queued) / max(scheduler.concurrency, 1)
+
+
+class AgentPool:
+    """The agents of all config entries, one per sidecar.
+
+    Requests go to the available agent with the fewest outstanding
+    requests per slot, except that a request naming a conversation goes
+    to the agent holding it and a caller's follow-ups stick to the agent
+    that served it last. Agents whose sidecar is unhealthy or whose
+    breaker is open are ejected until they recover.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the pool."""
+        self._agents: dict[str, ChatGPTPlusAgent] = {}
+        self._affinity: OrderedDict[str, str] = OrderedDict()
+        self._routed: Counter[str] = Counter()
+        self.affinity_hits = 0
+
+    def add(self, member_id: str, agent: ChatGPTPlusAgent) -> None:
+        """Add an agent to the pool."""
+        self._agents[member_id] = agent
+
+    def remove(self, member_id: str) -> None:
+        """Remove an agent and forget the callers routed to it."""
+        self._agents.pop(member_id, None)
+        self._routed.pop(member_id, None)
+        for caller in [c for c, m in self._affinity.items() if m == member_id]:
+            del self._affinity[caller]
+
+    def select(
+        self, caller: str | None = None, conversation_id: str | None = None
+    ) -> str | None:
+        """Return the member that should serve a request, if any."""
+        if not self._agents:
+            return None
+        available = [
+            member_id
+            for member_id, agent in self._agents.items()
+            if agent_available(agent)
+        ]
+
+        member_id = None
+        if conversation_id:
+            member_id = next(
+                (
+                    member
+                    for member in available
+                    if self._agents[member].has_conversation(conversation_id)
+                ),
+                None,
+            )
+        if member_id is None and caller and self._affinity.get(caller) in available:
+            member_id = self._affinity[caller]
+        if member_id is not None:
+            self.affinity_hits += 1
+        else:
+            # With every sidecar ejected, the least loaded one fails fast
+            # with its own reason.
+            candidates = available or list(self._agents)
+            member_id = min(
+                candidates,
+                key=lambda member: (agent_load(self._agents[member]), self._routed[member]),
+            )
+
+        self._routed[member_id] += 1
+        if caller:
+            self._affinity[caller] = member_id
+            self._affinity.move_to_end(caller)
+            while len(self._affinity) > MAX_AFFINITIES:
+                self._affinity.popitem(last=False)
+        return member_id
+
+    def metrics(self) -> dict[str, Any]:
+        """Return per-member load and availability and routing counts."""
+        return {
+            "members": {
+                member_id: {
+                    "sidecar_url": agent.sidecar_url,
+                    "available": agent_available(agent),
+                    "load": round(agent_load(agent), 3),
+                    "routed": self._routed[member_id],
+                }
+                for member_id, agent in self._agents.items()
+            },
+            "affinity_hits": self.affinity_hits,
+            "callers_tracked": len(self._affinity),
+        }
+
+    def __len__(self) -> int:
+        """Return the number of agents in the pool."""
+        return len(self._agents)
@@ -0,0 +1,106 @@
+"""Per-stage timings and opt-in profiling of ChatGPT Plus HA requests."""
+
+from __future__ import annotations
+
+import cProfile
+from contextlib import contextmanager
+import pstats
+import time
+from typing import Any, Iterator
+
+# Functions listed in a cProfile capture, by cumulative time
+PROFILE_TOP_FUNCTIONS = 25
+
+
+class RequestProfile:
+    """Stage timings and counters of one request.
+
+    Stages are timed with the monotonic performance counter, in
+    milliseconds, and add up when a stage runs more than once.
+    """
+
+    def __init__(self) -> None:
+        """Start the request clock."""
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+        self.cprofile: dict[str, Any] | None = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed code as a stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, (time.perf_counter() - started) * 1000)
+
+    def add_time(self, name: str, millis: float) -> None:
+        """Add milliseconds to a stage."""
+        self.stages[name] = round(self.stages.get(name, 0.0) + millis, 3)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Add to a counter."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def absorb(self, prefix: str, debug: dict[str, Any]) -> None:
+        """Take over the stages and counters of a nested profile's report."""
+        for name, millis in debug.get("timings_ms", {}).items():
+            self.add_time(f"{prefix}.{name}", millis)
+        for name, amount in debug.get("counters", {}).items():
+            self.count(name, amount)
+
+    def elapsed_ms(self) -> float:
+        """Return the milliseconds since the profile started."""
+        return round((time.perf_counter() - self.started) * 1000, 3)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the total time, stages, counters and any cProfile capture."""
+        data: dict[str, Any] = {
+            "total_ms": self.elapsed_ms(),
+            "stages_ms": dict(self.stages),
+            "counters": dict(self.counters),
+        }
+        if self.cprofile is not None:
+            data["cprofile"] = self.cprofile
+        return data
+
+
+@contextmanager
+def capture_cprofile(
+    profile: RequestProfile, limit: int = PROFILE_TOP_FUNCTIONS
+) -> Iterator[None]:
+    """Run the enclosed code under cProfile and keep its hottest functions.
+
+    The profiler sees everything the event loop runs meanwhile, not just
+    this request, so captures are only meaningful on an otherwise quiet
+    system. Only one capture can run at a time.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as err:
+        profile.cprofile = {"error": str(err)}
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profile.cprofile = {"functions": _top_functions(profiler, limit)}
+
+
+def _top_functions(profiler: cProfile.Profile, limit: int) -> list[dict[str, Any]]:
+    stats = pstats.Stats(profiler).sort_stats(pstats.SortKey.CUMULATIVE)
+    functions = []
+    for key in stats.fcn_list[:limit]:
+        _calls, total_calls, own_time, cumulative_time, _callers = stats.stats[key]
+        functions.append(
+            {
+                "function": pstats.func_std_string(key),
+                "calls": total_calls,
+                "own_ms": round(own_time * 1000, 3),
+                "cumulative_ms": round(cumulative_time * 1000, 3),
+            }
+        )
+    return functions
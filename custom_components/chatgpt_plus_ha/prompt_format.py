@@ -0,0 +1,141 @@
+"""Serialization of context payloads into prompts for ChatGPT Plus HA."""
+
+from __future__ import annotations
+
+import json
+import re
+from datetime import datetime
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import PROMPT_FORMAT_COMPACT
+
+_RECENT_CHANGE = re.compile(r"^(?P<entity_id>\S+) changed to (?P<state>.*) at (?P<when>\S+)$")
+_LOGBOOK_ENTRY = re.compile(r"^(?P<when>\S+): (?P<text>.*)$")
+
+
+def context_label(prompt_format: str) -> str:
+    """Return the prompt heading for a context in the given format."""
+    if prompt_format == PROMPT_FORMAT_COMPACT:
+        return (
+            "HOME_ASSISTANT_CONTEXT (pipe separated rows; times are how long "
+            "before generated_at):"
+        )
+    return "HOME_ASSISTANT_CONTEXT_JSON:"
+
+
+def format_context(payload: dict[str, Any], prompt_format: str) -> str:
+    """Serialize a build_context payload for the prompt."""
+    # Debug metadata is for callers of build_context, not for the model.
+    payload = {key: value for key, value in payload.items() if key != "debug"}
+    if prompt_format == PROMPT_FORMAT_COMPACT:
+        return _format_compact(payload)
+    return json.dumps(payload, ensure_ascii=True)
+
+
+def _format_compact(payload: dict[str, Any]) -> str:
+    """Render the payload as tables with relative times.
+
+    When the entity rows are present they carry everything the summary
+    repeats, so the summary is left out.
+    """
+    reference = _parse_time(payload.get("generated_at")) or dt_util.utcnow()
+    lines = [f"generated_at: {payload.get('generated_at')}"]
+
+    entities = payload.get("entities")
+    if entities is None:
+        if summary := payload.get("summary"):
+            lines.append(summary)
+    elif entities:
+        with_attributes = any("attributes" in entity for entity in entities)
+        header = "entity_id|state|changed|updated"
+        lines.append("entities:")
+        lines.append(header + ("|attributes" if with_attributes else ""))
+        for entity in entities:
+            changed = _relative(entity.get("last_changed"), reference)
+            updated = _relative(entity.get("last_updated"), reference)
+            row = [
+                _cell(entity.get("entity_id")),
+                _cell(entity.get("state")),
+                changed,
+                "" if updated == changed else updated,
+            ]
+            if with_attributes:
+                row.append(_attributes(entity.get("attributes")))
+            lines.append("|".join(row))
+
+    if recent_changes := payload.get("recent_changes"):
+        lines.append("recent_changes:")
+        lines.append("entity_id|state|at")
+        for change in recent_changes:
+            match = _RECENT_CHANGE.match(str(change))
+            if match is None:
+                lines.append(_cell(change))
+                continue
+            lines.append(
+                "|".join(
+                    (
+                        match["entity_id"],
+                        _cell(match["state"]),
+                        _relative(match["when"], reference),
+                    )
+                )
+            )
+
+    if logbook := payload.get("logbook"):
+        lines.append("logbook:")
+        lines.append("at|entry")
+        for entry in logbook:
+            match = _LOGBOOK_ENTRY.match(str(entry))
+            if match is None or _parse_time(match["when"]) is None:
+                lines.append(_cell(entry))
+                continue
+            lines.append(
+                f"{_relative(match['when'], reference)}|{_cell(match['text'])}"
+            )
+
+    for key, value in payload.items():
+        if key in ("generated_at", "summary", "entities", "recent_changes", "logbook"):
+            continue
+        lines.append(f"{key}: {json.dumps(value, ensure_ascii=False, separators=(',', ':'))}")
+
+    return "\n".join(lines)
+
+
+def _parse_time(value: Any) -> datetime | None:
+    if not isinstance(value, str):
+        return None
+    return dt_util.parse_datetime(value)
+
+
+def _relative(value: Any, reference: datetime) -> str:
+    """Express a timestamp as a duration before reference, e.g. 5m or 2h3m."""
+    when = _parse_time(value)
+    if when is None:
+        return _cell(value)
+    seconds = int((reference - when).total_seconds())
+    sign = "-" if seconds < 0 else ""
+    seconds = abs(seconds)
+    if seconds < 60:
+        return f"{sign}{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{sign}{minutes}m"
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f"{sign}{hours}h{minutes}m" if minutes else f"{sign}{hours}h"
+    days, hours = divmod(hours, 24)
+    return f"{sign}{days}d{hours}h" if hours else f"{sign}{days}d"
+
+
+def _attributes(value: Any) -> str:
+    if not value:
+        return ""
+    return _cell(json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    return str(value).replace("\n", " ").replace("|", "/")
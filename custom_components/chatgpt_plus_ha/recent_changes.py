@@ -0,0 +1,208 @@
+"""In-memory buffer of recent state changes for ChatGPT Plus HA."""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from typing import Any, Iterable, NamedTuple
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_INCOGNITO_MODE,
+    CONF_RECENT_CHANGES_DEPTH,
+    CONF_RECENT_CHANGES_LIMIT,
+    DEFAULT_INCOGNITO_MODE,
+    DEFAULT_RECENT_CHANGES_DEPTH,
+    DEFAULT_RECENT_CHANGES_LIMIT,
+)
+from .filters import EntityFilter
+from .redaction import redact_value
+
+DATA_RECENT_CHANGES = "recent_changes"
+
+
+class RecentChange(NamedTuple):
+    """A redacted state change."""
+
+    seq: int
+    entity_id: str
+    state: Any
+    last_changed: datetime
+
+
+class RecentChangesBuffer:
+    """Bounded, redacted record of state changes since startup.
+
+    Each entity keeps its last ``depth`` changes and the whole buffer at
+    most ``limit`` changes, dropping the oldest first. Changes are only
+    recorded for entities at least one config entry is allowed to share,
+    and nothing is recorded while any entry is in incognito mode.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize an empty buffer."""
+        self.hass = hass
+        self.depth = DEFAULT_RECENT_CHANGES_DEPTH
+        self.limit = DEFAULT_RECENT_CHANGES_LIMIT
+        self.enabled = True
+        self._filters: list[EntityFilter] = []
+        self._changes: dict[str, deque[RecentChange]] = {}
+        self._order: deque[tuple[int, str]] = deque()
+        self._size = 0
+        self._seq = 0
+        self._covered_since = dt_util.utcnow()
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start recording state changes."""
+        self._covered_since = dt_util.utcnow()
+        self._unsub = self.hass.bus.async_listen(
+            EVENT_STATE_CHANGED, self._async_state_changed
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop recording and drop everything."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self.clear()
+
+    @callback
+    def async_configure(self, entry_options: Iterable[dict[str, Any]]) -> None:
+        """Apply the options of every config entry."""
+        entry_options = list(entry_options)
+        self._filters = [EntityFilter.from_options(options) for options in entry_options]
+        self.depth = max(
+            (
+                int(options.get(CONF_RECENT_CHANGES_DEPTH, DEFAULT_RECENT_CHANGES_DEPTH))
+                for options in entry_options
+            ),
+            default=DEFAULT_RECENT_CHANGES_DEPTH,
+        )
+        self.limit = max(
+            (
+                int(options.get(CONF_RECENT_CHANGES_LIMIT, DEFAULT_RECENT_CHANGES_LIMIT))
+                for options in entry_options
+            ),
+            default=DEFAULT_RECENT_CHANGES_LIMIT,
+        )
+        enabled = not any(
+            options.get(CONF_INCOGNITO_MODE, DEFAULT_INCOGNITO_MODE)
+            for options in entry_options
+        )
+        if not enabled or not self.enabled:
+            # Restart coverage whenever recording stops or resumes.
+            self.clear()
+        self.enabled = enabled
+        self._trim()
+
+    def clear(self) -> None:
+        """Drop all recorded changes."""
+        self._changes.clear()
+        self._order.clear()
+        self._size = 0
+        self._covered_since = dt_util.utcnow()
+
+    def covers(self, start_time: datetime) -> bool:
+        """Return whether every change since start_time is still buffered."""
+        return self.enabled and self._covered_since <= start_time
+
+    def changes_since(
+        self,
+        start_time: datetime,
+        entity_filter: EntityFilter,
+        entity_ids: set[str] | None = None,
+        limit: int | None = None,
+        depth: int | None = None,
+    ) -> list[RecentChange]:
+        """Return buffered changes since start_time, newest first.
+
+        With depth, only the last depth changes of each entity are returned.
+        """
+        if entity_ids is not None:
+            per_entity = (self._changes.get(entity_id, ()) for entity_id in entity_ids)
+        else:
+            per_entity = iter(self._changes.values())
+        if depth is not None:
+            per_entity = (
+                list(changes)[-depth:] if depth > 0 else [] for changes in per_entity
+            )
+        candidates = (change for changes in per_entity for change in changes)
+        matches = sorted(
+            (
+                change
+                for change in candidates
+                if change.last_changed >= start_time and entity_filter(change.entity_id)
+            ),
+            key=lambda change: change.seq,
+            reverse=True,
+        )
+        return matches[:limit] if limit is not None else matches
+
+    def __len__(self) -> int:
+        """Return the number of buffered changes."""
+        return self._size
+
+    def _shareable(self, entity_id: str) -> bool:
+        return any(entity_filter(entity_id) for entity_filter in self._filters)
+
+    def _trim(self) -> None:
+        for changes in self._changes.values():
+            while len(changes) > self.depth:
+                changes.popleft()
+        self._size = sum(len(changes) for changes in self._changes.values())
+        while self._size > self.limit and self._order:
+            seq, entity_id = self._order.popleft()
+            changes = self._changes.get(entity_id)
+            if not changes or changes[0].seq != seq:
+                # Already dropped by the per-entity depth.
+                continue
+            evicted = changes.popleft()
+            self._size -= 1
+            self._covered_since = max(self._covered_since, evicted.last_changed)
+            if not changes:
+                del self._changes[entity_id]
+        if len(self._order) > 2 * max(self.limit, 1):
+            self._order = deque(
+                sorted(
+                    (change.seq, change.entity_id)
+                    for changes in self._changes.values()
+                    for change in changes
+                )
+            )
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        if not self.enabled:
+            return
+        data = event.data
+        new_state = data.get("new_state")
+        old_state = data.get("old_state")
+        if new_state is None:
+            return
+        if old_state is not None and old_state.state == new_state.state:
+            return
+        entity_id = data["entity_id"]
+        if not self._shareable(entity_id):
+            return
+
+        self._seq += 1
+        change = RecentChange(
+            self._seq,
+            entity_id,
+            redact_value(new_state.state),
+            new_state.last_changed,
+        )
+        changes = self._changes.get(entity_id)
+        if changes is None:
+            changes = self._changes[entity_id] = deque()
+        changes.append(change)
+        self._order.append((change.seq, entity_id))
+        self._size += 1
+        if len(changes) > self.depth or self._size > self.limit:
+            self._trim()
@@ -0,0 +1,133 @@
+"""Redaction of sensitive values for ChatGPT Plus HA context."""
+
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+from homeassistant.core import State
+
+DATA_REDACTION = "redaction"
+
+MAX_LIST_ITEMS = 50
+REDACTED = "[redacted]"
+
+# Bounds for the verdict and attribute caches
+VERDICT_CACHE_SIZE = 8192
+ATTRIBUTE_CACHE_SIZE = 2048
+
+SENSITIVE_KEYS = (
+    "token",
+    "access_token",
+    "refresh_token",
+    "password",
+    "passwd",
+    "secret",
+    "api_key",
+    "apikey",
+    "credential",
+    "cookie",
+    "jwt",
+    "bearer",
+    "client_secret",
+)
+
+SENSITIVE_VALUE_MARKERS = ("bearer ", "token", "password", "secret", "apikey", "api_key")
+
+SENSITIVE_VALUE_PATTERNS = (
+    re.compile(r"^sk-[A-Za-z0-9]{20,}$"),
+    re.compile(r"^eyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+$"),
+    re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$"),
+)
+
+NAME_KEY_MARKERS = ("name", "user", "owner")
+
+# Markers are matched against the lowercased value, the value patterns and
+# long opaque strings (over 40 token characters) against the value itself.
+_MARKER_PATTERN = re.compile(
+    "|".join(re.escape(marker) for marker in SENSITIVE_VALUE_MARKERS)
+)
+_VALUE_PATTERN = re.compile(
+    "|".join(
+        [pattern.pattern for pattern in SENSITIVE_VALUE_PATTERNS]
+        + [r"[A-Za-z0-9._=-]{41,}\Z"]
+    )
+)
+
+
+@lru_cache(maxsize=256)
+def _is_sensitive_key(key: str) -> bool:
+    lowered = key.lower()
+    return any(marker in lowered for marker in SENSITIVE_KEYS)
+
+
+@lru_cache(maxsize=256)
+def _is_name_key(key: str) -> bool:
+    lowered = key.lower()
+    return any(marker in lowered for marker in NAME_KEY_MARKERS)
+
+
+@lru_cache(maxsize=VERDICT_CACHE_SIZE)
+def _is_sensitive_string(value: str) -> bool:
+    if _MARKER_PATTERN.search(value.lower()):
+        return True
+    return _VALUE_PATTERN.match(value) is not None
+
+
+def redact_value(value: Any, key: str | None = None) -> Any:
+    """Return a copy of value with secrets, emails and names masked."""
+    if value is None:
+        return None
+    if isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        if _is_sensitive_string(value):
+            return REDACTED
+        if key and _is_name_key(key):
+            return REDACTED
+        return value
+    if isinstance(value, list):
+        return [redact_value(item) for item in value[:MAX_LIST_ITEMS]]
+    if isinstance(value, tuple):
+        return [redact_value(item) for item in value[:MAX_LIST_ITEMS]]
+    if isinstance(value, dict):
+        return {
+            key: redact_value(val, key=str(key))
+            for key, val in value.items()
+            if not _is_sensitive_key(str(key))
+        }
+    return str(value)
+
+
+class RedactionEngine:
+    """Redact state attributes, reusing the result while a State is unchanged.
+
+    State objects are replaced rather than mutated when an entity updates,
+    so an identity match means the attributes are the ones redacted last
+    time.
+    """
+
+    def __init__(self, max_entries: int = ATTRIBUTE_CACHE_SIZE) -> None:
+        """Initialize the engine."""
+        self._max_entries = max_entries
+        self._attributes: OrderedDict[str, tuple[State, Any]] = OrderedDict()
+
+    def redact_attributes(self, state: State) -> Any:
+        """Return the redacted attributes of a state."""
+        cached = self._attributes.get(state.entity_id)
+        if cached is not None and cached[0] is state:
+            self._attributes.move_to_end(state.entity_id)
+            return cached[1]
+
+        redacted = redact_value(state.attributes)
+        self._attributes[state.entity_id] = (state, redacted)
+        self._attributes.move_to_end(state.entity_id)
+        if len(self._attributes) > self._max_entries:
+            self._attributes.popitem(last=False)
+        return redacted
+
+    def clear(self) -> None:
+        """Drop all cached attributes."""
+        self._attributes.clear()
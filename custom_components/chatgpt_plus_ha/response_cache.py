@@ -0,0 +1,106 @@
+"""Coalescing and short-lived caching of ChatGPT responses."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+DEFAULT_RESPONSE_CACHE_SIZE = 64
+
+# Payload keys that change on every build without changing the context
+_VOLATILE_CONTEXT_KEYS = ("generated_at", "debug")
+
+
+def request_key(
+    message: str,
+    context_payload: dict[str, Any] | None,
+    prompt_format: str,
+    incognito: bool,
+) -> str:
+    """Fingerprint a request by its normalized message and context."""
+    context = None
+    if context_payload is not None:
+        context = {
+            key: value
+            for key, value in context_payload.items()
+            if key not in _VOLATILE_CONTEXT_KEYS
+        }
+    material = json.dumps(
+        [" ".join(message.split()), context, prompt_format, incognito],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class RequestCoalescer:
+    """Share one in-flight call between identical concurrent requests.
+
+    The call runs in its own task, so a waiter that is cancelled does not
+    cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the coalescer."""
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def run(
+        self, key: str, func: Callable[[], Awaitable[dict[str, Any]]]
+    ) -> dict[str, Any]:
+        """Run func, or join the identical call already in flight."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        result = await asyncio.shield(task)
+        return dict(result)
+
+    def __len__(self) -> int:
+        """Return the number of calls in flight."""
+        return len(self._inflight)
+
+
+class ResponseCache:
+    """Successful responses kept for a short TTL, least recently used out."""
+
+    def __init__(self, max_entries: int = DEFAULT_RESPONSE_CACHE_SIZE) -> None:
+        """Initialize the cache."""
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return a copy of the cached response, if still fresh."""
+        cached = self._entries.get(key)
+        if cached is None or cached[0] < time.monotonic():
+            if cached is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(cached[1])
+
+    def set(self, key: str, response: dict[str, Any], ttl: float) -> None:
+        """Cache a response for ttl seconds."""
+        self._entries[key] = (time.monotonic() + ttl, dict(response))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        """Return the number of cached responses."""
+        return len(self._entries)
@@ -0,0 +1,165 @@
+"""Timeouts, retries and circuit breaking for sidecar requests."""
+
+from __future__ import annotations
+
+import random
+import time
+from typing import Any, NamedTuple
+
+import aiohttp
+
+from .const import (
+    CONF_CONNECT_TIMEOUT,
+    CONF_FIRST_BYTE_TIMEOUT,
+    CONF_MAX_ATTEMPTS,
+    CONF_TOTAL_TIMEOUT,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_FIRST_BYTE_TIMEOUT,
+    DEFAULT_MAX_ATTEMPTS,
+    DEFAULT_TOTAL_TIMEOUT,
+)
+
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 20.0
+
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_TIMEOUT = 30.0
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+# Errors where the prompt never reached the browser, so resending is safe
+RETRYABLE_ERRORS = frozenset({"connect", "unavailable"})
+# Errors that say something about the sidecar rather than the request
+TRANSPORT_ERRORS = RETRYABLE_ERRORS | {"stalled", "timeout"}
+
+
+class RetryPolicy(NamedTuple):
+    """How long to wait on the sidecar and how often to try again.
+
+    ``total_timeout`` bounds a request including its retries. The
+    first-byte timeout bounds how long the sidecar may stay silent between
+    streamed updates. Until the first update the sidecar sends keepalives,
+    so waiting for a tab or for ChatGPT to start answering is not silence.
+    """
+
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT
+    first_byte_timeout: float = DEFAULT_FIRST_BYTE_TIMEOUT
+    total_timeout: float = DEFAULT_TOTAL_TIMEOUT
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+
+    @classmethod
+    def from_options(cls, options: dict[str, Any]) -> RetryPolicy:
+        """Build the policy from entry options."""
+        return cls(
+            connect_timeout=float(
+                options.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT)
+            ),
+            first_byte_timeout=float(
+                options.get(CONF_FIRST_BYTE_TIMEOUT, DEFAULT_FIRST_BYTE_TIMEOUT)
+            ),
+            total_timeout=float(options.get(CONF_TOTAL_TIMEOUT, DEFAULT_TOTAL_TIMEOUT)),
+            max_attempts=max(1, int(options.get(CONF_MAX_ATTEMPTS, DEFAULT_MAX_ATTEMPTS))),
+        )
+
+    def client_timeout(
+        self, remaining: float, streaming: bool = True
+    ) -> aiohttp.ClientTimeout:
+        """Return the aiohttp timeout of an attempt with remaining seconds left.
+
+        A non-streaming reply only arrives once complete, so the first-byte
+        timeout applies to streamed requests only.
+        """
+        return aiohttp.ClientTimeout(
+            total=max(remaining, 0.001),
+            connect=self.connect_timeout,
+            sock_read=self.first_byte_timeout if streaming else None,
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait before retry number attempt, with full jitter."""
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt))
+
+
+class CircuitBreaker:
+    """Fail fast while the sidecar is known to be unusable.
+
+    The breaker opens after ``failure_threshold`` consecutive transport
+    failures, or at once when the sidecar reports it cannot serve requests
+    (logged out, still initializing). After ``reset_timeout`` seconds a
+    single trial request is let through; its outcome closes or reopens it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize the breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = BREAKER_CLOSED
+        self.reason: str | None = None
+        self._failures = 0
+        self._opened_at = 0.0
+        self.opened = 0
+        self.short_circuited = 0
+
+    def allow(self) -> bool:
+        """Return whether a request may be sent now."""
+        if self.state == BREAKER_CLOSED:
+            return True
+        if self.state == BREAKER_OPEN and (
+            time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self.state = BREAKER_HALF_OPEN
+            return True
+        self.short_circuited += 1
+        return False
+
+    def retry_after(self) -> float:
+        """Return the seconds until the next trial request is allowed."""
+        if self.state != BREAKER_OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful request."""
+        self.state = BREAKER_CLOSED
+        self.reason = None
+        self._failures = 0
+
+    def record_failure(self, reason: str) -> None:
+        """Count a transport failure, opening the breaker at the threshold."""
+        self._failures += 1
+        if self.state == BREAKER_HALF_OPEN or self._failures >= self.failure_threshold:
+            self.trip(reason)
+
+    def trip(self, reason: str) -> None:
+        """Open the breaker now."""
+        if self.state != BREAKER_OPEN:
+            self.opened += 1
+        self.state = BREAKER_OPEN
+        self.reason = reason
+        self._opened_at = time.monotonic()
+
+    def metrics(self) -> dict[str, Any]:
+        """Return the breaker state and counters."""
+        return {
+            "state": self.state,
+            "reason": self.reason,
+            "consecutive_failures": self._failures,
+            "retry_after": round(self.retry_after(), 1),
+            "opened": self.opened,
+            "short_circuited": self.short_circuited,
+        }
+
+
+def sidecar_unusable_reason(status: dict[str, Any]) -> str | None:
+    """Return why an /api/status reply means requests cannot succeed."""
+    if status.get("error"):
+        return f"Sidecar unavailable: {status['error']}"
+    if status.get("isLoggedIn") is False:
+        return "Sidecar is not logged in to ChatGPT"
+    return None
@@ -0,0 +1,216 @@
+"""Request scheduling for the ChatGPT sidecar."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, TypeVar
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_NORMAL = "normal"
+PRIORITY_BACKGROUND = "background"
+
+# Lower ranks are served first
+PRIORITY_RANKS = {
+    PRIORITY_INTERACTIVE: 0,
+    PRIORITY_NORMAL: 1,
+    PRIORITY_BACKGROUND: 2,
+}
+PRIORITIES = list(PRIORITY_RANKS)
+
+DEFAULT_CONCURRENCY = 1
+DEFAULT_MAX_QUEUE = 16
+DEFAULT_MAX_PER_CALLER = 4
+
+_T = TypeVar("_T")
+
+
+class QueueFullError(Exception):
+    """Raised when a request is refused or displaced by backpressure."""
+
+
+class _Waiter:
+    __slots__ = ("rank", "seq", "future")
+
+    def __init__(self, rank: int, seq: int, future: asyncio.Future) -> None:
+        self.rank = rank
+        self.seq = seq
+        self.future = future
+
+    def __lt__(self, other: _Waiter) -> bool:
+        return (self.rank, self.seq) < (other.rank, other.seq)
+
+
+class _Timing:
+    """Count, mean and max of a duration, in milliseconds."""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        millis = seconds * 1000
+        self.count += 1
+        self.total += millis
+        self.max = max(self.max, millis)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max, 3),
+        }
+
+
+class RequestScheduler:
+    """Bounded priority queue in front of the sidecar.
+
+    At most ``concurrency`` requests run at once; the rest wait in priority
+    order, first come first served within a priority. A request already
+    sent to the browser cannot be interrupted, so interactive requests
+    preempt by jumping the queue, and when the queue is full they displace
+    the newest request of the lowest waiting priority. Other requests are
+    refused when the queue is full, whatever is waiting. Each caller may have
+    at most ``max_per_caller`` requests queued or running.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        max_per_caller: int = DEFAULT_MAX_PER_CALLER,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_per_caller = max_per_caller
+        self._queue: list[_Waiter] = []
+        self._running = 0
+        self._callers: Counter[str] = Counter()
+        self._seq = itertools.count()
+        self._wait = {priority: _Timing() for priority in PRIORITIES}
+        self._service = {priority: _Timing() for priority in PRIORITIES}
+        self.rejected = 0
+        self.displaced = 0
+
+    @property
+    def queued(self) -> int:
+        """Return the number of requests waiting for a slot."""
+        return len(self._queue)
+
+    @property
+    def running(self) -> int:
+        """Return the number of requests being served."""
+        return self._running
+
+    async def run(
+        self,
+        func: Callable[[], Awaitable[_T]],
+        priority: str = PRIORITY_NORMAL,
+        caller: str | None = None,
+    ) -> _T:
+        """Run func once a slot is free, raising QueueFullError on backpressure."""
+        rank = PRIORITY_RANKS.get(priority, PRIORITY_RANKS[PRIORITY_NORMAL])
+        priority = PRIORITIES[rank]
+        caller = caller or "anonymous"
+        if self._callers[caller] >= self.max_per_caller:
+            self.rejected += 1
+            raise QueueFullError(
+                f"Too many pending requests for {caller} (limit {self.max_per_caller})"
+            )
+
+        self._callers[caller] += 1
+        enqueued = time.monotonic()
+        try:
+            if self._running < self.concurrency and not self._queue:
+                self._running += 1
+            else:
+                await self._async_wait_for_slot(rank)
+            self._wait[priority].add(time.monotonic() - enqueued)
+
+            started = time.monotonic()
+            try:
+                return await func()
+            finally:
+                self._service[priority].add(time.monotonic() - started)
+                self._release()
+        finally:
+            self._callers[caller] -= 1
+            if not self._callers[caller]:
+                del self._callers[caller]
+
+    def set_concurrency(self, concurrency: int) -> None:
+        """Change the number of slots, starting waiters if it grew.
+
+        When it shrinks, running requests finish and their slots are not
+        handed over until fewer than ``concurrency`` are running.
+        """
+        self.concurrency = max(1, concurrency)
+        while self._running < self.concurrency and self._queue:
+            waiter = heapq.heappop(self._queue)
+            if not waiter.future.done():
+                self._running += 1
+                waiter.future.set_result(None)
+
+    def metrics(self) -> dict[str, Any]:
+        """Return queue depth, backpressure counts and wait/service times."""
+        return {
+            "concurrency": self.concurrency,
+            "running": self._running,
+            "queued": len(self._queue),
+            "queued_by_priority": dict(
+                Counter(PRIORITIES[waiter.rank] for waiter in self._queue)
+            ),
+            "rejected": self.rejected,
+            "displaced": self.displaced,
+            "wait": {priority: timing.as_dict() for priority, timing in self._wait.items()},
+            "service": {
+                priority: timing.as_dict() for priority, timing in self._service.items()
+            },
+        }
+
+    async def _async_wait_for_slot(self, rank: int) -> None:
+        if len(self._queue) >= self.max_queue:
+            victim = max(self._queue)
+            if rank != PRIORITY_RANKS[PRIORITY_INTERACTIVE] or victim.rank <= rank:
+                self.rejected += 1
+                raise QueueFullError(
+                    f"Request queue is full ({self.max_queue} waiting)"
+                )
+            self._queue.remove(victim)
+            heapq.heapify(self._queue)
+            self.displaced += 1
+            victim.future.set_exception(
+                QueueFullError("Request displaced by a higher priority request")
+            )
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        waiter = _Waiter(rank, next(self._seq), future)
+        heapq.heappush(self._queue, waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                if future.exception() is None:
+                    # The slot was handed over just before the cancellation.
+                    self._release()
+                # Otherwise the waiter was displaced and never held a slot.
+            elif waiter in self._queue:
+                self._queue.remove(waiter)
+                heapq.heapify(self._queue)
+            raise
+
+    def _release(self) -> None:
+        """Hand the finished request's slot to the next waiter, if any."""
+        while self._queue and self._running <= self.concurrency:
+            waiter = heapq.heappop(self._queue)
+            if not waiter.future.done():
+                waiter.future.set_result(None)
+                return
+        self._running -= 1
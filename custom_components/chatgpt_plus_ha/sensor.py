@@ -0,0 +1,158 @@
+"""Performance sensor entities for ChatGPT Plus HA."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant
+
+from .agent import ChatGPTPlusAgent
+from .const import DOMAIN
+from .metrics import RollingHistogram
+
+# The statistics live in memory, so polling them is cheap
+SCAN_INTERVAL = timedelta(seconds=30)
+
+
+@dataclass(frozen=True, kw_only=True)
+class PerformanceSensorDescription(SensorEntityDescription):
+    """Describes a statistic of the agent's requests."""
+
+    value_fn: Callable[[ChatGPTPlusAgent], float | int | None]
+
+
+def _percentile(
+    histogram: Callable[[ChatGPTPlusAgent], RollingHistogram], percent: float
+) -> Callable[[ChatGPTPlusAgent], float | None]:
+    def value(agent: ChatGPTPlusAgent) -> float | None:
+        result = histogram(agent).snapshot().percentile(percent)
+        return None if result is None else round(result, 1)
+
+    return value
+
+
+def _latency(
+    key: str,
+    name: str,
+    histogram: Callable[[ChatGPTPlusAgent], RollingHistogram],
+    percent: float,
+) -> PerformanceSensorDescription:
+    return PerformanceSensorDescription(
+        key=key,
+        name=name,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=_percentile(histogram, percent),
+    )
+
+
+SENSORS: tuple[PerformanceSensorDescription, ...] = (
+    PerformanceSensorDescription(
+        key="request_rate",
+        name="Request Rate",
+        native_unit_of_measurement="requests/min",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda agent: agent.metrics.request_rate(),
+    ),
+    _latency("latency_p50", "Latency p50", lambda agent: agent.metrics.latency, 50),
+    _latency("latency_p95", "Latency p95", lambda agent: agent.metrics.latency, 95),
+    _latency(
+        "sidecar_latency_p95",
+        "Sidecar Latency p95",
+        lambda agent: agent.metrics.sidecar_latency,
+        95,
+    ),
+    _latency(
+        "context_latency_p95",
+        "Context Latency p95",
+        lambda agent: agent.metrics.context_latency,
+        95,
+    ),
+    PerformanceSensorDescription(
+        key="prompt_size_p50",
+        name="Prompt Size p50",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=_percentile(lambda agent: agent.metrics.prompt_bytes, 50),
+    ),
+    PerformanceSensorDescription(
+        key="queue_depth",
+        name="Queue Depth",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda agent: agent.scheduler.queued,
+    ),
+    PerformanceSensorDescription(
+        key="cache_hit_ratio",
+        name="Cache Hit Ratio",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda agent: agent.metrics.cache_hit_ratio(),
+    ),
+    PerformanceSensorDescription(
+        key="errors",
+        name="Errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda agent: agent.metrics.errors,
+    ),
+    PerformanceSensorDescription(
+        key="timeouts",
+        name="Timeouts",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda agent: agent.metrics.timeouts,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities
+) -> None:
+    """Set up performance sensor entities from a config entry."""
+    agent: ChatGPTPlusAgent = hass.data[DOMAIN][entry.entry_id]["agent"]
+    async_add_entities(
+        PerformanceSensor(agent, entry.entry_id, description) for description in SENSORS
+    )
+
+
+class PerformanceSensor(SensorEntity):
+    """A statistic of the agent's requests, polled from memory."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    entity_description: PerformanceSensorDescription
+
+    def __init__(
+        self,
+        agent: ChatGPTPlusAgent,
+        entry_id: str,
+        description: PerformanceSensorDescription,
+    ) -> None:
+        """Initialize the entity."""
+        self.entity_description = description
+        self._agent = agent
+        self._attr_unique_id = f"{entry_id}_{description.key}"
+        self._attr_name = f"ChatGPT Plus {description.name}"
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the statistic's current value."""
+        return self.entity_description.value_fn(self._agent)
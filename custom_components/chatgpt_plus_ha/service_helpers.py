@@ -4,10 +4,14 @@ from __future__ import annotations
 
 import json
 import re
-from typing import Any
+import time
+from typing import Any, Callable
 
 from homeassistant.util.yaml import parse_yaml
 
+# Seconds between the partial answer events of one streamed request
+DELTA_EVENT_INTERVAL = 0.2
+
 EVENT_TEMPLATES = {
     "garage_open": {
         "title": "Garage door left open",
@@ -110,3 +114,44 @@ def _flatten_actions(action: Any) -> list[dict[str, Any]]:
 def build_notification_template(event_type: str) -> dict[str, Any] | None:
     key = re.sub(r"[^a-z0-9_]", "_", event_type.lower()).strip("_")
     return EVENT_TEMPLATES.get(key)
+
+
+class DeltaThrottle:
+    """Batch the growth of a streamed answer into events.
+
+    Each event carries only the text added since the previous one, and
+    events are at most ``interval`` seconds apart, so an answer costs
+    about its own size in events rather than a copy per chunk. When the
+    answer was rewritten rather than extended, the event carries the
+    whole text with ``replace`` set.
+    """
+
+    def __init__(
+        self,
+        fire: Callable[[dict[str, Any]], None],
+        interval: float = DELTA_EVENT_INTERVAL,
+    ) -> None:
+        """Initialize the throttle."""
+        self._fire = fire
+        self._interval = interval
+        self._sent = ""
+        self._text = ""
+        self._last_fired = float("-inf")
+
+    def update(self, text: str, delta: str = "") -> None:
+        """Take the answer so far, firing an event if one is due."""
+        self._text = text
+        if time.monotonic() - self._last_fired >= self._interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Fire an event for any text not sent yet."""
+        text = self._text
+        if text == self._sent:
+            return
+        if text.startswith(self._sent):
+            self._fire({"delta": text[len(self._sent) :]})
+        else:
+            self._fire({"delta": text, "replace": True})
+        self._sent = text
+        self._last_fired = time.monotonic()
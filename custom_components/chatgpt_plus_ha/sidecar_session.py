@@ -0,0 +1,74 @@
+"""Dedicated HTTP session for ChatGPT sidecar traffic."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+# Idle connections are kept below the sidecar's own keep-alive (75s)
+KEEPALIVE_TIMEOUT = 60
+DNS_CACHE_TTL = 300
+# Connections beyond the request concurrency, for status and health checks
+EXTRA_CONNECTIONS = 2
+
+
+class ConnectionStats:
+    """Counts of requests and of new, reused and queued connections."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.requests = 0
+        self.created = 0
+        self.reused = 0
+        self.queued = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Return a trace config that feeds these counters."""
+        config = aiohttp.TraceConfig()
+        config.on_request_start.append(self._count("requests"))
+        config.on_connection_create_end.append(self._count("created"))
+        config.on_connection_reuseconn.append(self._count("reused"))
+        config.on_connection_queued_start.append(self._count("queued"))
+        config.on_dns_cache_hit.append(self._count("dns_cache_hits"))
+        config.on_dns_cache_miss.append(self._count("dns_cache_misses"))
+        return config
+
+    def _count(self, counter: str):
+        async def _on_signal(
+            session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+        ) -> None:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+        return _on_signal
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters and the share of requests on a reused connection."""
+        connections = self.created + self.reused
+        return {
+            "requests": self.requests,
+            "connections_created": self.created,
+            "connections_reused": self.reused,
+            "reuse_ratio": round(self.reused / connections, 3) if connections else 0.0,
+            "queued_for_connection": self.queued,
+            "dns_cache_hits": self.dns_cache_hits,
+            "dns_cache_misses": self.dns_cache_misses,
+        }
+
+
+def create_sidecar_session(
+    concurrency: int, stats: ConnectionStats
+) -> aiohttp.ClientSession:
+    """Create a session whose pool is sized and kept alive for one sidecar."""
+    connector = aiohttp.TCPConnector(
+        limit_per_host=concurrency + EXTRA_CONNECTIONS,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        use_dns_cache=True,
+        ttl_dns_cache=DNS_CACHE_TTL,
+    )
+    return aiohttp.ClientSession(
+        connector=connector, trace_configs=[stats.trace_config()]
+    )
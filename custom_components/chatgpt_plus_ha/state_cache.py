@@ -0,0 +1,96 @@
+"""Serialized entity state cache for ChatGPT Plus HA."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+
+from .redaction import RedactionEngine, redact_value
+
+DATA_STATE_CACHE = "state_cache"
+
+DEFAULT_STATE_CACHE_SIZE = 1024
+
+
+def serialize_state(
+    state: State, include_attributes: bool, redactor: RedactionEngine
+) -> dict[str, Any]:
+    """Serialize a state into its redacted context form."""
+    data = {
+        "entity_id": state.entity_id,
+        "state": redact_value(state.state),
+        "last_changed": state.last_changed.isoformat() if state.last_changed else None,
+        "last_updated": state.last_updated.isoformat() if state.last_updated else None,
+    }
+    if include_attributes:
+        data["attributes"] = redactor.redact_attributes(state)
+    return data
+
+
+class SerializedStateCache:
+    """Serialized states keyed by entity, last_updated and attribute mode.
+
+    Entries for an entity are dropped as soon as it fires state_changed,
+    and the least recently used entries go once the cap is reached.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, max_entries: int = DEFAULT_STATE_CACHE_SIZE
+    ) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self._max_entries = max_entries
+        self._entries: OrderedDict[
+            tuple[str, bool], tuple[datetime, dict[str, Any]]
+        ] = OrderedDict()
+        self._unsub: CALLBACK_TYPE | None = None
+        self.hits = 0
+        self.misses = 0
+
+    @callback
+    def async_start(self) -> None:
+        """Start evicting entries on state changes."""
+        self._unsub = self.hass.bus.async_listen(
+            EVENT_STATE_CHANGED, self._async_state_changed
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening and drop all entries."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._entries.clear()
+
+    def get(
+        self, state: State, include_attributes: bool, redactor: RedactionEngine
+    ) -> dict[str, Any]:
+        """Return the serialized state, reusing a cached copy when current."""
+        key = (state.entity_id, include_attributes)
+        cached = self._entries.get(key)
+        if cached is not None and cached[0] == state.last_updated:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        data = serialize_state(state, include_attributes, redactor)
+        self._entries[key] = (state.last_updated, data)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return data
+
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+        return len(self._entries)
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        entity_id = event.data["entity_id"]
+        self._entries.pop((entity_id, False), None)
+        self._entries.pop((entity_id, True), None)
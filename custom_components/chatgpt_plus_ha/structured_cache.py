@@ -0,0 +1,124 @@
+"""Persistent cache of structured service responses for ChatGPT Plus HA."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+DATA_STRUCTURED_CACHE = "structured_cache"
+
+STORAGE_KEY = f"{DOMAIN}.structured_responses"
+STORAGE_VERSION = 1
+SAVE_DELAY = 30
+
+DEFAULT_STRUCTURED_CACHE_SIZE = 200
+DEFAULT_STRUCTURED_CACHE_TTL = 7 * 24 * 3600
+
+
+def structured_key(
+    service: str, subject: Any, summary: str, template_version: int
+) -> str:
+    """Key a structured request by its subject, context and prompt template."""
+    material = json.dumps(
+        [
+            service,
+            subject,
+            hashlib.sha256(summary.encode()).hexdigest(),
+            template_version,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class StructuredResponseCache:
+    """Parsed model output of generate_automation and compose_notification.
+
+    Entries live in HA storage, expire after ``ttl`` seconds and the least
+    recently used go once ``max_entries`` is reached. Only the model's
+    parsed JSON is kept; callers rebuild (and revalidate) responses from it.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_entries: int = DEFAULT_STRUCTURED_CACHE_SIZE,
+        ttl: float = DEFAULT_STRUCTURED_CACHE_TTL,
+    ) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def async_load(self) -> None:
+        """Load the persisted entries, dropping expired ones."""
+        data = await self._store.async_load() or {}
+        now = time.time()
+        entries = sorted(
+            (
+                (key, entry)
+                for key, entry in (data.get("entries") or {}).items()
+                if isinstance(entry, dict) and entry.get("expires", 0) > now
+            ),
+            key=lambda item: item[1].get("used", 0),
+        )
+        self._entries = OrderedDict(entries[-self._max_entries :])
+
+    async def async_save(self) -> None:
+        """Write the entries to storage now."""
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def async_get(self, key: str) -> dict[str, Any] | None:
+        """Return a copy of the cached payload, if present and fresh."""
+        entry = self._entries.get(key)
+        now = time.time()
+        if entry is None or entry["expires"] <= now:
+            if entry is not None:
+                del self._entries[key]
+                self._schedule_save()
+            self.misses += 1
+            return None
+        entry["used"] = now
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(entry["payload"])
+
+    @callback
+    def async_set(self, key: str, payload: dict[str, Any]) -> None:
+        """Cache a parsed payload."""
+        now = time.time()
+        self._entries[key] = {
+            "payload": dict(payload),
+            "expires": now + self._ttl,
+            "used": now,
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        self._schedule_save()
+
+    def __len__(self) -> int:
+        """Return the number of cached payloads."""
+        return len(self._entries)
+
+    @callback
+    def _schedule_save(self) -> None:
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"entries": dict(self._entries)}
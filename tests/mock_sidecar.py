@@ -0,0 +1,238 @@
+"""A local stand-in for the ChatGPT sidecar add-on.
+
+Implements the sidecar's HTTP API with configurable latency, jitter,
+failure rate and reply size, so the integration can be tested and
+benchmarked without a browser or a ChatGPT login.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+import itertools
+import json
+import random
+from typing import Any, AsyncIterator
+
+from aiohttp import web
+
+MOCK_AUTOMATION = (
+    "alias: Mock automation\n"
+    "triggers:\n"
+    "  - trigger: state\n"
+    "    entity_id: binary_sensor.mock_motion\n"
+    "    to: 'on'\n"
+    "actions:\n"
+    "  - action: light.turn_on\n"
+    "    target:\n"
+    "      entity_id: light.mock\n"
+)
+
+
+class MockSidecar:
+    """Serve the sidecar API from an in-process aiohttp server.
+
+    Replies are a JSON object that the automation and notification
+    services can parse, padded to ``response_size`` characters. Each chat
+    request waits ``latency`` seconds plus up to ``jitter`` seconds either
+    way and fails with a 503 with probability ``failure_rate``. At most
+    ``page_pool_size`` chats are answered at once, like the add-on's tabs,
+    and chats continuing the same conversation wait for each other, like
+    the tab holding it. ``peak_busy_tabs`` records the most tabs in use.
+    Streamed replies start after ``thinking`` seconds, with a keepalive
+    comment every ``keepalive`` seconds meanwhile, like the add-on.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        response_size: int = 200,
+        page_pool_size: int = 1,
+        streaming: bool = True,
+        stream_chunks: int = 4,
+        thinking: float = 0.0,
+        keepalive: float | None = None,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize the mock."""
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.response_size = response_size
+        self.page_pool_size = page_pool_size
+        self.streaming = streaming
+        self.stream_chunks = max(1, stream_chunks)
+        self.thinking = thinking
+        self.keepalive = keepalive
+        self.requests: dict[str, int] = {}
+        self.failures = 0
+        self.conversation_id: str | None = None
+        self._random = random.Random(seed)
+        self._conversations = itertools.count(1)
+        self._tabs = asyncio.Semaphore(page_pool_size)
+        self._conversation_locks: dict[str, asyncio.Lock] = {}
+        self.busy_tabs = 0
+        self.peak_busy_tabs = 0
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL."""
+        app = web.Application()
+        app.router.add_get("/health", self._health)
+        app.router.add_get("/api/status", self._status)
+        app.router.add_post("/api/chat", self._chat)
+        app.router.add_post("/api/conversation/new", self._new_conversation)
+        if self.streaming:
+            app.router.add_post("/api/chat/stream", self._chat_stream)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        self.url = f"http://{host}:{self._runner.addresses[0][1]}"
+        return self.url
+
+    async def close(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> MockSidecar:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def reply(self, message: str) -> str:
+        """Return the reply to a message."""
+        payload = {
+            "title": "Mock reply",
+            "message": "",
+            "yaml": MOCK_AUTOMATION,
+            "explanation": "Generated by the mock sidecar.",
+            "assumptions": [],
+            "questions_if_needed": [],
+            "actions": [],
+            "follow_up_questions": [],
+        }
+        padding = self.response_size - len(json.dumps(payload))
+        payload["message"] = ("lorem ipsum " * (padding // 12 + 1))[: max(padding, 0)]
+        return json.dumps(payload)
+
+    def _count(self, endpoint: str) -> None:
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def _fails(self) -> bool:
+        if self._random.random() < self.failure_rate:
+            self.failures += 1
+            return True
+        return False
+
+    @asynccontextmanager
+    async def _tab(self, conversation_id: str | None) -> AsyncIterator[None]:
+        lock = None
+        if conversation_id:
+            lock = self._conversation_locks.setdefault(conversation_id, asyncio.Lock())
+            await lock.acquire()
+        try:
+            async with self._tabs:
+                self.busy_tabs += 1
+                self.peak_busy_tabs = max(self.peak_busy_tabs, self.busy_tabs)
+                try:
+                    yield
+                finally:
+                    self.busy_tabs -= 1
+        finally:
+            if lock is not None:
+                lock.release()
+
+    def _conversation(self, requested: str | None) -> str:
+        self.conversation_id = requested or f"mock-{next(self._conversations)}"
+        return self.conversation_id
+
+    async def _health(self, request: web.Request) -> web.Response:
+        self._count("health")
+        return web.json_response({"status": "healthy", "timestamp": "mock"})
+
+    async def _status(self, request: web.Request) -> web.Response:
+        self._count("status")
+        return web.json_response(
+            {
+                "isLoggedIn": True,
+                "conversationId": self.conversation_id,
+                "headless": True,
+                "pagePool": {"size": self.page_pool_size},
+            }
+        )
+
+    async def _new_conversation(self, request: web.Request) -> web.Response:
+        self._count("new_conversation")
+        self.conversation_id = None
+        return web.json_response({"success": True, "message": "New conversation started"})
+
+    async def _chat(self, request: web.Request) -> web.Response:
+        self._count("chat")
+        body = await request.json()
+        async with self._tab(body.get("conversationId")):
+            await asyncio.sleep(self._delay())
+            if self._fails():
+                return web.json_response(
+                    {"error": "Failed to send message", "message": "Mock failure"},
+                    status=503,
+                )
+            return web.json_response(
+                {
+                    "success": True,
+                    "message": self.reply(body["message"]),
+                    "conversationId": self._conversation(body.get("conversationId")),
+                }
+            )
+
+    async def _chat_stream(self, request: web.Request) -> web.StreamResponse:
+        self._count("chat_stream")
+        body = await request.json()
+        async with self._tab(body.get("conversationId")):
+            delay = self._delay()
+            if self._fails():
+                await asyncio.sleep(delay)
+                return web.json_response(
+                    {"error": "Failed to send message", "message": "Mock failure"},
+                    status=503,
+                )
+            response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+            await response.prepare(request)
+
+            async def send(event: str, data: dict[str, Any]) -> None:
+                await response.write(
+                    f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+                )
+
+            thought = 0.0
+            while thought < self.thinking:
+                pause = min(self.keepalive or self.thinking, self.thinking - thought)
+                await asyncio.sleep(pause)
+                thought += pause
+                if self.keepalive:
+                    await response.write(b": keepalive\n\n")
+
+            reply = self.reply(body["message"])
+            step = -(-len(reply) // self.stream_chunks)
+            for start in range(0, len(reply), step):
+                await asyncio.sleep(delay / self.stream_chunks)
+                await send("delta", {"delta": reply[start : start + step]})
+            await send(
+                "done",
+                {
+                    "success": True,
+                    "message": reply,
+                    "conversationId": self._conversation(body.get("conversationId")),
+                },
+            )
+            await response.write_eof()
+            return response
@@ -0,0 +1,30 @@
+from custom_components.chatgpt_plus_ha.budget import (
+    BudgetItem,
+    estimate_tokens,
+    pack_items,
+    rank_value,
+)
+
+
+def test_estimate_tokens_rounds_up():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abc") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_pack_items_prefers_value_and_fills_with_smaller_items():
+    items = [
+        BudgetItem("entities", 0, rank_value(1.0, 0), 40),
+        BudgetItem("entities", 1, rank_value(1.0, 1), 40),
+        BudgetItem("history", 0, rank_value(0.8, 0), 30),
+        BudgetItem("history", 1, rank_value(0.8, 1), 5),
+    ]
+    kept = pack_items(items, 90, {"history": 10})
+    assert kept == {"entities": [0, 1]}
+
+    # history 0 and its heading no longer fit, the smaller history 1 does
+    kept = pack_items(items, 100, {"history": 10})
+    assert kept == {"entities": [0, 1], "history": [1]}
+
+    kept = pack_items(items, 120, {"history": 10})
+    assert kept == {"entities": [0, 1], "history": [0]}
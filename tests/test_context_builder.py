@@ -1,8 +1,24 @@
+import asyncio
+from datetime import timedelta
+
 import pytest
 
 from homeassistant.core import State
+from homeassistant.util import dt as dt_util
 
 from custom_components.chatgpt_plus_ha import context as ctx
+from custom_components.chatgpt_plus_ha import index as idx
+from custom_components.chatgpt_plus_ha.const import DOMAIN
+from custom_components.chatgpt_plus_ha.filters import EntityFilter
+from custom_components.chatgpt_plus_ha.recent_changes import (
+    DATA_RECENT_CHANGES,
+    RecentChangesBuffer,
+)
+
+
+class FakeEvent:
+    def __init__(self, data):
+        self.data = data
 
 
 class FakeStates:
@@ -12,6 +28,12 @@ class FakeStates:
     def async_all(self):
         return list(self._states)
 
+    def get(self, entity_id):
+        for state in self._states:
+            if state.entity_id == entity_id:
+                return state
+        return None
+
 
 class FakeConfig:
     def __init__(self, components=None):
@@ -22,6 +44,7 @@ class FakeHass:
     def __init__(self, states):
         self.states = FakeStates(states)
         self.config = FakeConfig()
+        self.data = {}
 
     async def async_add_executor_job(self, func, *args, **kwargs):
         return func(*args, **kwargs)
@@ -74,9 +97,9 @@ class FakeEntityRegistry:
 
 @pytest.mark.asyncio
 async def test_build_context_selects_relevant_entity(monkeypatch):
-    monkeypatch.setattr(ctx.area_registry, "async_get", lambda hass: FakeAreaRegistry())
-    monkeypatch.setattr(ctx.device_registry, "async_get", lambda hass: FakeDeviceRegistry())
-    monkeypatch.setattr(ctx.entity_registry, "async_get", lambda hass: FakeEntityRegistry())
+    monkeypatch.setattr(idx.area_registry, "async_get", lambda hass: FakeAreaRegistry())
+    monkeypatch.setattr(idx.device_registry, "async_get", lambda hass: FakeDeviceRegistry())
+    monkeypatch.setattr(idx.entity_registry, "async_get", lambda hass: FakeEntityRegistry())
 
     states = [
         State("light.kitchen", "on", {"friendly_name": "Kitchen Light"}),
@@ -94,5 +117,252 @@ async def test_build_context_selects_relevant_entity(monkeypatch):
 
 
 def test_redact_value_masks_tokens():
-    assert ctx._redact_value("sk-testtoken1234567890") == "[redacted]"
-    assert ctx._redact_value("user@example.com") == "[redacted]"
+    assert ctx.redact_value("sk-testtoken1234567890") == "[redacted]"
+    assert ctx.redact_value("user@example.com") == "[redacted]"
+
+
+@pytest.mark.asyncio
+async def test_build_context_expands_to_related_area(monkeypatch):
+    entity_reg = FakeEntityRegistry()
+    entity_reg.entities["switch.coffee"] = FakeEntityEntry(
+        "switch.coffee", "Coffee Maker", None, "kitchen", platform="switch"
+    )
+    entity_reg.entities["switch.kettle"] = FakeEntityEntry(
+        "switch.kettle", "Kettle", None, "kitchen", platform="switch"
+    )
+    monkeypatch.setattr(idx.area_registry, "async_get", lambda hass: FakeAreaRegistry())
+    monkeypatch.setattr(idx.device_registry, "async_get", lambda hass: FakeDeviceRegistry())
+    monkeypatch.setattr(idx.entity_registry, "async_get", lambda hass: entity_reg)
+
+    states = [
+        State("sensor.outdoor_temp", "72"),
+        State("switch.kettle", "off"),
+        State("light.kitchen", "on"),
+        State("switch.coffee", "off"),
+    ]
+    hass = FakeHass(states)
+
+    result = await ctx.build_context(
+        hass,
+        "light",
+        {
+            "include_history": False,
+            "include_logbook": False,
+            "max_entities": 2,
+            "denylist_entities": ["switch.kettle"],
+        },
+    )
+
+    assert [entity["entity_id"] for entity in result["entities"]] == [
+        "light.kitchen",
+        "switch.coffee",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_build_context_queries_history_for_changed_entities(monkeypatch):
+    monkeypatch.setattr(idx.area_registry, "async_get", lambda hass: FakeAreaRegistry())
+    monkeypatch.setattr(idx.device_registry, "async_get", lambda hass: FakeDeviceRegistry())
+    monkeypatch.setattr(idx.entity_registry, "async_get", lambda hass: FakeEntityRegistry())
+
+    now = dt_util.utcnow()
+
+    def changed(entity_id, state, ago):
+        return State(entity_id, state, last_changed=now - ago, last_updated=now - ago)
+
+    states = [
+        changed("light.kitchen", "on", timedelta(minutes=5)),
+        changed("sensor.outdoor_temp", "72", timedelta(days=2)),
+        changed("lock.front_door", "unlocked", timedelta(minutes=1)),
+        changed("lock.back_door", "locked", timedelta(minutes=2)),
+        changed("climate.hallway", "heat", timedelta(minutes=20)),
+    ]
+    hass = FakeHass(states)
+    hass.config.components.add("recorder")
+
+    queried = []
+    # Rows as the recorder returns them with significant_changes_only: state
+    # changes, plus attribute updates of climate entities, whose last_changed
+    # is not read and so equals last_updated.
+    rows = {
+        "light.kitchen": [changed("light.kitchen", "off", timedelta(minutes=30)), states[0]],
+        "lock.front_door": [states[2]],
+        "climate.hallway": [states[4], changed("climate.hallway", "heat", timedelta(minutes=3))],
+    }
+
+    def fake_significant_states(hass, start_time, end_time, entity_ids=None, **kwargs):
+        queried.append((sorted(entity_ids), kwargs["significant_changes_only"]))
+        return {entity_id: rows[entity_id] for entity_id in entity_ids if entity_id in rows}
+
+    monkeypatch.setattr(ctx, "get_instance", lambda hass: hass)
+    monkeypatch.setattr(ctx.history, "get_significant_states", fake_significant_states)
+
+    result = await ctx.build_context(
+        hass,
+        "kitchen",
+        {
+            "include_logbook": False,
+            "recent_mode": True,
+            "denylist_entities": ["lock.back_door"],
+        },
+    )
+
+    assert queried == [(["climate.hallway", "light.kitchen", "lock.front_door"], True)]
+    assert result["recent_changes"] == [
+        f"lock.front_door changed to unlocked at {states[2].last_changed.isoformat()}",
+        f"light.kitchen changed to on at {states[0].last_changed.isoformat()}",
+        f"climate.hallway changed to heat at {states[4].last_changed.isoformat()}",
+        f"light.kitchen changed to off at {(now - timedelta(minutes=30)).isoformat()}",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_build_context_serves_history_from_recent_changes_buffer(monkeypatch):
+    monkeypatch.setattr(idx.area_registry, "async_get", lambda hass: FakeAreaRegistry())
+    monkeypatch.setattr(idx.device_registry, "async_get", lambda hass: FakeDeviceRegistry())
+    monkeypatch.setattr(idx.entity_registry, "async_get", lambda hass: FakeEntityRegistry())
+
+    now = dt_util.utcnow()
+    states = [State("light.kitchen", "on", last_changed=now - timedelta(minutes=5))]
+    hass = FakeHass(states)
+    hass.config.components.add("recorder")
+
+    buffer = RecentChangesBuffer(hass)
+    buffer._covered_since = now - timedelta(days=1)
+    buffer.async_configure([{}])
+    buffer._async_state_changed(
+        FakeEvent(
+            {
+                "entity_id": "light.kitchen",
+                "old_state": State("light.kitchen", "off"),
+                "new_state": states[0],
+            }
+        )
+    )
+    hass.data[DOMAIN] = {DATA_RECENT_CHANGES: buffer}
+
+    def fail_recorder(hass):
+        raise AssertionError("recorder should not be queried")
+
+    monkeypatch.setattr(ctx, "get_instance", fail_recorder)
+
+    result = await ctx.build_context(hass, "kitchen", {"include_logbook": False})
+
+    assert result["recent_changes"] == [
+        f"light.kitchen changed to on at {states[0].last_changed.isoformat()}"
+    ]
+
+
+def test_buffer_and_recorder_describe_the_same_changes(monkeypatch):
+    now = dt_util.utcnow()
+    timeline = [
+        ("light.kitchen", "off", "on", timedelta(minutes=40)),
+        ("light.kitchen", "on", "off", timedelta(minutes=20)),
+        ("lock.front_door", "locked", "unlocked", timedelta(minutes=15)),
+        ("light.kitchen", "off", "on", timedelta(minutes=10)),
+        ("light.kitchen", "on", "off", timedelta(minutes=5)),
+    ]
+    changes = [
+        State(entity_id, new, last_changed=now - ago, last_updated=now - ago)
+        for entity_id, _, new, ago in timeline
+    ]
+    hass = FakeHass(changes)
+
+    buffer = RecentChangesBuffer(hass)
+    buffer._covered_since = now - timedelta(days=1)
+    buffer.async_configure([{}])
+    for (entity_id, old, _, _), change in zip(timeline, changes):
+        buffer._async_state_changed(
+            FakeEvent(
+                {
+                    "entity_id": entity_id,
+                    "old_state": State(entity_id, old),
+                    "new_state": change,
+                }
+            )
+        )
+
+    def fake_significant_states(hass, start_time, end_time, entity_ids=None, **kwargs):
+        return {
+            entity_id: [change for change in changes if change.entity_id == entity_id]
+            for entity_id in entity_ids
+        }
+
+    monkeypatch.setattr(ctx.history, "get_significant_states", fake_significant_states)
+
+    start_time = now - timedelta(hours=1)
+    buffered = ctx._buffered_changes(
+        buffer, [], True, start_time, EntityFilter.from_options({}), depth=2
+    )
+    recorded = ctx._recent_changes(
+        hass, ["light.kitchen", "lock.front_door"], start_time, now, depth=2
+    )
+
+    assert buffered == recorded == [
+        f"light.kitchen changed to off at {changes[4].last_changed.isoformat()}",
+        f"light.kitchen changed to on at {changes[3].last_changed.isoformat()}",
+        f"lock.front_door changed to unlocked at {changes[2].last_changed.isoformat()}",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_build_context_drops_slow_stages_and_reports_timings(monkeypatch):
+    monkeypatch.setattr(idx.area_registry, "async_get", lambda hass: FakeAreaRegistry())
+    monkeypatch.setattr(idx.device_registry, "async_get", lambda hass: FakeDeviceRegistry())
+    monkeypatch.setattr(idx.entity_registry, "async_get", lambda hass: FakeEntityRegistry())
+    monkeypatch.setattr(ctx, "HISTORY_STAGE_TIMEOUT", 0.05)
+
+    hass = FakeHass([State("light.kitchen", "on")])
+    hass.config.components.update({"recorder", "logbook"})
+    started = []
+
+    async def slow_history(*args):
+        started.append("history")
+        await asyncio.sleep(1)
+        return ["never"]
+
+    async def fast_logbook(*args):
+        started.append("logbook")
+        return ["t1: light.kitchen changed to on"]
+
+    monkeypatch.setattr(ctx, "_async_history_stage", slow_history)
+    monkeypatch.setattr(ctx, "_async_logbook_stage", fast_logbook)
+
+    result = await ctx.build_context(hass, "kitchen", {})
+
+    assert sorted(started) == ["history", "logbook"]
+    assert result["recent_changes"] == []
+    assert result["logbook"] == ["t1: light.kitchen changed to on"]
+    assert result["debug"]["degraded"] == ["history"]
+    assert set(result["debug"]["timings_ms"]) == {
+        "index",
+        "scoring",
+        "related",
+        "serialization",
+        "history",
+        "logbook",
+        "budget",
+    }
+    assert result["debug"]["timings_ms"]["history"] < 1000
+    assert result["debug"]["counters"]["entities_selected"] == 1
+    assert result["debug"]["counters"]["logbook_entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_build_context_packs_entities_under_token_budget(monkeypatch):
+    monkeypatch.setattr(idx.area_registry, "async_get", lambda hass: FakeAreaRegistry())
+    monkeypatch.setattr(idx.device_registry, "async_get", lambda hass: FakeDeviceRegistry())
+    monkeypatch.setattr(idx.entity_registry, "async_get", lambda hass: FakeEntityRegistry())
+
+    states = [State(f"sensor.kitchen_{n}", str(n)) for n in range(20)]
+    hass = FakeHass(states)
+    options = {"include_history": False, "include_logbook": False}
+
+    unbounded = await ctx.build_context(hass, "kitchen", {**options, "token_budget": 100000})
+    bounded = await ctx.build_context(hass, "kitchen", {**options, "token_budget": 200})
+
+    assert len(unbounded["entities"]) == 20
+    assert 0 < len(bounded["entities"]) < 20
+    assert bounded["entities"] == unbounded["entities"][: len(bounded["entities"])]
+    assert bounded["debug"]["estimated_tokens"] <= 200
+    assert bounded["summary"].startswith(f"Relevant entities ({len(bounded['entities'])}):")
@@ -0,0 +1,197 @@
+import re
+
+from homeassistant.core import State
+
+from custom_components.chatgpt_plus_ha import index as idx
+
+
+class FakeEvent:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeStates:
+    def __init__(self, states):
+        self._states = states
+
+    def async_all(self):
+        return list(self._states)
+
+
+class FakeHass:
+    def __init__(self, states=()):
+        self.data = {}
+        self.states = FakeStates(states)
+
+
+class FakeArea:
+    def __init__(self, area_id, name):
+        self.id = area_id
+        self.name = name
+
+
+class FakeAreaRegistry:
+    def __init__(self):
+        self.areas = {"kitchen": FakeArea("kitchen", "Kitchen")}
+
+    def async_list_areas(self):
+        return list(self.areas.values())
+
+    def async_get_area(self, area_id):
+        return self.areas.get(area_id)
+
+
+class FakeDevice:
+    def __init__(self, device_id, name, area_id):
+        self.id = device_id
+        self.name = name
+        self.area_id = area_id
+
+
+class FakeDeviceRegistry:
+    def __init__(self):
+        self.devices = {"dev1": FakeDevice("dev1", "Kitchen Device", "kitchen")}
+
+    def async_get(self, device_id):
+        return self.devices.get(device_id)
+
+
+class FakeEntityEntry:
+    def __init__(self, entity_id, name, device_id, area_id, platform="light"):
+        self.entity_id = entity_id
+        self.name = name
+        self.device_id = device_id
+        self.area_id = area_id
+        self.platform = platform
+        self.disabled = False
+
+
+class FakeEntityRegistry:
+    def __init__(self):
+        self.entities = {
+            "light.kitchen": FakeEntityEntry("light.kitchen", "Kitchen Light", "dev1", None)
+        }
+
+    def async_get(self, entity_id):
+        return self.entities.get(entity_id)
+
+
+def _build_index(monkeypatch, states=()):
+    areas = FakeAreaRegistry()
+    devices = FakeDeviceRegistry()
+    entities = FakeEntityRegistry()
+    monkeypatch.setattr(idx.area_registry, "async_get", lambda hass: areas)
+    monkeypatch.setattr(idx.device_registry, "async_get", lambda hass: devices)
+    monkeypatch.setattr(idx.entity_registry, "async_get", lambda hass: entities)
+    index = idx.EntityIndex(FakeHass(states))
+    index.async_build()
+    return index, areas, devices, entities
+
+
+def test_index_resolves_area_through_device(monkeypatch):
+    index, _, _, _ = _build_index(monkeypatch)
+    meta = index.get_meta("light.kitchen")
+    assert meta["area_id"] == "kitchen"
+    assert meta["area_name"] == "Kitchen"
+    assert meta["device_name"] == "Kitchen Device"
+
+
+def test_index_follows_registry_updates(monkeypatch):
+    index, areas, devices, entities = _build_index(monkeypatch)
+
+    areas.areas["kitchen"].name = "Cook Space"
+    index._async_area_registry_updated(FakeEvent({"action": "update", "area_id": "kitchen"}))
+    assert index.get_meta("light.kitchen")["area_name"] == "Cook Space"
+
+    areas.areas["garage"] = FakeArea("garage", "Garage")
+    devices.devices["dev1"].area_id = "garage"
+    index._async_device_registry_updated(FakeEvent({"action": "update", "device_id": "dev1"}))
+    assert index.get_meta("light.kitchen")["area_name"] is None
+    index._async_area_registry_updated(FakeEvent({"action": "create", "area_id": "garage"}))
+    assert index.get_meta("light.kitchen")["area_name"] == "Garage"
+
+    entities.entities["light.garage"] = entities.entities.pop("light.kitchen")
+    entities.entities["light.garage"].entity_id = "light.garage"
+    index._async_entity_registry_updated(
+        FakeEvent(
+            {"action": "update", "entity_id": "light.garage", "old_entity_id": "light.kitchen"}
+        )
+    )
+    assert index.get_meta("light.kitchen") == {}
+    assert index.get_meta("light.garage")["area_id"] == "garage"
+
+    index._async_entity_registry_updated(
+        FakeEvent({"action": "remove", "entity_id": "light.garage"})
+    )
+    assert index.entity_meta == {}
+
+
+def _reference_scores(index, states, question_tokens, focus_area_tokens):
+    def match(text, tokens):
+        if not text:
+            return 0
+        normalized = re.sub(r"[^a-z0-9\s_-]", " ", text.lower())
+        return sum(1 for token in tokens if token in normalized)
+
+    scores = {}
+    for state in states:
+        entity_id = state.entity_id
+        meta = index.get_meta(entity_id)
+        score = match(entity_id, question_tokens) * 2
+        score += match(meta.get("name") or "", question_tokens) * 3
+        score += match(meta.get("area_name") or "", question_tokens) * 3
+        score += match(meta.get("device_name") or "", question_tokens) * 2
+        score += match(meta.get("area_name") or "", focus_area_tokens) * 4
+        score += match(entity_id.split(".", 1)[0], question_tokens)
+        if score:
+            scores[entity_id] = score
+    return scores
+
+
+def test_token_index_matches_substring_scoring(monkeypatch):
+    states = [
+        State("light.kitchen", "on"),
+        State("sensor.kitchen_temperature", "21"),
+        State("switch.garage_door", "off"),
+    ]
+    index, _, _, _ = _build_index(monkeypatch, states)
+
+    for question, focus in (
+        ("is the kitchen light on?", ""),
+        ("temp in the kit", "kitchen"),
+        ("garage-door status", ""),
+        ("what is light", "cook"),
+    ):
+        question_tokens = set(idx.tokenize(question))
+        focus_tokens = set(idx.tokenize(focus))
+        assert index.score(question_tokens, focus_tokens) == _reference_scores(
+            index, states, question_tokens, focus_tokens
+        )
+
+
+def test_token_index_follows_state_changes(monkeypatch):
+    index, _, _, _ = _build_index(monkeypatch, [State("light.kitchen", "on")])
+    index._async_state_changed(
+        FakeEvent({"entity_id": "fan.attic", "old_state": None, "new_state": object()})
+    )
+    assert index.score({"attic"}) == {"fan.attic": 2}
+    assert index.state_order("fan.attic") > index.state_order("light.kitchen")
+
+    index._async_state_changed(
+        FakeEvent({"entity_id": "fan.attic", "old_state": object(), "new_state": None})
+    )
+    assert index.score({"attic"}) == {}
+    assert index.score({"kitchen"}) == {"light.kitchen": 2 + 3 + 3 + 2}
+
+
+def test_substring_cache_keeps_recent_tokens(monkeypatch):
+    monkeypatch.setattr(idx, "SUBSTRING_CACHE_SIZE", 2)
+    index, _, _, _ = _build_index(monkeypatch, [State("light.kitchen", "on")])
+
+    index.score({"kit"})
+    index.score({"light"})
+    index.score({"kit"})
+    index.score({"garage"})
+
+    assert list(index._substring_cache) == ["kit", "garage"]
+    assert index.score({"kit"}) == {"light.kitchen": 2 + 3 + 3 + 2}
@@ -0,0 +1,64 @@
+import pytest
+
+from custom_components.chatgpt_plus_ha.agent import ChatGPTPlusAgent
+from custom_components.chatgpt_plus_ha.health import evaluate_health
+
+
+def test_evaluate_health():
+    assert evaluate_health({"status": "healthy"}, {"isLoggedIn": True}) == {
+        "healthy": True,
+        "reason": None,
+        "logged_in": True,
+    }
+    assert not evaluate_health({"status": "healthy"}, {"isLoggedIn": False})["healthy"]
+    assert evaluate_health({"status": "initializing"}, None)["reason"] == (
+        "Sidecar not ready: initializing"
+    )
+    assert evaluate_health({"error": "refused"}, None)["reason"] == (
+        "Sidecar unreachable: refused"
+    )
+
+
+class FakeMonitor:
+    def __init__(self, reason):
+        self.unhealthy_reason = reason
+        self.refreshed = 0
+
+    async def async_refresh(self):
+        self.refreshed += 1
+
+
+@pytest.mark.asyncio
+async def test_agent_rejects_while_sidecar_is_unhealthy():
+    agent = ChatGPTPlusAgent(None, "http://sidecar")
+    agent.health_monitor = FakeMonitor("Sidecar is not logged in to ChatGPT")
+    sent = []
+
+    async def fake_send(message, on_delta, remaining, conversation_id=None):
+        sent.append(message)
+        return {"success": True, "message": "hi"}
+
+    agent._send_message_stream_raw = fake_send
+
+    result = await agent._exchange("hello", False)
+    assert result["error"] == "sidecar_unavailable"
+    assert sent == []
+
+    agent.health_monitor.unhealthy_reason = None
+    assert (await agent._exchange("hello", False))["success"]
+
+
+@pytest.mark.asyncio
+async def test_failure_refreshes_the_monitor():
+    agent = ChatGPTPlusAgent(None, "http://sidecar")
+    monitor = agent.health_monitor = FakeMonitor(None)
+
+    async def fake_send(message, on_delta, remaining, conversation_id=None):
+        monitor.unhealthy_reason = "Sidecar unreachable: refused"
+        return {"success": False, "error": "connect", "message": "refused"}
+
+    agent._send_message_stream_raw = fake_send
+
+    result = await agent._exchange("hello", False)
+    assert monitor.refreshed == 1
+    assert result["error"] == "sidecar_unavailable"
@@ -0,0 +1,100 @@
+from custom_components.chatgpt_plus_ha import logbook_stream
+from custom_components.chatgpt_plus_ha.filters import EntityFilter
+
+
+class FakeProcessor:
+    def __init__(self, events=()):
+        self.humanified = 0
+        self.events = list(events)
+
+    def humanify(self, rows):
+        self.humanified += len(rows)
+        return [dict(row) for row in rows]
+
+    def get_events(self, start_time, end_time):
+        return self.humanify(self.events)
+
+
+def test_read_logbook_entries_stops_after_limit(monkeypatch):
+    fetched = []
+    closed = []
+
+    def fake_rows(hass, event_processor, start_time, end_time):
+        try:
+            for chunk in range(100):
+                fetched.append(chunk)
+                yield [
+                    {"when": f"t{chunk}-{n}", "entity_id": "light.kitchen", "state": "on", "name": "Kitchen"}
+                    for n in range(10)
+                ]
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(logbook_stream, "_iter_logbook_rows", fake_rows)
+    processor = FakeProcessor()
+
+    lines = logbook_stream.read_logbook_entries(
+        None, processor, None, None, EntityFilter.from_options({}), 25
+    )
+
+    assert len(lines) == 25
+    assert lines[0] == "t0-0: light.kitchen changed to on"
+    assert fetched == [0, 1, 2]
+    assert processor.humanified == 30
+    assert closed == [True]
+
+
+def test_read_logbook_entries_filters_and_redacts(monkeypatch):
+    rows = [
+        {"when": "t1", "entity_id": "lock.front_door", "state": "unlocked", "name": "Front"},
+        {"when": "t2", "entity_id": "light.kitchen", "message": "token=abc", "name": "Kitchen"},
+        {"when": "t3", "name": "Alice", "message": "came home"},
+    ]
+    monkeypatch.setattr(
+        logbook_stream, "_iter_logbook_rows", lambda *args: (chunk for chunk in [rows])
+    )
+
+    lines = logbook_stream.read_logbook_entries(
+        None,
+        FakeProcessor(),
+        None,
+        None,
+        EntityFilter.from_options({"denylist_domains": ["lock"]}),
+        80,
+    )
+
+    assert lines == ["t2: light.kitchen [redacted]", "t3: [redacted] came home"]
+
+
+def test_read_logbook_entries_falls_back_to_get_events(monkeypatch):
+    def moved_internals(hass, event_processor, start_time, end_time):
+        raise AttributeError("'Recorder' object has no attribute 'states_meta_manager'")
+        yield
+
+    monkeypatch.setattr(logbook_stream, "_iter_logbook_rows", moved_internals)
+    processor = FakeProcessor(
+        {"when": f"t{n}", "entity_id": "light.kitchen", "state": "on"} for n in range(300)
+    )
+
+    lines = logbook_stream.read_logbook_entries(
+        None, processor, None, None, EntityFilter.from_options({}), 250
+    )
+
+    assert len(lines) == 250
+    assert lines[0] == "t0: light.kitchen changed to on"
+    assert processor.humanified == 300
+
+
+def test_read_logbook_entries_uses_get_events_without_internals(monkeypatch):
+    def fail_rows(*args):
+        raise AssertionError("rows should not be streamed")
+
+    monkeypatch.setattr(logbook_stream, "STREAM_ROWS", False)
+    monkeypatch.setattr(logbook_stream, "_iter_logbook_rows", fail_rows)
+    processor = FakeProcessor([{"when": "t1", "entity_id": "light.kitchen", "state": "off"}])
+
+    lines = logbook_stream.read_logbook_entries(
+        None, processor, None, None, EntityFilter.from_options({}), 80
+    )
+
+    assert lines == ["t1: light.kitchen changed to off"]
@@ -0,0 +1,70 @@
+import pytest
+
+from custom_components.chatgpt_plus_ha.metrics import (
+    RequestMetrics,
+    RollingHistogram,
+    StreamingHistogram,
+)
+
+
+def test_histogram_percentiles_stay_within_bucket_precision():
+    histogram = StreamingHistogram()
+    for value in range(1, 1001):
+        histogram.record(value)
+
+    assert histogram.count == 1000
+    assert histogram.percentile(50) == pytest.approx(500, rel=0.02)
+    assert histogram.percentile(95) == pytest.approx(950, rel=0.02)
+    assert histogram.percentile(100) == pytest.approx(1000, rel=0.02)
+    assert len(histogram.buckets) < 400
+    assert StreamingHistogram().percentile(50) is None
+
+
+def test_rolling_histogram_expires_old_slots():
+    histogram = RollingHistogram(window=300, slots=5)
+    histogram.record(10, now=1000)
+    histogram.record(20, now=1100)
+
+    assert histogram.snapshot(now=1100).count == 2
+    assert histogram.snapshot(now=1300).count == 1
+    # Reusing the first value's slot drops it
+    histogram.record(30, now=1320)
+    assert histogram.snapshot(now=1320).count == 2
+    assert histogram.snapshot(now=2000).count == 0
+
+
+def test_request_metrics_summarize_requests():
+    metrics = RequestMetrics(window=300)
+    metrics.record(
+        {
+            "success": True,
+            "total_ms": 1200,
+            "stages_ms": {"context": 40, "sidecar": 1100},
+            "counters": {"prompt_bytes": 2048},
+        },
+        now=30,
+    )
+    metrics.record(
+        {
+            "success": True,
+            "total_ms": 5,
+            "stages_ms": {},
+            "counters": {"prompt_bytes": 2048, "cache_hits": 1},
+        },
+        now=40,
+    )
+    metrics.record(
+        {"success": False, "error": "timeout", "total_ms": 30000, "counters": {}},
+        now=50,
+    )
+    metrics.record({"success": False, "error": "queue_full", "total_ms": 1}, now=60)
+
+    assert metrics.request_rate(now=60) == 0.8
+    assert metrics.cache_hit_ratio(now=60) == 25.0
+    assert (metrics.errors, metrics.timeouts) == (2, 1)
+
+    data = metrics.as_dict(now=60)
+    assert data["sidecar_latency"]["count"] == 1
+    assert data["sidecar_latency"]["p50"] == pytest.approx(1100, rel=0.02)
+    assert data["prompt_bytes"]["p95"] == pytest.approx(2048, rel=0.02)
+    assert data["latency"]["p99"] == pytest.approx(30000, rel=0.02)
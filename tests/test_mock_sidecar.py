@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from custom_components.chatgpt_plus_ha.agent import ChatGPTPlusAgent
+from custom_components.chatgpt_plus_ha.retry import RetryPolicy
+
+from mock_sidecar import MockSidecar
+
+
+@pytest.mark.asyncio
+async def test_agent_round_trip_through_mock_sidecar():
+    async with MockSidecar(response_size=1000) as sidecar:
+        agent = ChatGPTPlusAgent(None, sidecar.url)
+        try:
+            status = await agent.get_status()
+            assert status["isLoggedIn"]
+
+            deltas = []
+            result = await agent.send_message(
+                "hello",
+                {"context_enabled": False},
+                on_delta=lambda text, delta: deltas.append((text, delta)),
+            )
+            assert result["success"]
+            assert len(result["message"]) == 1000
+            assert "".join(delta for _, delta in deltas) == result["message"]
+            assert deltas[-1][0] == result["message"]
+            assert agent.conversation_for() == result["conversationId"]
+
+            assert (await agent.new_conversation())["success"]
+            assert agent.conversation_for() is None
+        finally:
+            await agent.async_close()
+
+    assert sidecar.requests == {"status": 1, "chat_stream": 1, "new_conversation": 1}
+
+
+@pytest.mark.asyncio
+async def test_callers_chat_on_separate_tabs_at_once():
+    async with MockSidecar(latency=0.05, page_pool_size=3) as sidecar:
+        agent = ChatGPTPlusAgent(None, sidecar.url)
+        options = {"context_enabled": False}
+        try:
+            await agent.get_status()
+            first = await agent.send_message("hello", options, caller="alice")
+            results = await asyncio.gather(
+                *(
+                    agent.send_message(f"question from {caller}", options, caller=caller)
+                    for caller in ("alice", "bob", "carol")
+                )
+            )
+        finally:
+            await agent.async_close()
+
+    assert all(result["success"] for result in results)
+    assert sidecar.peak_busy_tabs == 3
+    # Alice continues her conversation; the others start their own.
+    assert results[0]["conversationId"] == first["conversationId"]
+    assert len({result["conversationId"] for result in results}) == 3
+    assert agent.conversation_for("bob") == results[1]["conversationId"]
+    assert agent.conversation_for() is None
+
+
+@pytest.mark.asyncio
+async def test_agent_falls_back_and_retries_against_mock_sidecar(monkeypatch):
+    monkeypatch.setattr(RetryPolicy, "backoff", lambda self, attempt: 0)
+    async with MockSidecar(failure_rate=1.0, streaming=False, seed=1) as sidecar:
+        agent = ChatGPTPlusAgent(None, sidecar.url)
+        agent.retry_policy = RetryPolicy(max_attempts=2)
+        try:
+            result = await agent.send_message("hello", {"context_enabled": False})
+        finally:
+            await agent.async_close()
+
+    assert not result["success"]
+    assert result["error"] == "unavailable"
+    assert sidecar.requests["chat"] == 2
+    assert sidecar.failures == 2
+
+
+@pytest.mark.asyncio
+async def test_keepalives_hold_a_slow_start_open():
+    policy = RetryPolicy(first_byte_timeout=0.1, max_attempts=1)
+    async with MockSidecar(thinking=0.3) as sidecar:
+        agent = ChatGPTPlusAgent(None, sidecar.url)
+        agent.retry_policy = policy
+        try:
+            result = await agent.send_message("hello", {"context_enabled": False})
+        finally:
+            await agent.async_close()
+    assert result["error"] == "stalled"
+
+    async with MockSidecar(thinking=0.3, keepalive=0.05) as sidecar:
+        agent = ChatGPTPlusAgent(None, sidecar.url)
+        agent.retry_policy = policy
+        try:
+            result = await agent.send_message("hello", {"context_enabled": False})
+        finally:
+            await agent.async_close()
+    assert result["success"]
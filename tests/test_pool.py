@@ -0,0 +1,54 @@
+from custom_components.chatgpt_plus_ha.agent import ChatGPTPlusAgent
+from custom_components.chatgpt_plus_ha.pool import AgentPool
+
+
+class FakeMonitor:
+    unhealthy_reason = None
+
+
+def _pool(count):
+    pool = AgentPool()
+    agents = []
+    for index in range(count):
+        agent = ChatGPTPlusAgent(None, f"http://sidecar{index}")
+        pool.add(f"entry{index}", agent)
+        agents.append(agent)
+    return pool, agents
+
+
+def test_least_outstanding_spreads_requests():
+    pool, agents = _pool(2)
+    agents[0].scheduler._running = 1
+    assert pool.select() == "entry1"
+    agents[1].scheduler._running = 1
+    # Equal load: the member routed to less often wins
+    assert pool.select() == "entry0"
+
+
+def test_conversation_and_caller_affinity():
+    pool, agents = _pool(2)
+    agents[1].use_conversation("other", "conv-1")
+    agents[1].scheduler._running = 1
+    assert pool.select(conversation_id="conv-1") == "entry1"
+
+    assert pool.select(caller="user") == "entry0"
+    agents[0].scheduler._running = 5
+    assert pool.select(caller="user") == "entry0"
+    assert pool.metrics()["affinity_hits"] == 2
+
+
+def test_unavailable_agents_are_ejected():
+    pool, agents = _pool(2)
+    agents[0].health_monitor = FakeMonitor()
+    agents[0].health_monitor.unhealthy_reason = "Sidecar is not logged in to ChatGPT"
+    agents[1].scheduler._running = 3
+    assert pool.select(caller="user") == "entry1"
+
+    agents[1].breaker.trip("stalled")
+    # Nothing is available; the request still goes somewhere to fail fast.
+    assert pool.select() in ("entry0", "entry1")
+    assert not any(m["available"] for m in pool.metrics()["members"].values())
+
+    pool.remove("entry1")
+    assert pool.select(caller="user") == "entry0"
+    assert len(pool) == 1
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from custom_components.chatgpt_plus_ha.agent import ChatGPTPlusAgent
+from custom_components.chatgpt_plus_ha.profiling import RequestProfile, capture_cprofile
+
+
+def test_request_profile_accumulates_stages_and_counters():
+    profile = RequestProfile()
+    profile.add_time("sidecar", 1.5)
+    profile.add_time("sidecar", 2.0)
+    with profile.stage("format"):
+        pass
+    profile.count("cache_hits")
+    profile.absorb(
+        "context",
+        {"timings_ms": {"scoring": 0.25}, "counters": {"entities_selected": 3}},
+    )
+
+    data = profile.as_dict()
+    assert data["stages_ms"]["sidecar"] == 3.5
+    assert set(data["stages_ms"]) == {"sidecar", "format", "context.scoring"}
+    assert data["counters"] == {"cache_hits": 1, "entities_selected": 3}
+    assert data["total_ms"] >= 0
+    assert "cprofile" not in data
+
+
+def test_capture_cprofile_lists_hottest_functions():
+    def busy():
+        return sum(range(10000))
+
+    profile = RequestProfile()
+    with capture_cprofile(profile, limit=5):
+        busy()
+
+    functions = profile.cprofile["functions"]
+    assert 0 < len(functions) <= 5
+    assert any("busy" in function["function"] for function in functions)
+    assert profile.as_dict()["cprofile"] is profile.cprofile
+
+
+@pytest.mark.asyncio
+async def test_agent_profiles_each_request():
+    agent = ChatGPTPlusAgent(None, "http://sidecar")
+
+    async def fake_exchange(formatted_message, incognito, on_delta=None, caller=None):
+        await asyncio.sleep(0)
+        return {"success": True, "message": "pong"}
+
+    agent._exchange = fake_exchange
+    options = {"context_enabled": False, "response_cache_ttl": 60}
+
+    profile = RequestProfile()
+    await agent.send_message("ping", options, profile=profile)
+    assert {"queue", "sidecar"} <= set(profile.stages)
+    assert profile.counters == {"prompt_bytes": 4, "response_bytes": 4}
+
+    await agent.send_message("ping", options)
+    cached = agent.recent_profiles[-1]
+    assert cached["success"]
+    assert cached["counters"]["cache_hits"] == 1
+    assert "sidecar" not in cached["stages_ms"]
+    assert len(agent.recent_profiles) == 2
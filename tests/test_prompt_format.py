@@ -0,0 +1,102 @@
+import json
+from datetime import timedelta
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.chatgpt_plus_ha.agent import ChatGPTPlusAgent
+from custom_components.chatgpt_plus_ha.budget import estimate_tokens
+from custom_components.chatgpt_plus_ha.const import (
+    PROMPT_FORMAT_COMPACT,
+    PROMPT_FORMAT_JSON,
+)
+from custom_components.chatgpt_plus_ha.prompt_format import format_context
+
+
+def _payload(entity_count=30, include_attributes=False):
+    now = dt_util.utcnow().replace(microsecond=0)
+    entities = []
+    summary_lines = []
+    for n in range(entity_count):
+        changed = (now - timedelta(minutes=7 * n)).isoformat()
+        entity = {
+            "entity_id": f"sensor.küche_temperature_{n}",
+            "state": str(20 + n % 5),
+            "last_changed": changed,
+            "last_updated": changed,
+        }
+        if include_attributes:
+            entity["attributes"] = {"unit_of_measurement": "°C", "friendly_name": "[redacted]"}
+        entities.append(entity)
+        summary_lines.append(f"- {entity['entity_id']}: {entity['state']} ([redacted])")
+    recent_changes = [
+        f"sensor.küche_temperature_{n} changed to {20 + n % 5} at "
+        f"{(now - timedelta(minutes=7 * n)).isoformat()}"
+        for n in range(10)
+    ]
+    return {
+        "generated_at": now.isoformat(),
+        "summary": f"Relevant entities ({entity_count}):\n"
+        + "\n".join(summary_lines)
+        + "\n\nRecent changes (last 6h):\n"
+        + "\n".join(recent_changes),
+        "entities": entities,
+        "recent_changes": recent_changes,
+        "logbook": [
+            f"{(now - timedelta(minutes=3)).isoformat()}: light.kitchen changed to on"
+        ],
+        "debug": {"timings_ms": {"selection": 1.0}},
+    }
+
+
+def test_compact_format_halves_prompt_size():
+    for include_attributes in (False, True):
+        payload = _payload(include_attributes=include_attributes)
+        as_json = format_context(payload, PROMPT_FORMAT_JSON)
+        compact = format_context(payload, PROMPT_FORMAT_COMPACT)
+
+        json_bytes = len(as_json.encode())
+        compact_bytes = len(compact.encode())
+        json_tokens = estimate_tokens(as_json)
+        compact_tokens = estimate_tokens(compact)
+        print(
+            f"attributes={include_attributes}: json {json_bytes}B/{json_tokens}t, "
+            f"compact {compact_bytes}B/{compact_tokens}t"
+        )
+        assert compact_bytes * 2 <= json_bytes
+        assert compact_tokens * 2 <= json_tokens
+
+
+def test_compact_format_keeps_the_same_information():
+    payload = _payload(entity_count=2)
+    compact = format_context(payload, PROMPT_FORMAT_COMPACT).splitlines()
+
+    assert compact[1:5] == [
+        "entities:",
+        "entity_id|state|changed|updated",
+        "sensor.küche_temperature_0|20|0s|",
+        "sensor.küche_temperature_1|21|7m|",
+    ]
+    assert "recent_changes:" in compact
+    assert "sensor.küche_temperature_9|24|1h3m" in compact
+    assert compact[-1] == "3m|light.kitchen changed to on"
+    assert "debug" not in "\n".join(compact)
+
+    as_json = json.loads(format_context(payload, PROMPT_FORMAT_JSON))
+    assert "debug" not in as_json
+    assert as_json["entities"] == payload["entities"]
+
+
+def test_json_is_the_default_prompt_format():
+    payload = _payload(entity_count=2)
+    del payload["debug"]
+    prompt = ChatGPTPlusAgent(None, "http://sidecar")._format_prompt("hi", payload)
+
+    assert prompt == (
+        "You are assisting a Home Assistant user.\n"
+        "Use the Home Assistant context JSON below to answer.\n"
+        "Do not reveal secrets or credentials. Ask clarifying questions when needed.\n\n"
+        "HOME_ASSISTANT_CONTEXT_JSON:\n"
+        f"{json.dumps(payload, ensure_ascii=True)}\n\n"
+        "USER_REQUEST:\n"
+        "hi"
+    )
@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from homeassistant.core import State
+from homeassistant.util import dt as dt_util
+
+from custom_components.chatgpt_plus_ha.filters import EntityFilter
+from custom_components.chatgpt_plus_ha.recent_changes import RecentChangesBuffer
+
+
+class FakeEvent:
+    def __init__(self, data):
+        self.data = data
+
+
+def _change(buffer, entity_id, old, new, when):
+    buffer._async_state_changed(
+        FakeEvent(
+            {
+                "entity_id": entity_id,
+                "old_state": State(entity_id, old) if old is not None else None,
+                "new_state": State(entity_id, new, last_changed=when),
+            }
+        )
+    )
+
+
+def _buffer(**options):
+    buffer = RecentChangesBuffer(hass=None)
+    buffer._covered_since -= timedelta(hours=1)
+    buffer.async_configure([options])
+    return buffer
+
+
+def test_buffer_records_allowed_redacted_changes_newest_first():
+    buffer = _buffer(denylist_domains=["lock"])
+    now = dt_util.utcnow()
+    _change(buffer, "light.kitchen", "off", "on", now - timedelta(minutes=3))
+    _change(buffer, "light.kitchen", "on", "on", now - timedelta(minutes=2))
+    _change(buffer, "lock.front_door", "locked", "unlocked", now - timedelta(minutes=2))
+    _change(buffer, "sensor.token", "a", "password=hunter2", now - timedelta(minutes=1))
+
+    changes = buffer.changes_since(now - timedelta(minutes=10), EntityFilter.from_options({}))
+    assert [(change.entity_id, change.state) for change in changes] == [
+        ("sensor.token", "[redacted]"),
+        ("light.kitchen", "on"),
+    ]
+
+    only_lights = EntityFilter.from_options({"allowlist_domains": ["light"]})
+    changes = buffer.changes_since(now - timedelta(minutes=10), only_lights)
+    assert [change.entity_id for change in changes] == ["light.kitchen"]
+    assert buffer.changes_since(now - timedelta(minutes=2), only_lights) == []
+
+
+def test_buffer_enforces_depth_and_limit():
+    buffer = _buffer(recent_changes_depth=2, recent_changes_limit=3)
+    start = dt_util.utcnow() - timedelta(minutes=30)
+    for minute in range(4):
+        _change(buffer, "light.kitchen", str(minute), str(minute + 1), start + timedelta(minutes=minute))
+    assert [change.state for change in buffer.changes_since(start, EntityFilter.from_options({}))] == ["4", "3"]
+    # Depth trimming keeps the per-entity window, not the global coverage
+    assert buffer.covers(start)
+
+    _change(buffer, "fan.attic", "off", "on", start + timedelta(minutes=10))
+    _change(buffer, "fan.attic", "on", "off", start + timedelta(minutes=11))
+    assert len(buffer) == 3
+    assert not buffer.covers(start)
+    assert buffer.covers(start + timedelta(minutes=3))
+    assert [change.state for change in buffer.changes_since(start, EntityFilter.from_options({}))] == ["off", "on", "4"]
+
+
+def test_buffer_is_cleared_and_paused_in_incognito():
+    buffer = _buffer()
+    now = dt_util.utcnow()
+    _change(buffer, "light.kitchen", "off", "on", now)
+    assert len(buffer) == 1
+
+    buffer.async_configure([{}, {"incognito_mode": True}])
+    _change(buffer, "light.kitchen", "on", "off", now)
+    assert len(buffer) == 0
+    assert not buffer.covers(now - timedelta(hours=1))
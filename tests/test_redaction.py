@@ -0,0 +1,87 @@
+import re
+
+from homeassistant.core import State
+
+from custom_components.chatgpt_plus_ha import redaction
+
+
+def _reference_redact(value, key=None):
+    if value is None:
+        return None
+    if isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        lowered = value.lower()
+        if any(marker in lowered for marker in ("bearer ", "token", "password", "secret", "apikey", "api_key")):
+            return "[redacted]"
+        for pattern in redaction.SENSITIVE_VALUE_PATTERNS:
+            if pattern.match(value):
+                return "[redacted]"
+        if len(value) > 40 and re.fullmatch(r"[A-Za-z0-9._=-]+", value):
+            return "[redacted]"
+        lowered_key = (key or "").lower()
+        if key and ("name" in lowered_key or "user" in lowered_key or "owner" in lowered_key):
+            return "[redacted]"
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_reference_redact(item) for item in list(value)[:redaction.MAX_LIST_ITEMS]]
+    if isinstance(value, dict):
+        return {
+            k: _reference_redact(v, key=str(k))
+            for k, v in value.items()
+            if not any(marker in str(k).lower() for marker in redaction.SENSITIVE_KEYS)
+        }
+    return str(value)
+
+
+SAMPLES = [
+    None,
+    True,
+    42,
+    1.5,
+    "on",
+    "Bearer abc",
+    "My Token",
+    "sk-" + "a" * 24,
+    "SK-" + "a" * 24,
+    "eyJhbGciOi.eyJzdWIi.c2lnbmF0dXJl",
+    "user@example.com",
+    "user@example.com\n",
+    "a" * 40,
+    "a" * 41,
+    "a" * 41 + "\n",
+    "abc.DEF-ghi_jkl=" * 3,
+    "Living Room",
+    ("x", "password1"),
+    list(range(60)),
+    {
+        "friendly_name": "Kitchen Light",
+        "api_key": "abc",
+        "Owner": "Alice",
+        "nested": {"username": "bob", "brightness": 255},
+        "values": ["ok", "secret sauce"],
+        "when": object,
+    },
+]
+
+
+def test_redact_value_matches_reference():
+    for sample in SAMPLES:
+        assert redaction.redact_value(sample) == _reference_redact(sample)
+        assert redaction.redact_value(sample, key="name") == _reference_redact(sample, key="name")
+
+
+def test_redaction_engine_reuses_unchanged_states():
+    engine = redaction.RedactionEngine(max_entries=1)
+    state = State("light.kitchen", "on", {"friendly_name": "Kitchen", "brightness": 10})
+
+    first = engine.redact_attributes(state)
+    assert first == {"friendly_name": "[redacted]", "brightness": 10}
+    assert engine.redact_attributes(state) is first
+
+    updated = State("light.kitchen", "on", {"friendly_name": "Kitchen", "brightness": 20})
+    second = engine.redact_attributes(updated)
+    assert second["brightness"] == 20
+
+    engine.redact_attributes(State("light.hall", "off", {}))
+    assert engine.redact_attributes(updated) is not second
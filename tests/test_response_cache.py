@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from custom_components.chatgpt_plus_ha import response_cache
+from custom_components.chatgpt_plus_ha.agent import ChatGPTPlusAgent
+from custom_components.chatgpt_plus_ha.response_cache import (
+    RequestCoalescer,
+    ResponseCache,
+    request_key,
+)
+
+
+def test_request_key_ignores_volatile_context_and_whitespace():
+    first = {"generated_at": "t1", "summary": "s", "debug": {"timings_ms": {}}}
+    second = {"generated_at": "t2", "summary": "s"}
+    assert request_key("turn on  the light", first, "compact", False) == request_key(
+        " turn on the light", second, "compact", False
+    )
+    assert request_key("hi", first, "compact", False) != request_key(
+        "hi", first, "compact", True
+    )
+    assert request_key("hi", first, "compact", False) != request_key(
+        "hi", {"summary": "other"}, "compact", False
+    )
+
+
+@pytest.mark.asyncio
+async def test_coalescer_shares_one_call():
+    coalescer = RequestCoalescer()
+    calls = []
+    gate = asyncio.Event()
+
+    async def call():
+        calls.append(1)
+        await gate.wait()
+        return {"success": True, "message": "done"}
+
+    waiters = [asyncio.create_task(coalescer.run("key", call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    waiters[0].cancel()
+    gate.set()
+    results = await asyncio.gather(*waiters[1:])
+
+    assert len(calls) == 1
+    assert results == [{"success": True, "message": "done"}] * 2
+    assert results[0] is not results[1]
+    assert coalescer.coalesced == 2
+    assert len(coalescer) == 0
+
+
+def test_response_cache_expires(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(max_entries=1)
+    cache.set("a", {"message": "x"}, ttl=10)
+    assert cache.get("a") == {"message": "x"}
+    now[0] += 11
+    assert cache.get("a") is None
+    cache.set("a", {}, ttl=10)
+    cache.set("b", {}, ttl=10)
+    assert len(cache) == 1 and cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_agent_coalesces_and_caches_outside_incognito():
+    agent = ChatGPTPlusAgent(None, "http://sidecar")
+    sent = []
+
+    async def fake_exchange(formatted_message, incognito, on_delta=None, caller=None):
+        sent.append((formatted_message, incognito))
+        await asyncio.sleep(0)
+        return {"success": True, "message": f"reply {len(sent)}"}
+
+    agent._exchange = fake_exchange
+    options = {"context_enabled": False, "response_cache_ttl": 60}
+
+    results = await asyncio.gather(
+        agent.send_message("status?", options), agent.send_message("status? ", options)
+    )
+    assert len(sent) == 1
+    assert [result["message"] for result in results] == ["reply 1", "reply 1"]
+
+    assert (await agent.send_message("status?", options))["message"] == "reply 1"
+    assert len(sent) == 1
+
+    incognito = {**options, "incognito": True}
+    assert (await agent.send_message("status?", incognito))["message"] == "reply 2"
+    assert (await agent.send_message("status?", incognito))["message"] == "reply 3"
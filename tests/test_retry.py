@@ -0,0 +1,144 @@
+import aiohttp
+import pytest
+
+from custom_components.chatgpt_plus_ha import retry
+from custom_components.chatgpt_plus_ha.agent import ChatGPTPlusAgent
+from custom_components.chatgpt_plus_ha.retry import (
+    BREAKER_CLOSED,
+    BREAKER_HALF_OPEN,
+    BREAKER_OPEN,
+    CircuitBreaker,
+    RetryPolicy,
+)
+
+
+def test_breaker_opens_after_threshold_and_lets_one_trial_through(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(retry.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure("stalled")
+    assert breaker.allow()
+    breaker.record_failure("stalled")
+    assert breaker.state == BREAKER_OPEN
+    assert not breaker.allow()
+
+    now[0] = 31
+    assert breaker.allow()
+    assert breaker.state == BREAKER_HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_failure("stalled")
+    assert breaker.state == BREAKER_OPEN
+
+    now[0] = 62
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == BREAKER_CLOSED
+    assert breaker.metrics()["short_circuited"] == 2
+
+
+def test_policy_from_options():
+    policy = RetryPolicy.from_options({"total_timeout": "60", "max_attempts": 0})
+    assert policy.total_timeout == 60.0
+    assert policy.max_attempts == 1
+    timeout = policy.client_timeout(5, streaming=False)
+    assert timeout.total == 5 and timeout.sock_read is None
+
+
+def _agent(results, status):
+    agent = ChatGPTPlusAgent(None, "http://sidecar")
+    agent.retry_policy = RetryPolicy(max_attempts=3)
+    sent = []
+
+    async def fake_send(message, on_delta, remaining, conversation_id=None):
+        sent.append(remaining)
+        return results.pop(0)
+
+    async def fake_status():
+        return status
+
+    agent._send_message_stream_raw = fake_send
+    agent.get_status = fake_status
+    return agent, sent
+
+
+@pytest.mark.asyncio
+async def test_connect_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(RetryPolicy, "backoff", lambda self, attempt: 0)
+    agent, sent = _agent(
+        [
+            {"success": False, "error": "connect", "message": "refused"},
+            {"success": True, "message": "hi"},
+        ],
+        {"isLoggedIn": True},
+    )
+    result = await agent._exchange("hello", False)
+    assert result == {"success": True, "message": "hi"}
+    assert len(sent) == 2 and sent[1] < sent[0]
+    assert agent.breaker.state == BREAKER_CLOSED
+
+
+@pytest.mark.asyncio
+async def test_stalled_request_is_not_resent():
+    agent, sent = _agent(
+        [{"success": False, "error": "stalled", "message": "ChatGPT stopped responding"}],
+        {"isLoggedIn": True},
+    )
+    result = await agent._exchange("hello", False)
+    assert result["error"] == "stalled"
+    assert len(sent) == 1
+
+
+@pytest.mark.asyncio
+async def test_logged_out_sidecar_opens_breaker():
+    agent, sent = _agent(
+        [{"success": False, "error": "connect", "message": "refused"}],
+        {"isLoggedIn": False},
+    )
+    result = await agent._exchange("hello", False)
+    assert result["error"] == "sidecar_unavailable"
+    assert agent.breaker.state == BREAKER_OPEN
+
+    result = await agent._exchange("hello", False)
+    assert result["error"] == "circuit_open"
+    assert len(sent) == 1
+
+
+class TimingOutSession:
+    closed = False
+
+    def __init__(self, errors):
+        self.errors = errors
+        self.posts = 0
+
+    def post(self, *args, **kwargs):
+        return self
+
+    async def __aenter__(self):
+        self.posts += 1
+        raise self.errors.pop(0)
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_connect_timeouts_are_retried_and_read_timeouts_are_not(monkeypatch):
+    monkeypatch.setattr(RetryPolicy, "backoff", lambda self, attempt: 0)
+    agent = ChatGPTPlusAgent(None, "http://sidecar")
+
+    async def fake_status():
+        return {"isLoggedIn": True}
+
+    agent.get_status = fake_status
+    agent._session = TimingOutSession(
+        [
+            aiohttp.ConnectionTimeoutError("Connection timeout to host http://sidecar"),
+            aiohttp.ServerTimeoutError("Connection timeout to host http://sidecar"),
+            aiohttp.SocketTimeoutError("Timeout on reading data from socket"),
+        ]
+    )
+
+    result = await agent._exchange("hello", False)
+    assert result["error"] == "stalled"
+    assert agent._session.posts == 3
@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+
+from custom_components.chatgpt_plus_ha.scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_NORMAL,
+    QueueFullError,
+    RequestScheduler,
+)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_serves_one_at_a_time_in_priority_order():
+    scheduler = RequestScheduler(concurrency=1)
+    gate = asyncio.Event()
+    order = []
+    active = []
+
+    async def job(name):
+        active.append(name)
+        assert len(active) == 1
+        if name == "first":
+            await gate.wait()
+        order.append(name)
+        active.remove(name)
+        return name
+
+    first = asyncio.create_task(scheduler.run(lambda: job("first"), PRIORITY_BACKGROUND, "a"))
+    await asyncio.sleep(0)
+    queued = [
+        asyncio.create_task(scheduler.run(lambda: job("background"), PRIORITY_BACKGROUND, "a")),
+        asyncio.create_task(scheduler.run(lambda: job("normal"), PRIORITY_NORMAL, "b")),
+        asyncio.create_task(scheduler.run(lambda: job("interactive"), PRIORITY_INTERACTIVE, "c")),
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.queued == 3
+
+    gate.set()
+    results = await asyncio.gather(first, *queued)
+
+    assert order == ["first", "interactive", "normal", "background"]
+    assert results == ["first", "background", "normal", "interactive"]
+    metrics = scheduler.metrics()
+    assert metrics["running"] == 0 and metrics["queued"] == 0
+    assert metrics["service"][PRIORITY_BACKGROUND]["count"] == 2
+    assert metrics["wait"][PRIORITY_INTERACTIVE]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_applies_backpressure():
+    scheduler = RequestScheduler(concurrency=1, max_queue=1, max_per_caller=2)
+    gate = asyncio.Event()
+
+    async def job():
+        await gate.wait()
+        return True
+
+    running = asyncio.create_task(scheduler.run(job, PRIORITY_NORMAL, "auto"))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(scheduler.run(job, PRIORITY_BACKGROUND, "auto"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(QueueFullError):
+        await scheduler.run(job, PRIORITY_NORMAL, "auto")
+    with pytest.raises(QueueFullError):
+        await scheduler.run(job, PRIORITY_BACKGROUND, "other")
+
+    interactive = asyncio.create_task(scheduler.run(job, PRIORITY_INTERACTIVE, "panel"))
+    await asyncio.sleep(0)
+    with pytest.raises(QueueFullError):
+        await waiting
+
+    gate.set()
+    assert await running and await interactive
+    assert scheduler.metrics()["rejected"] == 2
+    assert scheduler.metrics()["displaced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_only_interactive_requests_displace_waiters():
+    scheduler = RequestScheduler(concurrency=1, max_queue=1)
+    gate = asyncio.Event()
+
+    async def job():
+        await gate.wait()
+        return True
+
+    running = asyncio.create_task(scheduler.run(job, PRIORITY_NORMAL, "a"))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(scheduler.run(job, PRIORITY_BACKGROUND, "b"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(QueueFullError):
+        await scheduler.run(job, PRIORITY_NORMAL, "c")
+    assert scheduler.metrics()["displaced"] == 0
+
+    gate.set()
+    assert await running and await waiting
+    assert scheduler.metrics()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_displaced_then_cancelled_waiter_frees_no_slot():
+    scheduler = RequestScheduler(concurrency=1, max_queue=1)
+    gate = asyncio.Event()
+    active = []
+    peak = 0
+
+    async def job():
+        nonlocal peak
+        active.append(True)
+        peak = max(peak, len(active))
+        await gate.wait()
+        active.pop()
+        return True
+
+    running = asyncio.create_task(scheduler.run(job, PRIORITY_NORMAL, "a"))
+    await asyncio.sleep(0)
+    displaced = asyncio.create_task(scheduler.run(job, PRIORITY_BACKGROUND, "b"))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(scheduler.run(job, PRIORITY_INTERACTIVE, "c"))
+    await asyncio.sleep(0)
+
+    displaced.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await displaced
+    await asyncio.sleep(0)
+    assert scheduler.running == 1
+    assert scheduler.queued == 1
+
+    gate.set()
+    assert await running and await interactive
+    assert peak == 1
+    assert scheduler.running == 0
+    assert scheduler.metrics()["displaced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_skips_cancelled_waiters():
+    scheduler = RequestScheduler(concurrency=1)
+    gate = asyncio.Event()
+
+    async def job():
+        await gate.wait()
+        return True
+
+    running = asyncio.create_task(scheduler.run(job))
+    await asyncio.sleep(0)
+    cancelled = asyncio.create_task(scheduler.run(job))
+    waiting = asyncio.create_task(scheduler.run(job))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+
+    gate.set()
+    assert await running and await waiting
+    assert scheduler.running == 0 and scheduler.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_set_concurrency_starts_and_holds_back_waiters():
+    scheduler = RequestScheduler(concurrency=1)
+    gate = asyncio.Event()
+
+    async def job():
+        await gate.wait()
+
+    tasks = [
+        asyncio.create_task(scheduler.run(job, PRIORITY_NORMAL, str(index)))
+        for index in range(4)
+    ]
+    await asyncio.sleep(0)
+    assert (scheduler.running, scheduler.queued) == (1, 3)
+
+    scheduler.set_concurrency(3)
+    assert (scheduler.running, scheduler.queued) == (3, 1)
+
+    scheduler.set_concurrency(1)
+    gate.set()
+    await asyncio.gather(*tasks)
+    assert (scheduler.running, scheduler.queued) == (0, 0)
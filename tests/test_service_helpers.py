@@ -1,4 +1,6 @@
+from custom_components.chatgpt_plus_ha import service_helpers
 from custom_components.chatgpt_plus_ha.service_helpers import (
+    DeltaThrottle,
     build_notification_template,
     extract_json_payload,
     validate_automation_yaml,
@@ -44,3 +46,27 @@ def test_build_notification_template():
     template = build_notification_template("garage_open")
     assert template is not None
     assert "Garage" in template["title"]
+
+
+def test_delta_throttle_batches_and_sends_only_new_text(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(service_helpers.time, "monotonic", lambda: now[0])
+    events = []
+    throttle = DeltaThrottle(events.append, interval=0.2)
+
+    throttle.update("The")
+    throttle.update("The light")
+    now[0] = 0.1
+    throttle.update("The light is")
+    assert events == [{"delta": "The"}]
+
+    now[0] = 0.3
+    throttle.update("The light is on")
+    assert events[-1] == {"delta": " light is on"}
+
+    now[0] = 0.35
+    throttle.update("The lamp is on")
+    throttle.flush()
+    assert events[-1] == {"delta": "The lamp is on", "replace": True}
+    throttle.flush()
+    assert len(events) == 3
@@ -0,0 +1,64 @@
+import pytest
+from aiohttp import web
+
+from custom_components.chatgpt_plus_ha.agent import ChatGPTPlusAgent
+from custom_components.chatgpt_plus_ha.sidecar_session import EXTRA_CONNECTIONS
+
+
+@pytest.mark.asyncio
+async def test_agent_session_reuses_connections():
+    app = web.Application()
+
+    async def health(request):
+        return web.json_response({"status": "healthy"})
+
+    app.router.add_get("/health", health)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    agent = ChatGPTPlusAgent(None, f"http://127.0.0.1:{port}")
+    try:
+        for _ in range(3):
+            assert await agent.get_health() == {"status": "healthy"}
+        assert agent.session.connector.limit_per_host == 1 + EXTRA_CONNECTIONS
+        stats = agent.connection_stats.as_dict()
+        assert stats["requests"] == 3
+        assert stats["connections_created"] == 1
+        assert stats["connections_reused"] == 2
+    finally:
+        await agent.async_close()
+        await runner.cleanup()
+
+    assert agent._session is None
+
+
+@pytest.mark.asyncio
+async def test_agent_follows_sidecar_page_pool():
+    app = web.Application()
+
+    async def status(request):
+        return web.json_response({"isLoggedIn": True, "pagePool": {"size": 3}})
+
+    app.router.add_get("/api/status", status)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    class FakeHass:
+        def async_create_background_task(self, coro, name):
+            coro.close()
+
+    agent = ChatGPTPlusAgent(FakeHass(), f"http://127.0.0.1:{port}")
+    try:
+        await agent.get_status()
+        assert agent.scheduler.concurrency == 3
+        assert len(agent._retired_sessions) == 1
+        assert agent.session.connector.limit_per_host == 3 + EXTRA_CONNECTIONS
+    finally:
+        await agent.async_close()
+        await runner.cleanup()
@@ -0,0 +1,36 @@
+from homeassistant.core import State
+
+from custom_components.chatgpt_plus_ha.redaction import RedactionEngine
+from custom_components.chatgpt_plus_ha.state_cache import (
+    SerializedStateCache,
+    serialize_state,
+)
+
+
+class FakeEvent:
+    def __init__(self, data):
+        self.data = data
+
+
+def test_state_cache_reuses_until_state_changes():
+    cache = SerializedStateCache(hass=None, max_entries=2)
+    redactor = RedactionEngine()
+    state = State("light.kitchen", "on", {"brightness": 10})
+
+    first = cache.get(state, True, redactor)
+    assert first == serialize_state(state, True, redactor)
+    assert cache.get(state, True, redactor) is first
+    assert cache.get(state, False, redactor) is not first
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    cache._async_state_changed(FakeEvent({"entity_id": "light.kitchen"}))
+    assert len(cache) == 0
+    assert cache.get(state, True, redactor) is not first
+
+
+def test_state_cache_is_bounded():
+    cache = SerializedStateCache(hass=None, max_entries=2)
+    redactor = RedactionEngine()
+    for entity_id in ("light.a", "light.b", "light.c"):
+        cache.get(State(entity_id, "on"), False, redactor)
+    assert len(cache) == 2
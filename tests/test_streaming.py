@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from custom_components.chatgpt_plus_ha.agent import ChatGPTPlusAgent, _iter_sse_events
+
+
+async def _lines(*lines):
+    for line in lines:
+        yield line
+
+
+@pytest.mark.asyncio
+async def test_sse_events_are_parsed():
+    stream = _lines(
+        b": keepalive\n",
+        b"event: delta\n",
+        b'data: {"text": "Hel", "delta": "Hel"}\n',
+        b"\n",
+        b"event: delta\n",
+        b"data: not json\n",
+        b"\n",
+        b"event: done\r\n",
+        b'data: {"success": true,\n',
+        b'data: "message": "Hello"}\n',
+        b"\n",
+    )
+    events = [event async for event in _iter_sse_events(stream)]
+    assert events == [
+        ("delta", {"text": "Hel", "delta": "Hel"}),
+        ("done", {"success": True, "message": "Hello"}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_message_yields_deltas_then_result():
+    agent = ChatGPTPlusAgent(None, "http://sidecar")
+    coalesced = []
+
+    async def fake_exchange(formatted_message, incognito, on_delta=None, caller=None):
+        for text in ("The", "The light", "The light is on"):
+            on_delta(text, text.rpartition(" ")[2])
+            await asyncio.sleep(0)
+        return {"success": True, "message": "The light is on"}
+
+    async def fake_coalesce(key, func):
+        coalesced.append(key)
+        return await func()
+
+    agent._exchange = fake_exchange
+    agent.coalescer.run = fake_coalesce
+
+    items = [
+        item
+        async for item in agent.stream_message(
+            "is the light on?", {"context_enabled": False}
+        )
+    ]
+
+    assert [item["text"] for item in items[:-1]] == [
+        "The",
+        "The light",
+        "The light is on",
+    ]
+    assert items[-1] == {
+        "type": "done",
+        "result": {"success": True, "message": "The light is on"},
+    }
+    assert coalesced == []
+
+
+class FakeStreamResponse:
+    status = 200
+
+    def __init__(self, *lines):
+        self.content = _lines(*lines)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeStreamSession:
+    closed = False
+
+    def __init__(self, response):
+        self.response = response
+
+    def post(self, *args, **kwargs):
+        return self.response
+
+
+@pytest.mark.asyncio
+async def test_stream_rebuilds_text_from_deltas():
+    agent = ChatGPTPlusAgent(None, "http://sidecar")
+    agent._session = FakeStreamSession(
+        FakeStreamResponse(
+            b"event: delta\n",
+            b'data: {"delta": "The"}\n',
+            b"\n",
+            b"event: delta\n",
+            b'data: {"delta": " light"}\n',
+            b"\n",
+            b"event: delta\n",
+            b'data: {"delta": "The lamp", "replace": true}\n',
+            b"\n",
+            b"event: delta\n",
+            b'data: {"delta": " is on"}\n',
+            b"\n",
+            b"event: done\n",
+            b'data: {"success": true, "message": "The lamp is on"}\n',
+            b"\n",
+        )
+    )
+    texts = []
+
+    result = await agent._send_message_stream_raw(
+        "is the light on?", lambda text, delta: texts.append(text), 10
+    )
+
+    assert texts == ["The", "The light", "The lamp", "The lamp is on"]
+    assert result == {"success": True, "message": "The lamp is on"}
@@ -0,0 +1,56 @@
+import pytest
+
+from custom_components.chatgpt_plus_ha import structured_cache as sc
+
+
+class FakeStore:
+    saved = None
+
+    def __init__(self, hass, version, key):
+        self.delayed = 0
+
+    async def async_load(self):
+        return FakeStore.saved
+
+    async def async_save(self, data):
+        FakeStore.saved = data
+
+    def async_delay_save(self, data_func, delay):
+        self.delayed += 1
+
+
+def test_structured_key_tracks_subject_summary_and_template():
+    key = sc.structured_key("generate_automation", "lights at sunset", "summary", 1)
+    assert key == sc.structured_key("generate_automation", "lights at sunset", "summary", 1)
+    assert key != sc.structured_key("generate_automation", "lights at sunset", "other", 1)
+    assert key != sc.structured_key("generate_automation", "lights at sunset", "summary", 2)
+    assert key != sc.structured_key("compose_notification", "lights at sunset", "summary", 1)
+
+
+@pytest.mark.asyncio
+async def test_structured_cache_persists_with_lru_and_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sc, "Store", FakeStore)
+    monkeypatch.setattr(sc.time, "time", lambda: now[0])
+    FakeStore.saved = None
+
+    cache = sc.StructuredResponseCache(None, max_entries=2, ttl=60)
+    await cache.async_load()
+    cache.async_set("a", {"yaml": "a"})
+    cache.async_set("b", {"yaml": "b"})
+    now[0] += 1
+    assert cache.async_get("a") == {"yaml": "a"}
+    cache.async_set("c", {"yaml": "c"})
+    assert cache.async_get("b") is None
+    await cache.async_save()
+
+    reloaded = sc.StructuredResponseCache(None, max_entries=2, ttl=60)
+    await reloaded.async_load()
+    assert reloaded.async_get("a") == {"yaml": "a"}
+    assert reloaded.async_get("c") == {"yaml": "c"}
+
+    now[0] += 61
+    assert reloaded.async_get("c") is None
+    expired = sc.StructuredResponseCache(None, max_entries=2, ttl=60)
+    await expired.async_load()
+    assert len(expired) == 0